@@ -0,0 +1,57 @@
+"""Partial and covering indexes for live transactions."""
+
+import sqlalchemy as sa
+
+from alembic import op
+
+revision = "0004_live_transaction_indexes"
+down_revision = "0003_simplify_transactions"
+branch_labels = None
+depends_on = None
+
+LIVE_PREDICATE = sa.text("is_deleted IS false")
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_transactions_live_occurred_at_id",
+            "transactions",
+            [sa.text("occurred_at DESC"), "id"],
+            postgresql_where=LIVE_PREDICATE,
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            "ix_transactions_live_entry_id",
+            "transactions",
+            ["entry_id"],
+            postgresql_where=LIVE_PREDICATE,
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            "ix_transactions_live_summary",
+            "transactions",
+            ["occurred_at"],
+            postgresql_include=["direction", "category", "amount", "id"],
+            postgresql_where=LIVE_PREDICATE,
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_transactions_live_summary",
+            table_name="transactions",
+            postgresql_concurrently=True,
+        )
+        op.drop_index(
+            "ix_transactions_live_entry_id",
+            table_name="transactions",
+            postgresql_concurrently=True,
+        )
+        op.drop_index(
+            "ix_transactions_live_occurred_at_id",
+            table_name="transactions",
+            postgresql_concurrently=True,
+        )
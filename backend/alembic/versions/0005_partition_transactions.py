@@ -0,0 +1,80 @@
+"""Optionally range-partition transactions by month.
+
+Skipped unless requested, because the conversion rewrites the whole table:
+
+    alembic -x partition_transactions=true upgrade head
+"""
+
+import os
+from datetime import datetime, timezone
+
+import sqlalchemy as sa
+
+from alembic import context, op
+from src.database.partitions import (
+    add_months,
+    month_start,
+    partition_statements,
+    unpartition_statements,
+)
+
+revision = "0005_partition_transactions"
+down_revision = "0004_live_transaction_indexes"
+branch_labels = None
+depends_on = None
+
+MONTHS_AHEAD = 3
+
+# Indexes on transactions as of this revision, rebuilt on the partitioned parent.
+TRANSACTION_INDEXES = [
+    "CREATE INDEX ix_transactions_entry_id ON transactions (entry_id)",
+    "CREATE INDEX ix_transactions_occurred_at ON transactions (occurred_at)",
+    "CREATE INDEX ix_transactions_live_occurred_at_id ON transactions "
+    "(occurred_at DESC, id) WHERE is_deleted IS false",
+    "CREATE INDEX ix_transactions_live_entry_id ON transactions (entry_id) "
+    "WHERE is_deleted IS false",
+    "CREATE INDEX ix_transactions_live_summary ON transactions (occurred_at) "
+    "INCLUDE (direction, category, amount, id) WHERE is_deleted IS false",
+]
+
+
+def _partitioning_requested() -> bool:
+    value = context.get_x_argument(as_dictionary=True).get(
+        "partition_transactions",
+        os.getenv("PARTITION_TRANSACTIONS", ""),
+    )
+    return value.lower() in {"1", "true", "yes"}
+
+
+def _is_partitioned(bind: sa.engine.Connection) -> bool:
+    result = bind.execute(
+        sa.text("SELECT 1 FROM pg_partitioned_table WHERE partrelid = 'transactions'::regclass")
+    )
+    return result.scalar_one_or_none() is not None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != "postgresql" or not _partitioning_requested():
+        return
+    if _is_partitioned(bind):
+        return
+
+    today = datetime.now(timezone.utc).date()
+    earliest = bind.execute(sa.text("SELECT min(occurred_at) FROM transactions")).scalar()
+    first_month = month_start(earliest.astimezone(timezone.utc).date() if earliest else today)
+    last_month = add_months(month_start(today), MONTHS_AHEAD)
+    for statement in partition_statements(
+        first_month,
+        last_month,
+        indexes=TRANSACTION_INDEXES,
+    ):
+        op.execute(statement)
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != "postgresql" or not _is_partitioned(bind):
+        return
+    for statement in unpartition_statements(indexes=TRANSACTION_INDEXES):
+        op.execute(statement)
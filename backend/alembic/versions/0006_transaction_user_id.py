@@ -0,0 +1,60 @@
+"""Denormalize user_id onto transactions."""
+
+import sqlalchemy as sa
+
+from alembic import op
+
+revision = "0006_transaction_user_id"
+down_revision = "0005_partition_transactions"
+branch_labels = None
+depends_on = None
+
+LIVE_PREDICATE = sa.text("is_deleted IS false")
+
+
+def upgrade() -> None:
+    op.add_column("transactions", sa.Column("user_id", sa.String(length=64), nullable=True))
+    op.execute(
+        """
+        UPDATE transactions
+        SET user_id = entries.user_id
+        FROM entries
+        WHERE entries.id = transactions.entry_id
+        """
+    )
+    op.alter_column("transactions", "user_id", nullable=False)
+
+    op.drop_index("ix_transactions_live_summary", table_name="transactions")
+    op.drop_index("ix_transactions_live_occurred_at_id", table_name="transactions")
+    op.create_index(
+        "ix_transactions_live_user_occurred_at",
+        "transactions",
+        ["user_id", sa.text("occurred_at DESC"), "id"],
+        postgresql_where=LIVE_PREDICATE,
+    )
+    op.create_index(
+        "ix_transactions_live_user_summary",
+        "transactions",
+        ["user_id", "occurred_at"],
+        postgresql_include=["direction", "category", "amount", "id"],
+        postgresql_where=LIVE_PREDICATE,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_transactions_live_user_summary", table_name="transactions")
+    op.drop_index("ix_transactions_live_user_occurred_at", table_name="transactions")
+    op.create_index(
+        "ix_transactions_live_occurred_at_id",
+        "transactions",
+        [sa.text("occurred_at DESC"), "id"],
+        postgresql_where=LIVE_PREDICATE,
+    )
+    op.create_index(
+        "ix_transactions_live_summary",
+        "transactions",
+        ["occurred_at"],
+        postgresql_include=["direction", "category", "amount", "id"],
+        postgresql_where=LIVE_PREDICATE,
+    )
+    op.drop_column("transactions", "user_id")
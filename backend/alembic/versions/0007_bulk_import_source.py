@@ -0,0 +1,19 @@
+"""Add the bulk_import entry source."""
+
+from alembic import op
+
+revision = "0007_bulk_import_source"
+down_revision = "0006_transaction_user_id"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # A new enum value cannot be used in the transaction that adds it.
+    with op.get_context().autocommit_block():
+        op.execute("ALTER TYPE entry_source ADD VALUE IF NOT EXISTS 'bulk_import'")
+
+
+def downgrade() -> None:
+    # PostgreSQL cannot drop enum values; the unused label is left in place.
+    pass
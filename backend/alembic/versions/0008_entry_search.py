@@ -0,0 +1,54 @@
+"""Full-text search document for entries."""
+
+import sqlalchemy as sa
+
+from alembic import op
+
+revision = "0008_entry_search"
+down_revision = "0007_bulk_import_source"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("entries", sa.Column("search_document", sa.Text(), nullable=True))
+    op.execute(
+        """
+        UPDATE entries
+        SET search_document = concat_ws(
+            E'\\n',
+            raw_text,
+            NULLIF(parser_output_json #>> '{post_processed,entry_summary}', ''),
+            (
+                SELECT string_agg(DISTINCT transactions.category, E'\\n')
+                FROM transactions
+                WHERE transactions.entry_id = entries.id AND transactions.is_deleted IS false
+            )
+        )
+        """
+    )
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.execute(
+        "ALTER TABLE entries ADD COLUMN search_vector tsvector GENERATED ALWAYS AS "
+        "(to_tsvector('simple', coalesce(search_document, ''))) STORED"
+    )
+    op.create_index(
+        "ix_entries_search_vector",
+        "entries",
+        ["search_vector"],
+        postgresql_using="gin",
+    )
+    op.create_index(
+        "ix_entries_search_document_trgm",
+        "entries",
+        ["search_document"],
+        postgresql_using="gin",
+        postgresql_ops={"search_document": "gin_trgm_ops"},
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_entries_search_document_trgm", table_name="entries")
+    op.drop_index("ix_entries_search_vector", table_name="entries")
+    op.drop_column("entries", "search_vector")
+    op.drop_column("entries", "search_document")
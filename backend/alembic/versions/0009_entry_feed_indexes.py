@@ -0,0 +1,40 @@
+"""Indexes for the keyset-paginated entries feed."""
+
+import sqlalchemy as sa
+
+from alembic import op
+
+revision = "0009_entry_feed_indexes"
+down_revision = "0008_entry_search"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_entries_user_created_at_id",
+            "entries",
+            ["user_id", sa.text("created_at DESC"), sa.text("id DESC")],
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            "ix_entries_user_status_created_at_id",
+            "entries",
+            ["user_id", "status", sa.text("created_at DESC"), sa.text("id DESC")],
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_entries_user_status_created_at_id",
+            table_name="entries",
+            postgresql_concurrently=True,
+        )
+        op.drop_index(
+            "ix_entries_user_created_at_id",
+            table_name="entries",
+            postgresql_concurrently=True,
+        )
@@ -0,0 +1,100 @@
+"""Move raw LLM output out of entries into a compressed side table."""
+
+import json
+import zlib
+
+import sqlalchemy as sa
+
+from alembic import op
+
+revision = "0010_entry_parser_outputs"
+down_revision = "0009_entry_feed_indexes"
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 1000
+
+
+def upgrade() -> None:
+    op.create_table(
+        "entry_parser_outputs",
+        sa.Column(
+            "entry_id",
+            sa.Integer(),
+            sa.ForeignKey("entries.id", ondelete="CASCADE"),
+            primary_key=True,
+        ),
+        sa.Column("codec", sa.String(length=10), nullable=False),
+        sa.Column("payload", sa.LargeBinary(), nullable=False),
+        sa.Column("raw_bytes", sa.Integer(), nullable=False),
+    )
+
+    bind = op.get_bind()
+    outputs = sa.table(
+        "entry_parser_outputs",
+        sa.column("entry_id", sa.Integer()),
+        sa.column("codec", sa.String()),
+        sa.column("payload", sa.LargeBinary()),
+        sa.column("raw_bytes", sa.Integer()),
+    )
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.text(
+                "SELECT id, parser_output_json -> 'raw_output' FROM entries "
+                "WHERE id > :last_id AND parser_output_json ? 'raw_output' "
+                "ORDER BY id LIMIT :limit"
+            ),
+            {"last_id": last_id, "limit": BATCH_SIZE},
+        ).all()
+        if not rows:
+            break
+        records = []
+        for entry_id, raw_output in rows:
+            raw = json.dumps(raw_output, separators=(",", ":")).encode()
+            records.append(
+                {
+                    "entry_id": entry_id,
+                    "codec": "zlib",
+                    "payload": zlib.compress(raw, 6),
+                    "raw_bytes": len(raw),
+                }
+            )
+        bind.execute(outputs.insert(), records)
+        bind.execute(
+            sa.text(
+                "UPDATE entries SET parser_output_json = parser_output_json - 'raw_output' "
+                "WHERE id = ANY(:ids)"
+            ),
+            {"ids": [entry_id for entry_id, _ in rows]},
+        )
+        last_id = rows[-1][0]
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.text(
+                "SELECT entry_id, codec, payload FROM entry_parser_outputs "
+                "WHERE entry_id > :last_id ORDER BY entry_id LIMIT :limit"
+            ),
+            {"last_id": last_id, "limit": BATCH_SIZE},
+        ).all()
+        if not rows:
+            break
+        for entry_id, codec, payload in rows:
+            if codec != "zlib":
+                raise RuntimeError(f"cannot restore {codec} payloads; install its codec and re-run")
+            bind.execute(
+                sa.text(
+                    "UPDATE entries SET parser_output_json = "
+                    "coalesce(parser_output_json, '{}'::jsonb) "
+                    "|| jsonb_build_object('raw_output', CAST(:raw_output AS jsonb)) "
+                    "WHERE id = :entry_id"
+                ),
+                {"entry_id": entry_id, "raw_output": zlib.decompress(payload).decode()},
+            )
+        last_id = rows[-1][0]
+    op.drop_table("entry_parser_outputs")
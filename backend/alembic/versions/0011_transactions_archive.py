@@ -0,0 +1,71 @@
+"""Archive table for compacted soft-deleted transactions."""
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from alembic import op
+
+revision = "0011_transactions_archive"
+down_revision = "0010_entry_parser_outputs"
+branch_labels = None
+depends_on = None
+
+DELETED_PREDICATE = sa.text("is_deleted IS true")
+
+
+def upgrade() -> None:
+    transaction_direction_enum = postgresql.ENUM(
+        name="transaction_direction",
+        create_type=False,
+    )
+    transaction_type_enum = postgresql.ENUM(name="transaction_type", create_type=False)
+    op.create_table(
+        "transactions_archive",
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=False),
+        sa.Column("user_id", sa.String(length=64), nullable=False),
+        sa.Column("entry_id", sa.Integer(), nullable=False),
+        sa.Column("occurred_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("amount", sa.Numeric(12, 2), nullable=False),
+        sa.Column("currency", sa.String(length=3), nullable=False),
+        sa.Column("direction", transaction_direction_enum, nullable=False),
+        sa.Column("type", transaction_type_enum, nullable=False),
+        sa.Column("category", sa.String(length=50), nullable=False),
+        sa.Column("assumptions_json", postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+        sa.Column(
+            "archived_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+    )
+    op.create_index(
+        "ix_transactions_archive_user_occurred_at",
+        "transactions_archive",
+        ["user_id", "occurred_at"],
+    )
+    # Not CONCURRENTLY: transactions may be partitioned (0005), which does not allow it.
+    op.create_index(
+        "ix_transactions_deleted_updated_at_id",
+        "transactions",
+        ["updated_at", "id"],
+        postgresql_where=DELETED_PREDICATE,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_transactions_deleted_updated_at_id", table_name="transactions")
+    op.execute(
+        """
+        INSERT INTO transactions (
+            id, user_id, entry_id, occurred_at, created_at, updated_at, amount,
+            currency, direction, type, category, assumptions_json, is_deleted
+        )
+        SELECT
+            id, user_id, entry_id, occurred_at, created_at, updated_at, amount,
+            currency, direction, type, category, assumptions_json, true
+        FROM transactions_archive
+        """
+    )
+    op.drop_table("transactions_archive")
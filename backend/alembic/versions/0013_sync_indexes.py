@@ -0,0 +1,34 @@
+"""(user_id, updated_at, id) indexes for delta sync."""
+
+from alembic import op
+
+revision = "0013_sync_indexes"
+down_revision = "0012_idempotency_keys"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Not CONCURRENTLY: transactions may be partitioned (0005), which does not allow it.
+    op.create_index(
+        "ix_transactions_user_updated_at_id",
+        "transactions",
+        ["user_id", "updated_at", "id"],
+    )
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_entries_user_updated_at_id",
+            "entries",
+            ["user_id", "updated_at", "id"],
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_entries_user_updated_at_id",
+            table_name="entries",
+            postgresql_concurrently=True,
+        )
+    op.drop_index("ix_transactions_user_updated_at_id", table_name="transactions")
@@ -0,0 +1,22 @@
+"""Per-user change counters backing ETags."""
+
+import sqlalchemy as sa
+
+from alembic import op
+
+revision = "0014_user_change_counters"
+down_revision = "0013_sync_indexes"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "user_change_counters",
+        sa.Column("user_id", sa.String(length=64), primary_key=True),
+        sa.Column("version", sa.BigInteger(), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("user_change_counters")
@@ -0,0 +1,64 @@
+"""Monthly category budgets and running spend counters."""
+
+import sqlalchemy as sa
+
+from alembic import op
+
+revision = "0015_budgets"
+down_revision = "0014_user_change_counters"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "budgets",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("user_id", sa.String(length=64), nullable=False),
+        sa.Column("category", sa.String(length=50), nullable=False),
+        sa.Column("month", sa.String(length=7), nullable=False),
+        sa.Column("currency", sa.String(length=3), server_default="INR", nullable=False),
+        sa.Column("limit_amount", sa.Numeric(12, 2), nullable=False),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.UniqueConstraint("user_id", "category", "month", name="uq_budgets_scope"),
+    )
+    op.create_table(
+        "category_spend",
+        sa.Column("user_id", sa.String(length=64), primary_key=True),
+        sa.Column("category", sa.String(length=50), primary_key=True),
+        sa.Column("month", sa.String(length=7), primary_key=True),
+        sa.Column("currency", sa.String(length=3), primary_key=True),
+        sa.Column("spent", sa.Numeric(14, 2), nullable=False),
+        sa.Column("transaction_count", sa.Integer(), nullable=False),
+    )
+    op.execute(
+        """
+        INSERT INTO category_spend (user_id, category, month, currency, spent, transaction_count)
+        SELECT
+            user_id,
+            category,
+            to_char(occurred_at AT TIME ZONE 'UTC', 'YYYY-MM'),
+            currency,
+            sum(amount),
+            count(*)
+        FROM transactions
+        WHERE is_deleted IS false AND direction = 'outflow'
+        GROUP BY 1, 2, 3, 4
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("category_spend")
+    op.drop_table("budgets")
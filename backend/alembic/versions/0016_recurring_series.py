@@ -0,0 +1,67 @@
+"""Recurring transaction series and their scan state."""
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from alembic import op
+
+revision = "0016_recurring_series"
+down_revision = "0015_budgets"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "recurring_series",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("user_id", sa.String(length=64), nullable=False),
+        sa.Column(
+            "direction",
+            postgresql.ENUM(name="transaction_direction", create_type=False),
+            nullable=False,
+        ),
+        sa.Column("currency", sa.String(length=3), nullable=False),
+        sa.Column("category", sa.String(length=50), nullable=False),
+        sa.Column("cadence", sa.String(length=20), nullable=False),
+        sa.Column("period_days", sa.Float(), nullable=False),
+        sa.Column("amount", sa.Numeric(12, 2), nullable=False),
+        sa.Column("amount_min", sa.Numeric(12, 2), nullable=False),
+        sa.Column("amount_max", sa.Numeric(12, 2), nullable=False),
+        sa.Column("occurrences", sa.Integer(), nullable=False),
+        sa.Column("first_seen_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("last_seen_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("next_expected_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("confidence", sa.Float(), nullable=False),
+        sa.Column(
+            "detected_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+    )
+    op.create_index(
+        "ix_recurring_series_user_next_expected",
+        "recurring_series",
+        ["user_id", "next_expected_at"],
+    )
+    op.create_table(
+        "recurring_scan_state",
+        sa.Column("user_id", sa.String(length=64), primary_key=True),
+        sa.Column("analyzed_version", sa.BigInteger(), nullable=False),
+    )
+    # The job finds users through their change counters; users who have not
+    # written since counters were introduced get one so their history is scanned.
+    op.execute(
+        """
+        INSERT INTO user_change_counters (user_id, version)
+        SELECT DISTINCT user_id, 1 FROM transactions
+        ON CONFLICT (user_id) DO NOTHING
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("recurring_scan_state")
+    op.drop_index("ix_recurring_series_user_next_expected", table_name="recurring_series")
+    op.drop_table("recurring_series")
@@ -0,0 +1,58 @@
+"""Rolling category statistics and spending anomalies."""
+
+import sqlalchemy as sa
+
+from alembic import op
+
+revision = "0017_anomalies"
+down_revision = "0016_recurring_series"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "category_stats",
+        sa.Column("user_id", sa.String(length=64), primary_key=True),
+        sa.Column("category", sa.String(length=50), primary_key=True),
+        sa.Column("currency", sa.String(length=3), primary_key=True),
+        sa.Column("amount_count", sa.Integer(), nullable=False),
+        sa.Column("amount_mean", sa.Float(), nullable=False),
+        sa.Column("amount_var", sa.Float(), nullable=False),
+        sa.Column("gap_count", sa.Integer(), nullable=False),
+        sa.Column("gap_mean", sa.Float(), nullable=False),
+        sa.Column("gap_var", sa.Float(), nullable=False),
+        sa.Column("last_occurred_at", sa.DateTime(timezone=True), nullable=True),
+    )
+    op.create_table(
+        "anomalies",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("user_id", sa.String(length=64), nullable=False),
+        sa.Column("transaction_id", sa.Integer(), nullable=False),
+        sa.Column("kind", sa.String(length=20), nullable=False),
+        sa.Column("score", sa.Float(), nullable=False),
+        sa.Column("category", sa.String(length=50), nullable=False),
+        sa.Column("currency", sa.String(length=3), nullable=False),
+        sa.Column("amount", sa.Numeric(12, 2), nullable=False),
+        sa.Column("expected", sa.Float(), nullable=True),
+        sa.Column("occurred_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column(
+            "detected_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+    )
+    op.create_index(
+        "ix_anomalies_user_occurred_at_id",
+        "anomalies",
+        ["user_id", "occurred_at", "id"],
+    )
+    op.create_index("ix_anomalies_transaction_id", "anomalies", ["transaction_id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_anomalies_transaction_id", table_name="anomalies")
+    op.drop_index("ix_anomalies_user_occurred_at_id", table_name="anomalies")
+    op.drop_table("anomalies")
+    op.drop_table("category_stats")
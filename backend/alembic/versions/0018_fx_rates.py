@@ -0,0 +1,30 @@
+"""Daily foreign exchange rates."""
+
+import sqlalchemy as sa
+
+from alembic import op
+
+revision = "0018_fx_rates"
+down_revision = "0017_anomalies"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "fx_rates",
+        sa.Column("base", sa.String(length=3), primary_key=True),
+        sa.Column("quote", sa.String(length=3), primary_key=True),
+        sa.Column("rate_date", sa.Date(), primary_key=True),
+        sa.Column("rate", sa.Numeric(18, 8), nullable=False),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("fx_rates")
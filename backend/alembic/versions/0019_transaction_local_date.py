@@ -0,0 +1,89 @@
+"""Per-user timezone and a stored local date on transactions."""
+
+import sqlalchemy as sa
+
+from alembic import op
+
+revision = "0019_transaction_local_date"
+down_revision = "0018_fx_rates"
+branch_labels = None
+depends_on = None
+
+LIVE_PREDICATE = sa.text("is_deleted IS false")
+# Until now every time was resolved in this zone, and no user has a preference yet.
+BACKFILL_TIMEZONE = "Asia/Kolkata"
+
+
+def upgrade() -> None:
+    op.create_table(
+        "user_preferences",
+        sa.Column("user_id", sa.String(length=64), primary_key=True),
+        sa.Column("timezone", sa.String(length=64), nullable=False),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+    )
+
+    op.add_column("transactions", sa.Column("local_date", sa.Date(), nullable=True))
+    op.add_column("transactions_archive", sa.Column("local_date", sa.Date(), nullable=True))
+    for table in ("transactions", "transactions_archive"):
+        op.execute(
+            f"UPDATE {table} "
+            f"SET local_date = (occurred_at AT TIME ZONE '{BACKFILL_TIMEZONE}')::date"
+        )
+    op.alter_column("transactions", "local_date", nullable=False)
+
+    # Not CONCURRENTLY: transactions may be partitioned (0005), which does not allow it.
+    op.drop_index("ix_transactions_live_user_summary", table_name="transactions")
+    op.create_index(
+        "ix_transactions_live_user_local_date",
+        "transactions",
+        ["user_id", "local_date"],
+        postgresql_include=["direction", "category", "currency", "amount", "id"],
+        postgresql_where=LIVE_PREDICATE,
+    )
+
+    # Spend counters were keyed by UTC month; rebuild them by local month.
+    op.execute("DELETE FROM category_spend")
+    op.execute(
+        """
+        INSERT INTO category_spend (user_id, category, month, currency, spent, transaction_count)
+        SELECT user_id, category, to_char(local_date, 'YYYY-MM'), currency, sum(amount), count(*)
+        FROM transactions
+        WHERE is_deleted IS false AND direction = 'outflow'
+        GROUP BY 1, 2, 3, 4
+        """
+    )
+
+
+def downgrade() -> None:
+    op.execute("DELETE FROM category_spend")
+    op.execute(
+        """
+        INSERT INTO category_spend (user_id, category, month, currency, spent, transaction_count)
+        SELECT
+            user_id,
+            category,
+            to_char(occurred_at AT TIME ZONE 'UTC', 'YYYY-MM'),
+            currency,
+            sum(amount),
+            count(*)
+        FROM transactions
+        WHERE is_deleted IS false AND direction = 'outflow'
+        GROUP BY 1, 2, 3, 4
+        """
+    )
+    op.drop_index("ix_transactions_live_user_local_date", table_name="transactions")
+    op.create_index(
+        "ix_transactions_live_user_summary",
+        "transactions",
+        ["user_id", "occurred_at"],
+        postgresql_include=["direction", "category", "amount", "id"],
+        postgresql_where=LIVE_PREDICATE,
+    )
+    op.drop_column("transactions_archive", "local_date")
+    op.drop_column("transactions", "local_date")
+    op.drop_table("user_preferences")
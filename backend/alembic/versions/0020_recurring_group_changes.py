@@ -0,0 +1,51 @@
+"""Track changed transaction groups for recurring detection instead of user versions."""
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from alembic import op
+
+revision = "0020_recurring_group_changes"
+down_revision = "0019_transaction_local_date"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "recurring_group_changes",
+        sa.Column("user_id", sa.String(length=64), nullable=False),
+        sa.Column(
+            "direction",
+            postgresql.ENUM(name="transaction_direction", create_type=False),
+            nullable=False,
+        ),
+        sa.Column("currency", sa.String(length=3), nullable=False),
+        sa.Column("category", sa.String(length=50), nullable=False),
+        sa.Column("version", sa.BigInteger(), nullable=False),
+        sa.PrimaryKeyConstraint("user_id", "direction", "currency", "category"),
+    )
+    # Users whose series are behind their change counter get all their groups
+    # queued, so nothing the old job had still to pick up is lost.
+    op.execute(
+        """
+        INSERT INTO recurring_group_changes (user_id, direction, currency, category, version)
+        SELECT DISTINCT t.user_id, t.direction, t.currency, t.category, 1
+        FROM transactions AS t
+        JOIN user_change_counters AS c ON c.user_id = t.user_id
+        LEFT JOIN recurring_scan_state AS s ON s.user_id = t.user_id
+        WHERE t.is_deleted IS false
+          AND (s.analyzed_version IS NULL OR s.analyzed_version < c.version)
+        """
+    )
+    op.drop_table("recurring_scan_state")
+
+
+def downgrade() -> None:
+    # Without scan state the previous job re-analyses every user once.
+    op.create_table(
+        "recurring_scan_state",
+        sa.Column("user_id", sa.String(length=64), primary_key=True),
+        sa.Column("analyzed_version", sa.BigInteger(), nullable=False),
+    )
+    op.drop_table("recurring_group_changes")
@@ -0,0 +1,128 @@
+"""Compare the ORM and column-projection read paths behind GET /v1/transactions.
+
+Seeds a temporary SQLite database with one page worth of transactions and
+times loading plus serializing that page both ways:
+
+    python -m benchmarks.list_transactions --rows 500 --repeat 50
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+from collections.abc import Awaitable, Callable
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite:///:memory:")
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from src.api.v1.schemas import TransactionOut, TransactionsResponse, transaction_out_from_row
+from src.models import Base, Entry, Transaction
+from src.models.enums import EntrySource, EntryStatus, TransactionDirection, TransactionType
+from src.services import list_transaction_rows, list_transactions
+
+USER_ID = "bench-user"
+
+
+async def _seed(session: AsyncSession, rows: int) -> None:
+    entry = Entry(
+        user_id=USER_ID,
+        raw_text="benchmark",
+        source=EntrySource.manual_text,
+        status=EntryStatus.confirmed,
+    )
+    session.add(entry)
+    await session.flush()
+    base = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    session.add_all(
+        Transaction(
+            user_id=USER_ID,
+            entry_id=entry.id,
+            occurred_at=base + timedelta(minutes=n),
+            amount=Decimal(n % 5000) / 100,
+            currency="INR",
+            direction=TransactionDirection.outflow,
+            type=TransactionType.expense,
+            category="Food & Drinks",
+            assumptions_json=[],
+        )
+        for n in range(rows)
+    )
+    await session.commit()
+
+
+async def _orm_page(session: AsyncSession, rows: int) -> bytes:
+    items = await list_transactions(
+        session, user_id=USER_ID, from_date=None, to_date=None, limit=rows, offset=0
+    )
+    response = TransactionsResponse(
+        items=[TransactionOut.model_validate(item) for item in items],
+        total_count=len(items),
+        limit=rows,
+        offset=0,
+    )
+    return response.model_dump_json().encode()
+
+
+async def _projection_page(session: AsyncSession, rows: int) -> bytes:
+    records = await list_transaction_rows(
+        session, user_id=USER_ID, from_date=None, to_date=None, limit=rows, offset=0
+    )
+    response = TransactionsResponse.model_construct(
+        items=[transaction_out_from_row(record) for record in records],
+        total_count=len(records),
+        limit=rows,
+        offset=0,
+    )
+    return response.model_dump_json().encode()
+
+
+async def _time(
+    sessions: async_sessionmaker[AsyncSession],
+    page: Callable[[AsyncSession, int], Awaitable[bytes]],
+    rows: int,
+    repeat: int,
+) -> list[float]:
+    timings = []
+    for _ in range(repeat):
+        async with sessions() as session:
+            started = time.perf_counter()
+            await page(session, rows)
+            timings.append((time.perf_counter() - started) * 1000)
+    return timings
+
+
+async def run(rows: int, repeat: int) -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_async_engine(f"sqlite+aiosqlite:///{directory}/bench.db")
+        async with engine.begin() as connection:
+            await connection.run_sync(Base.metadata.create_all)
+        sessions = async_sessionmaker(engine, expire_on_commit=False)
+        async with sessions() as session:
+            await _seed(session, rows)
+
+        for label, page in (("orm", _orm_page), ("projection", _projection_page)):
+            timings = await _time(sessions, page, rows, repeat)
+            print(
+                f"{label:<11} median {statistics.median(timings):7.2f} ms  "
+                f"p95 {sorted(timings)[int(len(timings) * 0.95) - 1]:7.2f} ms"
+            )
+        await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+    asyncio.run(run(args.rows, args.repeat))
+
+
+if __name__ == "__main__":
+    main()
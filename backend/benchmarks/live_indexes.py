@@ -0,0 +1,130 @@
+"""Compare live-transaction query plans with and without partial indexes.
+
+Seeds a scratch schema on the PostgreSQL database in DATABASE_URL, runs
+EXPLAIN (ANALYZE, BUFFERS) for the feed, entry and summary queries, adds the
+partial indexes from migration 0004 and runs them again. The scratch schema
+is dropped afterwards; application tables are never touched.
+
+    DATABASE_URL=postgresql://... python -m benchmarks.live_indexes --rows 3000000
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+from typing import Any
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection, create_async_engine
+
+from src.config import get_settings
+
+SCHEMA = "bench_live_indexes"
+
+SEED_SQL = f"""
+CREATE TABLE {SCHEMA}.transactions (
+    id bigint PRIMARY KEY,
+    entry_id integer NOT NULL,
+    occurred_at timestamptz NOT NULL,
+    amount numeric(12, 2) NOT NULL,
+    direction text NOT NULL,
+    category text NOT NULL,
+    is_deleted boolean NOT NULL
+);
+INSERT INTO {SCHEMA}.transactions
+SELECT
+    n,
+    n / 3,
+    timestamptz '2020-01-01' + (n % 2200) * interval '1 day' + (n % 86400) * interval '1 second',
+    ((n * 7919) % 500000) / 100.0,
+    CASE WHEN n % 10 = 0 THEN 'inflow' ELSE 'outflow' END,
+    (ARRAY['Food & Drinks', 'Transport', 'Bills', 'Shopping', 'Income'])[1 + n % 5],
+    n % 4 = 0
+FROM generate_series(1, :rows) AS n;
+CREATE INDEX ON {SCHEMA}.transactions (entry_id);
+CREATE INDEX ON {SCHEMA}.transactions (occurred_at);
+"""
+
+PARTIAL_INDEX_SQL = f"""
+CREATE INDEX ON {SCHEMA}.transactions (occurred_at DESC, id) WHERE is_deleted IS false;
+CREATE INDEX ON {SCHEMA}.transactions (entry_id) WHERE is_deleted IS false;
+CREATE INDEX ON {SCHEMA}.transactions (occurred_at)
+    INCLUDE (direction, category, amount, id) WHERE is_deleted IS false;
+"""
+
+QUERIES = {
+    "feed": f"""
+        SELECT id FROM {SCHEMA}.transactions
+        WHERE is_deleted IS false
+        ORDER BY occurred_at DESC, id LIMIT 200
+    """,
+    "entry": f"""
+        SELECT id FROM {SCHEMA}.transactions
+        WHERE entry_id = 4242 AND is_deleted IS false
+    """,
+    "summary": f"""
+        SELECT direction, category, sum(amount), count(id) FROM {SCHEMA}.transactions
+        WHERE is_deleted IS false
+          AND occurred_at >= timestamptz '2024-03-01'
+          AND occurred_at < timestamptz '2024-04-01'
+        GROUP BY direction, category
+    """,
+}
+
+
+def _scan_nodes(plan: dict[str, Any]) -> list[str]:
+    nodes = []
+    if "Scan" in plan["Node Type"]:
+        nodes.append(f"{plan['Node Type']} ({plan.get('Index Name', plan.get('Relation Name'))})")
+    for child in plan.get("Plans", []):
+        nodes.extend(_scan_nodes(child))
+    return nodes
+
+
+async def _explain_all(connection: AsyncConnection, label: str) -> None:
+    for name, query in QUERIES.items():
+        result = await connection.execute(text(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {query}"))
+        raw = result.scalar_one()
+        payload = raw if isinstance(raw, list) else json.loads(raw)
+        plan = payload[0]
+        print(
+            f"[{label}] {name:<8} {plan['Execution Time']:>10.2f} ms  "
+            + ", ".join(_scan_nodes(plan["Plan"]))
+        )
+
+
+async def run(rows: int) -> None:
+    engine = create_async_engine(get_settings().database_url)
+    if engine.dialect.name != "postgresql":
+        raise SystemExit("This benchmark requires PostgreSQL")
+    async with engine.connect() as connection:
+        connection = await connection.execution_options(isolation_level="AUTOCOMMIT")
+        await connection.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+        await connection.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+        try:
+            for statement in SEED_SQL.split(";"):
+                if statement.strip():
+                    await connection.execute(text(statement), {"rows": rows})
+            await connection.execute(text(f"VACUUM ANALYZE {SCHEMA}.transactions"))
+            await _explain_all(connection, "baseline")
+
+            for statement in PARTIAL_INDEX_SQL.split(";"):
+                if statement.strip():
+                    await connection.execute(text(statement))
+            await connection.execute(text(f"VACUUM ANALYZE {SCHEMA}.transactions"))
+            await _explain_all(connection, "partial ")
+        finally:
+            await connection.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+    await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=3_000_000)
+    args = parser.parse_args()
+    asyncio.run(run(args.rows))
+
+
+if __name__ == "__main__":
+    main()
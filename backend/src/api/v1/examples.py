@@ -133,6 +133,7 @@ SUMMARY_RESPONSE_EXAMPLES = {
         "summary": "Monthly summary response",
         "value": {
             "month": "2025-01",
+            "currency": "INR",
             "total_inflow": 25000,
             "total_outflow": 5800,
             "net": 19200,
@@ -148,7 +149,42 @@ SUMMARY_RESPONSE_EXAMPLES = {
                     "total": 25000,
                 },
             ],
-            "transaction_count": 12,
+            "transaction_count": 13,
+            "unconverted": [
+                {
+                    "direction": "outflow",
+                    "currency": "THB",
+                    "total": 450,
+                    "transaction_count": 1,
+                }
+            ],
+        },
+    }
+}
+
+TRENDS_RESPONSE_EXAMPLES = {
+    "default": {
+        "summary": "Monthly outflow trend by category",
+        "value": {
+            "start": "2025-01-01",
+            "end": "2025-03-31",
+            "currency": "INR",
+            "granularity": "month",
+            "group_by": "category",
+            "buckets": ["2025-01-01", "2025-02-01", "2025-03-01"],
+            "series": [
+                {
+                    "key": "Food & Drinks",
+                    "totals": [1800, 0, 950],
+                    "counts": [6, 0, 3],
+                },
+                {
+                    "key": "Transport",
+                    "totals": [400, 620, 0],
+                    "counts": [2, 3, 0],
+                },
+            ],
+            "unconverted_currencies": [],
         },
     }
 }
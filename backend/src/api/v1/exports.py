@@ -0,0 +1,215 @@
+"""Streaming encoders for transaction exports."""
+
+from __future__ import annotations
+
+import csv
+import importlib.util
+import io
+import json
+from collections.abc import AsyncIterator, Callable, Mapping, Sequence
+from enum import Enum
+from typing import TYPE_CHECKING, Any
+
+from src.api.v1.schemas import transaction_out_from_row
+
+if TYPE_CHECKING:
+    import pyarrow as pa
+
+EXPORT_COLUMNS = (
+    "id",
+    "entry_id",
+    "occurred_time",
+    "created_time",
+    "modified_time",
+    "amount",
+    "currency",
+    "direction",
+    "type",
+    "category",
+    "assumptions",
+)
+
+RowBatches = AsyncIterator[Sequence[Mapping[Any, Any]]]
+
+
+# Rows buffered per Parquet row group; Arrow IPC batches follow the cursor batches.
+PARQUET_ROW_GROUP_ROWS = 64 * 1024
+
+
+class ExportFormat(str, Enum):
+    csv = "csv"
+    ndjson = "ndjson"
+    arrow = "arrow"
+    parquet = "parquet"
+
+
+COLUMNAR_FORMATS = frozenset({ExportFormat.arrow, ExportFormat.parquet})
+
+
+def export_available(export_format: ExportFormat) -> bool:
+    """Columnar formats need the optional `analytics` extra (pyarrow)."""
+    return export_format not in COLUMNAR_FORMATS or importlib.util.find_spec("pyarrow") is not None
+
+
+def _csv_record(row: Mapping[Any, Any]) -> list[Any]:
+    assumptions = row["assumptions_json"]
+    return [
+        row["id"],
+        row["entry_id"],
+        row["occurred_at"].isoformat(),
+        row["created_at"].isoformat(),
+        row["updated_at"].isoformat(),
+        row["amount"],
+        row["currency"],
+        getattr(row["direction"], "value", row["direction"]),
+        getattr(row["type"], "value", row["type"]),
+        row["category"],
+        json.dumps(assumptions) if assumptions is not None else "",
+    ]
+
+
+async def encode_csv(batches: RowBatches) -> AsyncIterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_COLUMNS)
+    async for batch in batches:
+        writer.writerows(_csv_record(row) for row in batch)
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+
+async def encode_ndjson(batches: RowBatches) -> AsyncIterator[bytes]:
+    async for batch in batches:
+        lines = []
+        for row in batch:
+            item = transaction_out_from_row(row)
+            lines.append(item.__pydantic_serializer__.to_json(item))
+        yield b"\n".join(lines) + b"\n"
+
+
+def _value(item: Any) -> Any:
+    return getattr(item, "value", item)
+
+
+def arrow_schema() -> pa.Schema:
+    import pyarrow as pa
+
+    timestamp = pa.timestamp("us", tz="UTC")
+    label = pa.dictionary(pa.int32(), pa.string())
+    return pa.schema(
+        [
+            pa.field("id", pa.int64(), nullable=False),
+            pa.field("entry_id", pa.int64(), nullable=False),
+            pa.field("occurred_time", timestamp, nullable=False),
+            pa.field("created_time", timestamp, nullable=False),
+            pa.field("modified_time", timestamp, nullable=False),
+            pa.field("amount", pa.decimal128(12, 2), nullable=False),
+            pa.field("currency", label, nullable=False),
+            pa.field("direction", label, nullable=False),
+            pa.field("type", label, nullable=False),
+            pa.field("category", label, nullable=False),
+            pa.field("assumptions", pa.string()),
+        ]
+    )
+
+
+def arrow_record_batch(batch: Sequence[Mapping[Any, Any]], schema: pa.Schema) -> pa.RecordBatch:
+    """Transpose one cursor batch into typed Arrow columns."""
+    import pyarrow as pa
+
+    def column(name: str, field: str) -> pa.Array:
+        values = [row[name] for row in batch]
+        if pa.types.is_dictionary(schema.field(field).type):
+            return pa.array([_value(value) for value in values], pa.string()).dictionary_encode()
+        return pa.array(values, schema.field(field).type)
+
+    assumptions = [row["assumptions_json"] for row in batch]
+    return pa.RecordBatch.from_arrays(
+        [
+            column("id", "id"),
+            column("entry_id", "entry_id"),
+            column("occurred_at", "occurred_time"),
+            column("created_at", "created_time"),
+            column("updated_at", "modified_time"),
+            column("amount", "amount"),
+            column("currency", "currency"),
+            column("direction", "direction"),
+            column("type", "type"),
+            column("category", "category"),
+            pa.array(
+                [json.dumps(value) if value is not None else None for value in assumptions],
+                pa.string(),
+            ),
+        ],
+        schema=schema,
+    )
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file that hands accumulated bytes back to the response stream."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._chunks: list[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data: Any) -> int:
+        chunk = bytes(data)
+        self._chunks.append(chunk)
+        self._position += len(chunk)
+        return len(chunk)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+async def encode_arrow(batches: RowBatches) -> AsyncIterator[bytes]:
+    import pyarrow as pa
+
+    schema = arrow_schema()
+    sink = _ChunkSink()
+    with pa.ipc.new_stream(sink, schema) as writer:
+        async for batch in batches:
+            writer.write_batch(arrow_record_batch(batch, schema))
+            yield sink.drain()
+    yield sink.drain()
+
+
+async def encode_parquet(batches: RowBatches) -> AsyncIterator[bytes]:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = arrow_schema()
+    sink = _ChunkSink()
+    pending: list[pa.RecordBatch] = []
+    pending_rows = 0
+    with pq.ParquetWriter(sink, schema, compression="zstd") as writer:
+        async for batch in batches:
+            pending.append(arrow_record_batch(batch, schema))
+            pending_rows += len(batch)
+            if pending_rows >= PARQUET_ROW_GROUP_ROWS:
+                writer.write_table(pa.Table.from_batches(pending, schema))
+                pending, pending_rows = [], 0
+                yield sink.drain()
+        if pending:
+            writer.write_table(pa.Table.from_batches(pending, schema))
+    yield sink.drain()
+
+
+EXPORT_ENCODERS: dict[ExportFormat, tuple[str, Callable[[RowBatches], AsyncIterator[bytes]]]] = {
+    ExportFormat.csv: ("text/csv; charset=utf-8", encode_csv),
+    ExportFormat.ndjson: ("application/x-ndjson", encode_ndjson),
+    ExportFormat.arrow: ("application/vnd.apache.arrow.stream", encode_arrow),
+    ExportFormat.parquet: ("application/vnd.apache.parquet", encode_parquet),
+}
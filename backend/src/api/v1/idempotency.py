@@ -0,0 +1,109 @@
+"""Idempotency-Key handling for v1 write endpoints."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable, Callable
+
+from fastapi import HTTPException, status
+from fastapi.responses import Response
+from pydantic import BaseModel
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.config import get_settings
+from src.services import (
+    IdempotencyKeyInProgress,
+    IdempotencyKeyReused,
+    StoredResponse,
+    claim_idempotency_key,
+    complete_idempotency_key,
+    release_idempotency_key,
+    request_fingerprint,
+    wait_for_idempotent_response,
+)
+
+IDEMPOTENCY_KEY_HEADER = "Idempotency-Key"
+REPLAYED_HEADER = "Idempotent-Replayed"
+
+# Stores the response on the session that holds the handler's writes; the
+# handler calls it before committing them, so both land in one transaction.
+ResponseRecorder = Callable[[AsyncSession, Response], Awaitable[None]]
+
+
+async def _record_nothing(session: AsyncSession, response: Response) -> None:
+    return None
+
+
+async def run_idempotent(
+    session: AsyncSession,
+    *,
+    key: str | None,
+    endpoint: str,
+    payload: BaseModel,
+    handler: Callable[[ResponseRecorder], Awaitable[Response]],
+) -> Response:
+    """Run `handler` once per Idempotency-Key and replay its response on retries.
+
+    `handler` must pass its response to the recorder before committing its
+    writes, so a crash cannot leave the writes without a stored response. A
+    duplicate that arrives while the first request is still running waits for
+    it (up to IDEMPOTENCY_WAIT_SECONDS) instead of running the handler again.
+    Failed or cancelled requests release the key, so a retry runs for real.
+    """
+    if key is None:
+        return await handler(_record_nothing)
+    settings = get_settings()
+    user_id = settings.default_user_id
+    request_hash = request_fingerprint(endpoint, payload.__pydantic_serializer__.to_json(payload))
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + settings.idempotency_wait_seconds
+    while not await claim_idempotency_key(
+        session,
+        user_id=user_id,
+        key=key,
+        endpoint=endpoint,
+        request_hash=request_hash,
+    ):
+        try:
+            stored = await wait_for_idempotent_response(
+                session,
+                user_id=user_id,
+                key=key,
+                request_hash=request_hash,
+                timeout=max(deadline - loop.time(), 0),
+            )
+        except IdempotencyKeyReused as exc:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_CONTENT,
+                detail=str(exc),
+            ) from exc
+        except IdempotencyKeyInProgress as exc:
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(exc)) from exc
+        if stored is not None:
+            return Response(
+                content=stored.body,
+                status_code=stored.status_code,
+                media_type="application/json",
+                headers={REPLAYED_HEADER: "true"},
+            )
+
+    async def record(write_session: AsyncSession, response: Response) -> None:
+        await complete_idempotency_key(
+            write_session,
+            user_id=user_id,
+            key=key,
+            response=StoredResponse(status_code=response.status_code, body=bytes(response.body)),
+            commit=False,
+        )
+
+    async def release() -> None:
+        await session.rollback()
+        await release_idempotency_key(session, user_id=user_id, key=key)
+
+    try:
+        return await handler(record)
+    except BaseException:
+        # Includes cancellation (the client went away); shielded so the release
+        # itself is not cancelled. A key whose response was stored is kept.
+        await asyncio.shield(release())
+        raise
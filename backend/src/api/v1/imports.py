@@ -0,0 +1,201 @@
+"""Streaming decoders and validation for bulk transaction imports."""
+
+from __future__ import annotations
+
+import codecs
+import csv
+import json
+from collections.abc import AsyncIterator
+from enum import Enum
+from typing import Any
+
+from pydantic import ValidationError
+
+from src.api.v1.schemas import ImportRowError, TransactionInput
+
+IMPORT_BATCH_SIZE = 5000
+MAX_REPORTED_ERRORS = 100
+# Longest line (NDJSON) or record (CSV, quoted newlines included) accepted, in
+# characters; bounds what is buffered while waiting for the end of a row.
+MAX_RECORD_LENGTH = 1 << 20
+REQUIRED_CSV_COLUMNS = frozenset({"amount", "direction", "type", "category"})
+
+
+class ImportFormat(str, Enum):
+    csv = "csv"
+    ndjson = "ndjson"
+
+
+class ImportFormatError(ValueError):
+    """The body cannot be read as the declared format at all."""
+
+
+class ImportReport:
+    def __init__(self, max_errors: int = MAX_REPORTED_ERRORS) -> None:
+        self.imported = 0
+        self.rejected = 0
+        self.errors: list[ImportRowError] = []
+        self._max_errors = max_errors
+
+    def reject(self, row: int, message: str) -> None:
+        self.rejected += 1
+        if len(self.errors) < self._max_errors:
+            self.errors.append(ImportRowError(row=row, message=message))
+
+
+def _too_long() -> ImportFormatError:
+    return ImportFormatError(f"a row is longer than {MAX_RECORD_LENGTH} characters")
+
+
+async def _text_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """Physical lines of the body, split as chunks arrive.
+
+    Only newly decoded text is split; an unterminated tail is kept in parts
+    and joined once its line ends, so no text is scanned twice.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    pending: list[str] = []
+    pending_length = 0
+    try:
+        async for chunk in chunks:
+            *lines, tail = decoder.decode(chunk).split("\n")
+            for line in lines:
+                if pending:
+                    line = "".join(pending) + line
+                    pending, pending_length = [], 0
+                if len(line) > MAX_RECORD_LENGTH:
+                    raise _too_long()
+                yield line + "\n"
+            if tail:
+                pending.append(tail)
+                pending_length += len(tail)
+                if pending_length > MAX_RECORD_LENGTH:
+                    raise _too_long()
+        pending.append(decoder.decode(b"", final=True))
+    except UnicodeDecodeError as exc:
+        raise ImportFormatError("body is not valid UTF-8") from exc
+    line = "".join(pending)
+    if len(line) > MAX_RECORD_LENGTH:
+        raise _too_long()
+    if line:
+        yield line
+
+
+async def _csv_records(lines: AsyncIterator[str]) -> AsyncIterator[str]:
+    """Group physical lines into CSV records; quoted fields may span lines.
+
+    A record ends at a line break outside quotes, i.e. once the quotes seen so
+    far are balanced; only each new line's quotes are counted.
+    """
+    record: list[str] = []
+    length = 0
+    in_quotes = False
+    async for line in lines:
+        record.append(line)
+        length += len(line)
+        if length > MAX_RECORD_LENGTH:
+            raise _too_long()
+        in_quotes ^= line.count('"') % 2 == 1
+        if not in_quotes:
+            yield "".join(record)
+            record, length = [], 0
+    if record:
+        yield "".join(record)
+
+
+def _clean(record: dict[str, Any]) -> dict[str, Any]:
+    # Exports name the column assumptions_json; accept it so exports round-trip.
+    if "assumptions" not in record and "assumptions_json" in record:
+        record["assumptions"] = record.pop("assumptions_json")
+    return {key: value for key, value in record.items() if value not in (None, "")}
+
+
+async def read_csv(
+    chunks: AsyncIterator[bytes],
+) -> AsyncIterator[tuple[int, dict[str, Any] | str]]:
+    header: list[str] | None = None
+    row = 0
+    async for text in _csv_records(_text_lines(chunks)):
+        if not text.strip():
+            continue
+        values = next(csv.reader([text]))
+        if header is None:
+            header = [name.strip().lower() for name in values]
+            missing = set(REQUIRED_CSV_COLUMNS - set(header))
+            if "occurred_time" not in header and "occurred_at" not in header:
+                missing.add("occurred_time")
+            if missing:
+                raise ImportFormatError(f"missing CSV columns: {', '.join(sorted(missing))}")
+            continue
+        row += 1
+        if len(values) != len(header):
+            yield row, f"expected {len(header)} columns, got {len(values)}"
+            continue
+        record: dict[str, Any] = dict(zip(header, values, strict=True))
+        assumptions = record.get("assumptions") or record.get("assumptions_json")
+        if assumptions:
+            try:
+                record["assumptions"] = json.loads(assumptions)
+            except json.JSONDecodeError:
+                yield row, "assumptions: expected a JSON list"
+                continue
+            record.pop("assumptions_json", None)
+        yield row, _clean(record)
+    if header is None:
+        raise ImportFormatError("CSV body is empty")
+
+
+async def read_ndjson(
+    chunks: AsyncIterator[bytes],
+) -> AsyncIterator[tuple[int, dict[str, Any] | str]]:
+    row = 0
+    async for line in _text_lines(chunks):
+        if not line.strip():
+            continue
+        row += 1
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError as exc:
+            yield row, f"invalid JSON: {exc.msg}"
+            continue
+        if not isinstance(record, dict):
+            yield row, "expected a JSON object"
+            continue
+        yield row, _clean(record)
+
+
+def _error_message(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in item['loc']) or 'row'}: {item['msg']}"
+        for item in error.errors(include_url=False)
+    )
+
+
+async def validated_batches(
+    chunks: AsyncIterator[bytes],
+    import_format: ImportFormat,
+    report: ImportReport,
+    *,
+    batch_size: int = IMPORT_BATCH_SIZE,
+) -> AsyncIterator[list[TransactionInput]]:
+    """Validate rows against TransactionInput as they arrive.
+
+    Invalid rows are recorded on `report`; valid ones are yielded in batches of
+    at most `batch_size`, so memory is bounded by one batch.
+    """
+    records = read_csv(chunks) if import_format is ImportFormat.csv else read_ndjson(chunks)
+    batch: list[TransactionInput] = []
+    async for row, record in records:
+        if isinstance(record, str):
+            report.reject(row, record)
+            continue
+        try:
+            batch.append(TransactionInput.model_validate(record))
+        except ValidationError as exc:
+            report.reject(row, _error_message(exc))
+            continue
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
@@ -0,0 +1,53 @@
+"""Response classes for v1."""
+
+from __future__ import annotations
+
+from typing import Any
+
+from fastapi.responses import JSONResponse, Response
+from pydantic import BaseModel
+from pydantic_core import to_json
+
+# Clients may keep a copy but must revalidate it (cheaply, via If-None-Match) before use.
+CACHE_CONTROL = "private, no-cache"
+
+
+class PydanticJSONResponse(JSONResponse):
+    """JSON response rendered by pydantic-core straight from the model.
+
+    Routes return an instance of this class with the response model as
+    content, which bypasses FastAPI's response re-validation and
+    `jsonable_encoder` pass; the model's own serializer (field serializers
+    included) writes the bytes.
+    """
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, BaseModel):
+            return content.__pydantic_serializer__.to_json(content)
+        return to_json(content)
+
+
+def data_etag(version: int, revision: str | None = None) -> str:
+    """Strong ETag for a read whose content only changes with the user's data version.
+
+    `revision` identifies other inputs the content depends on, such as FX rates.
+    """
+    if revision is not None:
+        return f'"v{version}-{revision}"'
+    return f'"v{version}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [candidate.strip() for candidate in if_none_match.split(",")]
+    # If-None-Match uses the weak comparison, so W/ prefixes are ignored.
+    return any(candidate == "*" or candidate.removeprefix("W/") == etag for candidate in candidates)
+
+
+def etag_headers(etag: str) -> dict[str, str]:
+    return {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers=etag_headers(etag))
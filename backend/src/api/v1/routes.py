@@ -2,28 +2,12 @@
 
 from __future__ import annotations
 
-from datetime import date, datetime
-from zoneinfo import ZoneInfo
-from decimal import Decimal
+from datetime import date, datetime, timezone
 
-from fastapi import APIRouter, Body, Depends, HTTPException, Query, status
-from sqlalchemy import func, select
+from fastapi import APIRouter, Body, Depends, Header, HTTPException, Query, Request, status
+from fastapi.responses import Response, StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.config import get_settings
-from src.database import get_session
-from src.models.enums import EntryStatus, TransactionDirection
-from src.models.transaction import Transaction
-from src.services import (
-    EntryCreate,
-    TransactionCreate,
-    create_entry,
-    create_transactions,
-    get_entry,
-    list_transactions as list_transactions_service,
-    soft_delete_transactions_for_entry,
-    update_entry_status,
-)
 from src.api.v1.examples import (
     CONFIRM_REQUEST_EXAMPLES,
     CONFIRM_RESPONSE_EXAMPLES,
@@ -31,20 +15,102 @@ from src.api.v1.examples import (
     PARSE_RESPONSE_EXAMPLES,
     SUMMARY_RESPONSE_EXAMPLES,
     TRANSACTIONS_RESPONSE_EXAMPLES,
+    TRENDS_RESPONSE_EXAMPLES,
+)
+from src.api.v1.exports import EXPORT_ENCODERS, ExportFormat, export_available
+from src.api.v1.idempotency import IDEMPOTENCY_KEY_HEADER, ResponseRecorder, run_idempotent
+from src.api.v1.imports import ImportFormat, ImportFormatError, ImportReport, validated_batches
+from src.api.v1.responses import (
+    PydanticJSONResponse,
+    data_etag,
+    etag_headers,
+    etag_matches,
+    not_modified,
 )
-from src.parser.service import LLMParser, ParserError, get_parser
 from src.api.v1.schemas import (
+    MONTH_PATTERN,
+    AnomaliesResponse,
+    AnomalyOut,
+    BudgetEventOut,
+    BudgetIn,
+    BudgetOut,
+    BudgetsResponse,
+    BudgetStatusOut,
+    BudgetStatusResponse,
     CategorySummary,
     ConfirmRequest,
     ConfirmResponse,
+    EntriesResponse,
+    EntryFeedItem,
+    EntryOut,
+    ImportResponse,
+    MetricsResponse,
     ParsePreview,
     ParseRequest,
     ParseResponse,
+    PreferencesIn,
+    PreferencesOut,
+    RecurringResponse,
+    SearchHitOut,
+    SearchResponse,
     SummaryResponse,
+    SyncResponse,
+    TransactionOut,
     TransactionsResponse,
-    date_range,
+    TrendSeriesOut,
+    TrendsResponse,
+    UnconvertedTotal,
+    entry_fields,
     month_range,
+    recurring_series_out,
+    sync_entry_out_from_row,
+    transaction_out_from_row,
 )
+from src.config import get_settings
+from src.database import get_pool_stats, get_read_session, get_session, get_write_batcher
+from src.database.batching import WriteBatcher
+from src.models.enums import EntrySource, EntryStatus
+from src.parser.service import LLMParser, ParserError, get_parser
+from src.services import (
+    EntryCreate,
+    SyncPosition,
+    TransactionCreate,
+    TrendGranularity,
+    TrendGroupBy,
+    UnknownTimezone,
+    budget_events,
+    bulk_insert_transactions,
+    count_transactions,
+    create_entry,
+    create_transactions,
+    get_budget_statuses,
+    get_change_version,
+    get_entry,
+    get_sync_changes,
+    get_trends,
+    get_user_timezone,
+    is_active,
+    list_anomalies,
+    list_budgets,
+    list_entry_feed,
+    list_recurring_series,
+    list_transaction_rows,
+    load_parser_outputs,
+    observe_imported_transactions,
+    observe_transactions,
+    pending_spend_changes,
+    refresh_search_document,
+    search_entries,
+    set_user_timezone,
+    soft_delete_transactions_for_entry,
+    stream_transaction_rows,
+    update_entry_status,
+    upsert_budget,
+)
+from src.services.fx_service import get_fx_rate_cache
+from src.services.summary_cache import get_summary_cache, month_key
+from src.services.summary_service import get_month_summary
+from src.utils.helpers import decode_cursor, encode_cursor
 
 router = APIRouter()
 
@@ -54,8 +120,16 @@ def health_check() -> dict[str, str]:
     return {"status": "ok"}
 
 
+@router.get("/metrics", response_model=MetricsResponse, tags=["health"])
+def get_metrics() -> MetricsResponse:
+    return MetricsResponse.model_validate(
+        {"pools": get_pool_stats(), "summary_cache": get_summary_cache().stats()}
+    )
+
+
 @router.post(
     "/parse",
+    response_class=PydanticJSONResponse,
     response_model=ParseResponse,
     status_code=status.HTTP_201_CREATED,
     responses={
@@ -69,9 +143,32 @@ async def parse_text(
     payload: ParseRequest = Body(..., examples=PARSE_REQUEST_EXAMPLES),
     session: AsyncSession = Depends(get_session),
     parser: LLMParser = Depends(get_parser),
-) -> ParseResponse:
+    batcher: WriteBatcher | None = Depends(get_write_batcher),
+    idempotency_key: str | None = Header(
+        default=None,
+        alias=IDEMPOTENCY_KEY_HEADER,
+        min_length=1,
+        max_length=255,
+    ),
+) -> Response:
+    return await run_idempotent(
+        session,
+        key=idempotency_key,
+        endpoint="parse",
+        payload=payload,
+        handler=lambda record: _parse_text(payload, session, parser, batcher, record),
+    )
+
+
+async def _parse_text(
+    payload: ParseRequest,
+    session: AsyncSession,
+    parser: LLMParser,
+    batcher: WriteBatcher | None,
+    record: ResponseRecorder,
+) -> Response:
     settings = get_settings()
-    tzinfo = ZoneInfo("Asia/Kolkata")
+    tzinfo = await get_user_timezone(session, settings.default_user_id)
     reference_datetime = payload.reference_datetime
     if reference_datetime is None:
         reference_datetime = datetime.now(tzinfo)
@@ -95,44 +192,65 @@ async def parse_text(
         needs_confirmation = True
     preview_json["needs_confirmation"] = needs_confirmation
     entry_status = EntryStatus.pending_confirmation if needs_confirmation else EntryStatus.confirmed
-    entry = await create_entry(
-        session,
-        entry=EntryCreate(
-            user_id=settings.default_user_id,
-            raw_text=payload.raw_text,
-            status=entry_status,
-            parser_output_json={
-                "raw_output": result.raw_output,
-                "post_processed": preview_json,
-            },
-            parser_version=result.parser_version,
-        ),
+    entry_create = EntryCreate(
+        user_id=settings.default_user_id,
+        raw_text=payload.raw_text,
+        status=entry_status,
+        parser_output_json={
+            "raw_output": result.raw_output,
+            "post_processed": preview_json,
+        },
+        parser_version=result.parser_version,
     )
-    if not needs_confirmation and preview.transactions:
-        occurred_at = preview.occurred_time or reference_datetime
-        transaction_inputs = [
-            TransactionCreate(
-                entry_id=entry.id,
-                occurred_at=occurred_at,
-                amount=item.amount,
-                currency=item.currency,
-                direction=item.direction,
-                type=item.type,
-                category=item.category,
-                assumptions_json=item.assumptions,
+    occurred_at = preview.occurred_time or reference_datetime
+
+    async def write_entry(write_session: AsyncSession) -> Response:
+        entry = await create_entry(write_session, entry=entry_create, commit=False)
+        if not needs_confirmation and preview.transactions:
+            transaction_inputs = [
+                TransactionCreate(
+                    entry_id=entry.id,
+                    user_id=entry.user_id,
+                    occurred_at=occurred_at,
+                    amount=item.amount,
+                    currency=item.currency,
+                    direction=item.direction,
+                    type=item.type,
+                    category=item.category,
+                    assumptions_json=item.assumptions,
+                )
+                for item in preview.transactions
+            ]
+            transactions = await create_transactions(
+                write_session,
+                items=transaction_inputs,
+                commit=False,
             )
-            for item in preview.transactions
-        ]
-        await create_transactions(session, items=transaction_inputs)
-    return ParseResponse(
-        entry_id=entry.id,
-        status=entry.status,
-        **preview.model_dump(mode="json"),
-    )
+            await observe_transactions(write_session, transactions)
+        response = PydanticJSONResponse(
+            ParseResponse(
+                entry_id=entry.id,
+                status=entry.status,
+                **preview.model_dump(mode="json"),
+            ),
+            status_code=status.HTTP_201_CREATED,
+        )
+        await record(write_session, response)
+        return response
+
+    # The entry, its transactions and the idempotent response commit together:
+    # in a batch shared with concurrent parses when group commit is on, else
+    # on the request session.
+    if batcher is not None:
+        return await batcher.submit(write_entry)
+    response = await write_entry(session)
+    await session.commit()
+    return response
 
 
 @router.post(
     "/entries/confirm",
+    response_class=PydanticJSONResponse,
     response_model=ConfirmResponse,
     status_code=status.HTTP_201_CREATED,
     responses={
@@ -145,7 +263,27 @@ async def parse_text(
 async def confirm_entry(
     payload: ConfirmRequest = Body(..., examples=CONFIRM_REQUEST_EXAMPLES),
     session: AsyncSession = Depends(get_session),
-) -> ConfirmResponse:
+    idempotency_key: str | None = Header(
+        default=None,
+        alias=IDEMPOTENCY_KEY_HEADER,
+        min_length=1,
+        max_length=255,
+    ),
+) -> Response:
+    return await run_idempotent(
+        session,
+        key=idempotency_key,
+        endpoint="entries/confirm",
+        payload=payload,
+        handler=lambda record: _confirm_entry(payload, session, record),
+    )
+
+
+async def _confirm_entry(
+    payload: ConfirmRequest,
+    session: AsyncSession,
+    record: ResponseRecorder,
+) -> Response:
     settings = get_settings()
     async with session.begin():
         entry = await get_entry(session, payload.entry_id)
@@ -158,6 +296,7 @@ async def confirm_entry(
         transaction_inputs = [
             TransactionCreate(
                 entry_id=entry.id,
+                user_id=entry.user_id,
                 occurred_at=item.occurred_time,
                 amount=item.amount,
                 currency=item.currency,
@@ -169,7 +308,7 @@ async def confirm_entry(
             for item in payload.transactions
         ]
 
-        await soft_delete_transactions_for_entry(
+        replaced = await soft_delete_transactions_for_entry(
             session,
             entry_id=entry.id,
             commit=False,
@@ -179,6 +318,12 @@ async def confirm_entry(
             items=transaction_inputs,
             commit=False,
         )
+        await observe_transactions(session, transactions, replaced=replaced)
+        parser_output = await refresh_search_document(
+            session,
+            entry,
+            categories=[item.category for item in transaction_inputs],
+        )
         await update_entry_status(
             session,
             entry=entry,
@@ -189,12 +334,76 @@ async def confirm_entry(
         await session.refresh(entry)
         for transaction in transactions:
             await session.refresh(transaction)
+        # Net of the soft-delete and the re-insert, so an edit that keeps the
+        # amount unchanged does not re-announce thresholds.
+        events = await budget_events(session, pending_spend_changes(session))
+        response = PydanticJSONResponse(
+            ConfirmResponse(
+                entry=EntryOut(**entry_fields(entry, parser_output=parser_output)),
+                transactions=transactions,
+                budget_events=[BudgetEventOut.model_validate(event) for event in events],
+            ),
+            status_code=status.HTTP_201_CREATED,
+        )
+        await record(session, response)
+    return response
+
+
+@router.get(
+    "/entries",
+    response_class=PydanticJSONResponse,
+    response_model=EntriesResponse,
+    tags=["entries"],
+)
+async def list_entries(
+    entry_status: EntryStatus | None = Query(default=None, alias="status"),
+    limit: int = Query(default=50, ge=1, le=200),
+    cursor: str | None = Query(default=None),
+    include_parser_output: bool = Query(default=False),
+    session: AsyncSession = Depends(get_read_session),
+) -> PydanticJSONResponse:
+    after_id = None
+    if cursor is not None:
+        try:
+            (after_id,) = decode_cursor(cursor, size=1)
+            after_id = int(after_id)
+        except (TypeError, ValueError) as exc:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid cursor.",
+            ) from exc
 
-    return ConfirmResponse(entry=entry, transactions=transactions)
+    entries = await list_entry_feed(
+        session,
+        user_id=get_settings().default_user_id,
+        status=entry_status,
+        limit=limit + 1,
+        after_id=after_id,
+    )
+    next_cursor = None
+    if len(entries) > limit:
+        entries = entries[:limit]
+        next_cursor = encode_cursor(entries[-1].id)
+    parser_outputs = {}
+    if include_parser_output:
+        parser_outputs = await load_parser_outputs(session, [entry.id for entry in entries])
+    response = EntriesResponse(
+        items=[
+            EntryFeedItem(
+                **entry_fields(entry, parser_output=parser_outputs.get(entry.id)),
+                status=entry.status,
+                transactions=[TransactionOut.model_validate(item) for item in entry.transactions],
+            )
+            for entry in entries
+        ],
+        next_cursor=next_cursor,
+    )
+    return PydanticJSONResponse(response)
 
 
 @router.get(
     "/transactions",
+    response_class=PydanticJSONResponse,
     response_model=TransactionsResponse,
     responses={
         200: {
@@ -208,32 +417,415 @@ async def list_transactions(
     to_date: date | None = Query(default=None, alias="to"),
     limit: int = Query(default=200, ge=1, le=500),
     offset: int = Query(default=0, ge=0),
-    session: AsyncSession = Depends(get_session),
-) -> TransactionsResponse:
-    start, end = date_range(from_date, to_date)
-    items = await list_transactions_service(
+    session: AsyncSession = Depends(get_read_session),
+    if_none_match: str | None = Header(default=None),
+) -> Response:
+    user_id = get_settings().default_user_id
+    etag = data_etag(await get_change_version(session, user_id))
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    rows = await list_transaction_rows(
         session,
-        from_date=start,
-        to_date=end,
+        user_id=user_id,
+        from_date=from_date,
+        to_date=to_date,
         limit=limit,
         offset=offset,
     )
-    count_query = select(func.count(Transaction.id)).where(Transaction.is_deleted.is_(False))
-    if start:
-        count_query = count_query.where(Transaction.occurred_at >= start)
-    if end:
-        count_query = count_query.where(Transaction.occurred_at <= end)
-    total_count = await session.scalar(count_query)
-    return TransactionsResponse(
-        items=items,
-        total_count=int(total_count or 0),
+    total_count = await count_transactions(
+        session,
+        user_id=user_id,
+        from_date=from_date,
+        to_date=to_date,
+    )
+    response = TransactionsResponse.model_construct(
+        items=[transaction_out_from_row(row) for row in rows],
+        total_count=total_count,
         limit=limit,
         offset=offset,
     )
+    return PydanticJSONResponse(response, headers=etag_headers(etag))
+
+
+@router.post(
+    "/transactions/import",
+    response_class=PydanticJSONResponse,
+    response_model=ImportResponse,
+    status_code=status.HTTP_201_CREATED,
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {"text/csv": {}, "application/x-ndjson": {}},
+        }
+    },
+    tags=["transactions"],
+)
+async def import_transactions(
+    request: Request,
+    import_format: ImportFormat = Query(default=ImportFormat.csv, alias="format"),
+    session: AsyncSession = Depends(get_session),
+) -> PydanticJSONResponse:
+    settings = get_settings()
+    tzinfo = await get_user_timezone(session, settings.default_user_id)
+    report = ImportReport()
+    entry = await create_entry(
+        session,
+        entry=EntryCreate(
+            user_id=settings.default_user_id,
+            raw_text=f"Bulk import ({import_format.value})",
+            source=EntrySource.bulk_import,
+            status=EntryStatus.confirmed,
+        ),
+        commit=False,
+    )
+    try:
+        async for batch in validated_batches(request.stream(), import_format, report):
+            report.imported += await bulk_insert_transactions(
+                session,
+                items=[
+                    TransactionCreate(
+                        entry_id=entry.id,
+                        user_id=entry.user_id,
+                        occurred_at=(
+                            item.occurred_time
+                            if item.occurred_time.tzinfo
+                            else item.occurred_time.replace(tzinfo=tzinfo)
+                        ),
+                        amount=item.amount,
+                        currency=item.currency,
+                        direction=item.direction,
+                        type=item.type,
+                        category=item.category,
+                        assumptions_json=item.assumptions,
+                    )
+                    for item in batch
+                ],
+            )
+    except ImportFormatError as exc:
+        await session.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(exc),
+        ) from exc
+
+    if report.imported:
+        await observe_imported_transactions(session, user_id=entry.user_id, entry_id=entry.id)
+        await session.commit()
+    else:
+        await session.rollback()
+    response = ImportResponse(
+        entry_id=entry.id if report.imported else None,
+        imported=report.imported,
+        rejected=report.rejected,
+        errors=report.errors,
+    )
+    return PydanticJSONResponse(response, status_code=status.HTTP_201_CREATED)
+
+
+@router.get(
+    "/transactions/export",
+    response_class=StreamingResponse,
+    responses={
+        200: {
+            "content": {media_type.split(";")[0]: {} for media_type, _ in EXPORT_ENCODERS.values()},
+            "description": "Live transactions, oldest first.",
+        }
+    },
+    tags=["transactions"],
+)
+async def export_transactions(
+    export_format: ExportFormat = Query(default=ExportFormat.csv, alias="format"),
+    from_date: date | None = Query(default=None, alias="from"),
+    to_date: date | None = Query(default=None, alias="to"),
+    session: AsyncSession = Depends(get_read_session),
+) -> StreamingResponse:
+    if not export_available(export_format):
+        raise HTTPException(
+            status_code=status.HTTP_501_NOT_IMPLEMENTED,
+            detail=f"{export_format.value} export requires the 'analytics' extra (pyarrow).",
+        )
+    media_type, encode = EXPORT_ENCODERS[export_format]
+    # The body reads from `session` while streaming. FastAPI >= 0.118 closes yield
+    # dependencies only after the response is sent, so the cursor stays open until then.
+    batches = stream_transaction_rows(
+        session,
+        user_id=get_settings().default_user_id,
+        from_date=from_date,
+        to_date=to_date,
+    )
+    return StreamingResponse(
+        encode(batches),
+        media_type=media_type,
+        headers={
+            "Content-Disposition": f'attachment; filename="transactions.{export_format.value}"'
+        },
+    )
+
+
+@router.get(
+    "/search",
+    response_class=PydanticJSONResponse,
+    response_model=SearchResponse,
+    tags=["search"],
+)
+async def search(
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(default=20, ge=1, le=100),
+    cursor: str | None = Query(default=None),
+    session: AsyncSession = Depends(get_read_session),
+) -> PydanticJSONResponse:
+    after = None
+    if cursor is not None:
+        try:
+            score, entry_id = decode_cursor(cursor, size=2)
+            after = (float(score), int(entry_id))
+        except (TypeError, ValueError) as exc:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid cursor.",
+            ) from exc
+
+    hits = await search_entries(
+        session,
+        user_id=get_settings().default_user_id,
+        text=q,
+        limit=limit + 1,
+        after=after,
+    )
+    next_cursor = None
+    if len(hits) > limit:
+        hits = hits[:limit]
+        next_cursor = encode_cursor(hits[-1].score, hits[-1].entry_id)
+    return PydanticJSONResponse(
+        SearchResponse(
+            items=[SearchHitOut.model_validate(hit) for hit in hits],
+            next_cursor=next_cursor,
+        )
+    )
+
+
+@router.get(
+    "/sync",
+    response_class=PydanticJSONResponse,
+    response_model=SyncResponse,
+    tags=["sync"],
+)
+async def sync_changes(
+    since: str | None = Query(default=None, description="next_cursor of the previous sync"),
+    limit: int = Query(default=500, ge=1, le=2000),
+    # The primary, not a replica: replica lag could skip past rows not yet applied there.
+    session: AsyncSession = Depends(get_session),
+) -> PydanticJSONResponse:
+    position = None
+    if since is not None:
+        try:
+            transactions_at, transaction_id, entries_at, entry_id = decode_cursor(since, size=4)
+            position = SyncPosition(
+                transactions=(datetime.fromisoformat(transactions_at), int(transaction_id)),
+                entries=(datetime.fromisoformat(entries_at), int(entry_id)),
+            )
+        except (TypeError, ValueError) as exc:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid cursor.",
+            ) from exc
+
+    settings = get_settings()
+    changes = await get_sync_changes(
+        session,
+        user_id=settings.default_user_id,
+        since=position,
+        limit=limit,
+        safety_lag_seconds=settings.sync_safety_lag_seconds,
+        retention_days=settings.archive_retention_days,
+    )
+    transactions_key, entries_key = changes.position.transactions, changes.position.entries
+    response = SyncResponse.model_construct(
+        entries=[sync_entry_out_from_row(row) for row in changes.entries],
+        transactions=[transaction_out_from_row(row) for row in changes.transactions],
+        deleted_transaction_ids=changes.deleted_transaction_ids,
+        next_cursor=encode_cursor(
+            transactions_key[0].isoformat(),
+            transactions_key[1],
+            entries_key[0].isoformat(),
+            entries_key[1],
+        ),
+        has_more=changes.has_more,
+        reset=changes.reset,
+    )
+    return PydanticJSONResponse(response)
+
+
+@router.post(
+    "/budgets",
+    response_class=PydanticJSONResponse,
+    response_model=BudgetOut,
+    status_code=status.HTTP_201_CREATED,
+    tags=["budgets"],
+)
+async def put_budget(
+    payload: BudgetIn,
+    session: AsyncSession = Depends(get_session),
+) -> PydanticJSONResponse:
+    budget = await upsert_budget(
+        session,
+        user_id=get_settings().default_user_id,
+        category=payload.category,
+        month=payload.month,
+        limit_amount=payload.limit_amount,
+        currency=payload.currency,
+    )
+    return PydanticJSONResponse(
+        BudgetOut.model_validate(budget),
+        status_code=status.HTTP_201_CREATED,
+    )
+
+
+@router.get(
+    "/budgets",
+    response_class=PydanticJSONResponse,
+    response_model=BudgetsResponse,
+    tags=["budgets"],
+)
+async def get_budgets(
+    month: str = Query(..., pattern=MONTH_PATTERN, description="YYYY-MM"),
+    session: AsyncSession = Depends(get_read_session),
+) -> PydanticJSONResponse:
+    budgets = await list_budgets(session, user_id=get_settings().default_user_id, month=month)
+    return PydanticJSONResponse(
+        BudgetsResponse(items=[BudgetOut.model_validate(budget) for budget in budgets])
+    )
+
+
+@router.get(
+    "/budgets/status",
+    response_class=PydanticJSONResponse,
+    response_model=BudgetStatusResponse,
+    tags=["budgets"],
+)
+async def get_budget_status(
+    month: str = Query(..., pattern=MONTH_PATTERN, description="YYYY-MM"),
+    session: AsyncSession = Depends(get_read_session),
+) -> PydanticJSONResponse:
+    user_id = get_settings().default_user_id
+    statuses = await get_budget_statuses(
+        session,
+        user_id=user_id,
+        month=month,
+        today=datetime.now(await get_user_timezone(session, user_id)).date(),
+    )
+    return PydanticJSONResponse(
+        BudgetStatusResponse(
+            month=month,
+            items=[BudgetStatusOut.model_validate(item) for item in statuses],
+        )
+    )
+
+
+@router.get(
+    "/preferences",
+    response_class=PydanticJSONResponse,
+    response_model=PreferencesOut,
+    tags=["preferences"],
+)
+async def get_preferences(
+    session: AsyncSession = Depends(get_read_session),
+) -> PydanticJSONResponse:
+    tzinfo = await get_user_timezone(session, get_settings().default_user_id)
+    return PydanticJSONResponse(PreferencesOut(timezone=tzinfo.key))
+
+
+@router.put(
+    "/preferences",
+    response_class=PydanticJSONResponse,
+    response_model=PreferencesOut,
+    tags=["preferences"],
+)
+async def put_preferences(
+    payload: PreferencesIn,
+    session: AsyncSession = Depends(get_session),
+) -> PydanticJSONResponse:
+    try:
+        preference = await set_user_timezone(
+            session,
+            user_id=get_settings().default_user_id,
+            name=payload.timezone,
+        )
+    except UnknownTimezone as exc:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_CONTENT,
+            detail=str(exc),
+        ) from exc
+    return PydanticJSONResponse(PreferencesOut.model_validate(preference))
+
+
+@router.get(
+    "/anomalies",
+    response_class=PydanticJSONResponse,
+    response_model=AnomaliesResponse,
+    tags=["anomalies"],
+)
+async def get_anomalies(
+    limit: int = Query(default=50, ge=1, le=200),
+    cursor: str | None = Query(default=None),
+    session: AsyncSession = Depends(get_read_session),
+) -> PydanticJSONResponse:
+    after_id = None
+    if cursor is not None:
+        try:
+            (after_id,) = decode_cursor(cursor, size=1)
+            after_id = int(after_id)
+        except (TypeError, ValueError) as exc:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid cursor.",
+            ) from exc
+
+    anomalies = await list_anomalies(
+        session,
+        user_id=get_settings().default_user_id,
+        limit=limit + 1,
+        after_id=after_id,
+    )
+    next_cursor = None
+    if len(anomalies) > limit:
+        anomalies = anomalies[:limit]
+        next_cursor = encode_cursor(anomalies[-1].id)
+    return PydanticJSONResponse(
+        AnomaliesResponse(
+            items=[AnomalyOut.model_validate(item) for item in anomalies],
+            next_cursor=next_cursor,
+        )
+    )
+
+
+@router.get(
+    "/recurring",
+    response_class=PydanticJSONResponse,
+    response_model=RecurringResponse,
+    tags=["recurring"],
+)
+async def get_recurring(
+    include_inactive: bool = Query(False),
+    session: AsyncSession = Depends(get_read_session),
+) -> PydanticJSONResponse:
+    now = datetime.now(timezone.utc)
+    series = await list_recurring_series(
+        session,
+        user_id=get_settings().default_user_id,
+        now=now,
+        include_inactive=include_inactive,
+    )
+    return PydanticJSONResponse(
+        RecurringResponse(
+            items=[recurring_series_out(item, active=is_active(item, now)) for item in series]
+        )
+    )
 
 
 @router.get(
     "/summary",
+    response_class=PydanticJSONResponse,
     response_model=SummaryResponse,
     responses={
         200: {"content": {"application/json": {"examples": SUMMARY_RESPONSE_EXAMPLES}}},
@@ -242,8 +834,9 @@ async def list_transactions(
 )
 async def get_summary(
     month: str = Query(..., description="YYYY-MM"),
-    session: AsyncSession = Depends(get_session),
-) -> SummaryResponse:
+    session: AsyncSession = Depends(get_read_session),
+    if_none_match: str | None = Header(default=None),
+) -> Response:
     try:
         start, end = month_range(month)
     except ValueError as exc:
@@ -252,46 +845,96 @@ async def get_summary(
             detail="Invalid month format. Use YYYY-MM.",
         ) from exc
 
-    base_filters = [
-        Transaction.is_deleted.is_(False),
-        Transaction.occurred_at >= start,
-        Transaction.occurred_at < end,
-    ]
+    settings = get_settings()
+    user_id = settings.default_user_id
+    rates = get_fx_rate_cache()
+    await rates.refresh(session)
+    # Read before the data: a write landing in between can only pair newer data with
+    # an older tag, which the next poll corrects.
+    etag = data_etag(await get_change_version(session, user_id), rates.revision)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    cache = get_summary_cache()
+    cache_key = (user_id, month_key(start))
+    # Tagged with the ETag: a write committed by another worker moves the version
+    # without reaching this process's cache, so the old entry must not be served.
+    cached = cache.get(cache_key, tag=etag)
+    if cached is not None:
+        if cached.month != month:
+            cached = cached.model_copy(update={"month": month})
+        return PydanticJSONResponse(cached, headers=etag_headers(etag))
 
-    totals_query = (
-        select(Transaction.direction, func.coalesce(func.sum(Transaction.amount), 0))
-        .where(*base_filters)
-        .group_by(Transaction.direction)
+    generation = cache.generation
+    result = await get_month_summary(
+        session,
+        user_id=user_id,
+        start=start,
+        end=end,
+        currency=settings.reporting_currency,
+        rates=rates,
     )
-    totals_result = await session.execute(totals_query)
-    totals = {direction: total for direction, total in totals_result.all()}
-    total_inflow = totals.get(TransactionDirection.inflow, Decimal("0"))
-    total_outflow = totals.get(TransactionDirection.outflow, Decimal("0"))
-
-    category_query = (
-        select(
-            Transaction.direction,
-            Transaction.category,
-            func.coalesce(func.sum(Transaction.amount), 0),
-        )
-        .where(*base_filters)
-        .group_by(Transaction.direction, Transaction.category)
-        .order_by(Transaction.direction, Transaction.category)
+    summary = SummaryResponse(
+        month=month,
+        currency=result.currency,
+        total_inflow=result.total_inflow,
+        total_outflow=result.total_outflow,
+        net=result.total_inflow - result.total_outflow,
+        by_category=[CategorySummary.model_validate(item) for item in result.by_category],
+        transaction_count=result.transaction_count,
+        unconverted=[UnconvertedTotal.model_validate(item) for item in result.unconverted],
     )
-    category_result = await session.execute(category_query)
-    by_category = [
-        CategorySummary(direction=direction, category=category, total=total)
-        for direction, category, total in category_result.all()
-    ]
+    cache.set(cache_key, summary, generation=generation, tag=etag)
+    return PydanticJSONResponse(summary, headers=etag_headers(etag))
 
-    count_query = select(func.count(Transaction.id)).where(*base_filters)
-    count_result = await session.scalar(count_query)
 
-    return SummaryResponse(
-        month=month,
-        total_inflow=total_inflow,
-        total_outflow=total_outflow,
-        net=total_inflow - total_outflow,
-        by_category=by_category,
-        transaction_count=int(count_result or 0),
+@router.get(
+    "/trends",
+    response_class=PydanticJSONResponse,
+    response_model=TrendsResponse,
+    responses={
+        200: {"content": {"application/json": {"examples": TRENDS_RESPONSE_EXAMPLES}}},
+    },
+    tags=["summary"],
+)
+async def get_trends_series(
+    from_date: date = Query(..., alias="from"),
+    to_date: date = Query(..., alias="to"),
+    granularity: TrendGranularity = Query(default=TrendGranularity.month),
+    group_by: TrendGroupBy = Query(default=TrendGroupBy.category),
+    session: AsyncSession = Depends(get_read_session),
+) -> PydanticJSONResponse:
+    settings = get_settings()
+    rates = get_fx_rate_cache()
+    await rates.refresh(session)
+    try:
+        result = await get_trends(
+            session,
+            user_id=settings.default_user_id,
+            start=from_date,
+            end=to_date,
+            granularity=granularity,
+            group_by=group_by,
+            currency=settings.reporting_currency,
+            rates=rates,
+        )
+    except ValueError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(exc),
+        ) from exc
+
+    return PydanticJSONResponse(
+        TrendsResponse(
+            start=from_date,
+            end=to_date,
+            currency=settings.reporting_currency,
+            granularity=granularity,
+            group_by=group_by,
+            buckets=result.buckets,
+            series=[
+                TrendSeriesOut(key=item.key, totals=item.totals, counts=item.counts)
+                for item in result.series
+            ],
+            unconverted_currencies=result.unconverted_currencies,
+        )
     )
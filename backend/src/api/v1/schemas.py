@@ -2,21 +2,23 @@
 
 from __future__ import annotations
 
-from datetime import date, datetime, time, timezone
+from collections.abc import Mapping
+from datetime import date, datetime
 from decimal import Decimal
-from typing import Any
+from typing import Annotated, Any
 
-from pydantic import BaseModel, ConfigDict, Field
+from pydantic import BaseModel, ConfigDict, Field, PlainSerializer
 
 from src.models.enums import EntrySource, EntryStatus, TransactionDirection, TransactionType
+from src.services.schemas import TrendGranularity, TrendGroupBy
+
+# Amounts stay Decimal in Python and are emitted as JSON numbers by pydantic-core.
+APIDecimal = Annotated[Decimal, PlainSerializer(float, return_type=float, when_used="json")]
+MONTH_PATTERN = r"^\d{4}-(0[1-9]|1[0-2])$"
 
 
 class APIModel(BaseModel):
-    model_config = ConfigDict(
-        from_attributes=True,
-        populate_by_name=True,
-        json_encoders={Decimal: lambda value: float(value)},
-    )
+    model_config = ConfigDict(from_attributes=True, populate_by_name=True)
 
 
 class ParseRequest(APIModel):
@@ -25,7 +27,7 @@ class ParseRequest(APIModel):
 
 
 class ParseTransaction(APIModel):
-    amount: Decimal
+    amount: APIDecimal
     currency: str = "INR"
     direction: TransactionDirection
     type: TransactionType
@@ -47,11 +49,11 @@ class ParseResponse(ParsePreview):
 
 class TransactionInput(APIModel):
     occurred_time: datetime = Field(validation_alias="occurred_at")
-    amount: Decimal = Field(gt=0)
-    currency: str = "INR"
+    amount: APIDecimal = Field(gt=0, max_digits=12, decimal_places=2)
+    currency: str = Field(default="INR", min_length=3, max_length=3)
     direction: TransactionDirection
     type: TransactionType
-    category: str
+    category: str = Field(min_length=1, max_length=50)
     assumptions: list[str] = Field(default_factory=list)
 
 
@@ -77,7 +79,7 @@ class TransactionOut(APIModel):
     occurred_time: datetime = Field(validation_alias="occurred_at")
     created_time: datetime = Field(validation_alias="created_at")
     modified_time: datetime = Field(validation_alias="updated_at")
-    amount: Decimal
+    amount: APIDecimal
     currency: str
     direction: TransactionDirection
     type: TransactionType
@@ -85,9 +87,163 @@ class TransactionOut(APIModel):
     assumptions_json: Any | None
 
 
+class EntryFeedItem(EntryOut):
+    status: EntryStatus
+    transactions: list[TransactionOut]
+
+
+class EntriesResponse(APIModel):
+    items: list[EntryFeedItem]
+    next_cursor: str | None
+
+
+class BudgetEventOut(APIModel):
+    category: str
+    month: str
+    currency: str
+    threshold_percent: int
+    limit_amount: APIDecimal
+    spent: APIDecimal
+
+
 class ConfirmResponse(APIModel):
     entry: EntryOut
     transactions: list[TransactionOut]
+    budget_events: list[BudgetEventOut] = Field(default_factory=list)
+
+
+class BudgetIn(APIModel):
+    category: str = Field(min_length=1, max_length=50)
+    month: str = Field(pattern=MONTH_PATTERN, description="YYYY-MM")
+    limit_amount: APIDecimal = Field(gt=0, max_digits=12, decimal_places=2)
+    currency: str = Field(default="INR", min_length=3, max_length=3)
+
+
+class BudgetOut(APIModel):
+    id: int
+    category: str
+    month: str
+    currency: str
+    limit_amount: APIDecimal
+    created_time: datetime = Field(validation_alias="created_at")
+    modified_time: datetime = Field(validation_alias="updated_at")
+
+
+class BudgetsResponse(APIModel):
+    items: list[BudgetOut]
+
+
+class BudgetStatusOut(APIModel):
+    category: str
+    month: str
+    currency: str
+    limit_amount: APIDecimal
+    spent: APIDecimal
+    remaining: APIDecimal
+    percent_used: float
+    days_elapsed: int
+    days_in_month: int
+    daily_burn_rate: APIDecimal
+    projected_spend: APIDecimal
+
+
+class BudgetStatusResponse(APIModel):
+    month: str
+    items: list[BudgetStatusOut]
+
+
+class AnomalyOut(APIModel):
+    id: int
+    transaction_id: int
+    kind: str
+    score: float
+    category: str
+    currency: str
+    amount: APIDecimal
+    expected: float | None
+    occurred_time: datetime = Field(validation_alias="occurred_at")
+    detected_time: datetime = Field(validation_alias="detected_at")
+
+
+class AnomaliesResponse(APIModel):
+    items: list[AnomalyOut]
+    next_cursor: str | None
+
+
+class RecurringSeriesOut(APIModel):
+    id: int
+    direction: TransactionDirection
+    currency: str
+    category: str
+    cadence: str
+    period_days: float
+    amount: APIDecimal
+    amount_min: APIDecimal
+    amount_max: APIDecimal
+    occurrences: int
+    first_seen_at: datetime
+    last_seen_at: datetime
+    next_expected_at: datetime
+    confidence: float
+    active: bool
+
+
+class RecurringResponse(APIModel):
+    items: list[RecurringSeriesOut]
+
+
+class PreferencesIn(APIModel):
+    timezone: str = Field(min_length=1, max_length=64, examples=["Asia/Kolkata"])
+
+
+class PreferencesOut(APIModel):
+    timezone: str
+
+
+class ImportRowError(APIModel):
+    row: int
+    message: str
+
+
+class ImportResponse(APIModel):
+    entry_id: int | None
+    imported: int
+    rejected: int
+    errors: list[ImportRowError]
+
+
+class SearchHitOut(APIModel):
+    entry_id: int
+    raw_text: str
+    entry_summary: str | None
+    status: EntryStatus
+    created_time: datetime = Field(validation_alias="created_at")
+    score: float
+
+
+class SearchResponse(APIModel):
+    items: list[SearchHitOut]
+    next_cursor: str | None
+
+
+class SyncEntryOut(APIModel):
+    id: int
+    raw_text: str
+    source: EntrySource
+    status: EntryStatus
+    created_time: datetime = Field(validation_alias="created_at")
+    modified_time: datetime = Field(validation_alias="updated_at")
+    parser_version: str | None
+    notes: str | None
+
+
+class SyncResponse(APIModel):
+    entries: list[SyncEntryOut]
+    transactions: list[TransactionOut]
+    deleted_transaction_ids: list[int]
+    next_cursor: str
+    has_more: bool
+    reset: bool
 
 
 class TransactionsResponse(APIModel):
@@ -100,34 +256,147 @@ class TransactionsResponse(APIModel):
 class CategorySummary(APIModel):
     direction: TransactionDirection
     category: str
-    total: Decimal
+    total: APIDecimal
+
+
+class UnconvertedTotal(APIModel):
+    direction: TransactionDirection
+    currency: str
+    total: APIDecimal
+    transaction_count: int
 
 
 class SummaryResponse(APIModel):
     month: str
-    total_inflow: Decimal
-    total_outflow: Decimal
-    net: Decimal
+    currency: str
+    total_inflow: APIDecimal
+    total_outflow: APIDecimal
+    net: APIDecimal
     by_category: list[CategorySummary]
     transaction_count: int
+    # Totals in their own currency where no rate to `currency` is loaded; not in the above.
+    unconverted: list[UnconvertedTotal] = Field(default_factory=list)
 
 
-def month_range(month: str) -> tuple[datetime, datetime]:
-    parsed = datetime.strptime(month, "%Y-%m")
-    start = datetime(parsed.year, parsed.month, 1, tzinfo=timezone.utc)
-    if parsed.month == 12:
-        end = datetime(parsed.year + 1, 1, 1, tzinfo=timezone.utc)
-    else:
-        end = datetime(parsed.year, parsed.month + 1, 1, tzinfo=timezone.utc)
-    return start, end
+class TrendSeriesOut(APIModel):
+    key: str
+    totals: list[APIDecimal]
+    counts: list[int]
+
 
+class TrendsResponse(APIModel):
+    start: date
+    end: date
+    currency: str
+    granularity: TrendGranularity
+    group_by: TrendGroupBy
+    buckets: list[date]
+    series: list[TrendSeriesOut]
+    # Currencies left out of the totals because no rate to `currency` is loaded.
+    unconverted_currencies: list[str] = Field(default_factory=list)
+
+
+class PoolStatsOut(APIModel):
+    pool_size: int
+    max_overflow: int
+    checked_out: int
+    checked_in: int
+    overflow_in_use: int
+    peak_checked_out: int
+    peak_overflow_in_use: int
+    checkouts: int
+    timeouts: int
+    wait_seconds_total: float
+    wait_seconds_max: float
+    connects: int
+    invalidations: int
+    liveness_failures: int
+
+
+class SummaryCacheStatsOut(APIModel):
+    hits: int
+    misses: int
+    evictions: int
+    invalidations: int
+    size: int
+    max_entries: int
+
+
+class MetricsResponse(APIModel):
+    pools: dict[str, PoolStatsOut]
+    summary_cache: SummaryCacheStatsOut
+
+
+def transaction_out_from_row(row: Mapping[Any, Any]) -> TransactionOut:
+    """Build a TransactionOut from trusted database columns without re-validation."""
+    return TransactionOut.model_construct(
+        id=row["id"],
+        entry_id=row["entry_id"],
+        occurred_time=row["occurred_at"],
+        created_time=row["created_at"],
+        modified_time=row["updated_at"],
+        amount=row["amount"],
+        currency=row["currency"],
+        direction=row["direction"],
+        type=row["type"],
+        category=row["category"],
+        assumptions_json=row["assumptions_json"],
+    )
 
-def date_range(
-    from_date: date | None,
-    to_date: date | None,
-) -> tuple[datetime | None, datetime | None]:
-    start = (
-        datetime.combine(from_date, time.min, tzinfo=timezone.utc) if from_date else None
+
+def sync_entry_out_from_row(row: Mapping[Any, Any]) -> SyncEntryOut:
+    return SyncEntryOut.model_construct(
+        id=row["id"],
+        raw_text=row["raw_text"],
+        source=row["source"],
+        status=row["status"],
+        created_time=row["created_at"],
+        modified_time=row["updated_at"],
+        parser_version=row["parser_version"],
+        notes=row["notes"],
     )
-    end = datetime.combine(to_date, time.max, tzinfo=timezone.utc) if to_date else None
+
+
+def recurring_series_out(series: Any, *, active: bool) -> RecurringSeriesOut:
+    return RecurringSeriesOut.model_construct(
+        id=series.id,
+        direction=series.direction,
+        currency=series.currency,
+        category=series.category,
+        cadence=series.cadence,
+        period_days=series.period_days,
+        amount=series.amount,
+        amount_min=series.amount_min,
+        amount_max=series.amount_max,
+        occurrences=series.occurrences,
+        first_seen_at=series.first_seen_at,
+        last_seen_at=series.last_seen_at,
+        next_expected_at=series.next_expected_at,
+        confidence=series.confidence,
+        active=active,
+    )
+
+
+def entry_fields(entry: Any, *, parser_output: dict[str, Any] | None) -> dict[str, Any]:
+    """EntryOut fields without touching the deferred parser output column."""
+    return {
+        "id": entry.id,
+        "raw_text": entry.raw_text,
+        "source": entry.source,
+        "created_time": entry.created_at,
+        "modified_time": entry.updated_at,
+        "parser_output_json": parser_output,
+        "parser_version": entry.parser_version,
+        "notes": entry.notes,
+    }
+
+
+def month_range(month: str) -> tuple[date, date]:
+    """First day of `month` and of the month after, compared against local dates."""
+    parsed = datetime.strptime(month, "%Y-%m")
+    start = date(parsed.year, parsed.month, 1)
+    if parsed.month == 12:
+        end = date(parsed.year + 1, 1, 1)
+    else:
+        end = date(parsed.year, parsed.month + 1, 1)
     return start, end
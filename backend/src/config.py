@@ -5,11 +5,21 @@ from __future__ import annotations
 import os
 from dataclasses import dataclass
 from functools import lru_cache
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 
 
 @dataclass(frozen=True, slots=True)
 class Settings:
     database_url: str
+    database_read_url: str | None
+    read_your_writes_seconds: float
+    db_pool_size: int
+    db_max_overflow: int
+    db_pool_timeout: float
+    db_pool_recycle: int
+    db_statement_cache_size: int
+    db_pool_liveness: str
+    db_pool_idle_ping_seconds: float
     environment: str
     default_user_id: str
     llm_api_key: str | None
@@ -20,6 +30,24 @@ class Settings:
     parser_version: str
     llm_provider: str
     cors_allow_origins: list[str]
+    summary_cache_max_entries: int
+    summary_cache_ttl_seconds: float
+    parser_output_codec: str
+    archive_retention_days: int
+    idempotency_ttl_seconds: int
+    idempotency_wait_seconds: float
+    write_batch_window_ms: float
+    write_batch_max_items: int
+    sync_safety_lag_seconds: float
+    reporting_currency: str
+    fx_cache_ttl_seconds: float
+    default_timezone: str
+
+
+def _async_database_url(url: str) -> str:
+    if url.startswith("postgresql://"):
+        return url.replace("postgresql://", "postgresql+asyncpg://", 1)
+    return url
 
 
 @lru_cache
@@ -27,12 +55,26 @@ def get_settings() -> Settings:
     database_url = os.getenv("DATABASE_URL")
     if not database_url:
         raise RuntimeError("DATABASE_URL is not set")
-    if database_url.startswith("postgresql://"):
-        database_url = database_url.replace("postgresql://", "postgresql+asyncpg://", 1)
+    database_url = _async_database_url(database_url)
+    database_read_url = os.getenv("DATABASE_READ_URL") or None
+    if database_read_url:
+        database_read_url = _async_database_url(database_read_url)
+    read_your_writes_seconds = float(os.getenv("READ_YOUR_WRITES_SECONDS", "5"))
+    db_pool_size = int(os.getenv("DB_POOL_SIZE", "5"))
+    db_max_overflow = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+    db_pool_timeout = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+    db_pool_recycle = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+    db_statement_cache_size = int(os.getenv("DB_STATEMENT_CACHE_SIZE", "100"))
+    db_pool_liveness = os.getenv("DB_POOL_LIVENESS", "pre_ping").lower()
+    if db_pool_liveness not in {"pre_ping", "idle_ping", "none"}:
+        raise RuntimeError(f"Unsupported DB_POOL_LIVENESS: {db_pool_liveness}")
+    db_pool_idle_ping_seconds = float(os.getenv("DB_POOL_IDLE_PING_SECONDS", "30"))
     environment = os.getenv("ENVIRONMENT", "development")
     default_user_id = os.getenv("DEFAULT_USER_ID", "demo-user")
     cors_allow_origins_env = os.getenv("CORS_ALLOW_ORIGINS", "")
-    cors_allow_origins = [origin.strip() for origin in cors_allow_origins_env.split(",") if origin.strip()]
+    cors_allow_origins = [
+        origin.strip() for origin in cors_allow_origins_env.split(",") if origin.strip()
+    ]
     if not cors_allow_origins and environment == "development":
         cors_allow_origins = ["*"]
     llm_provider = os.getenv("LLM_PROVIDER", "openai").lower()
@@ -50,8 +92,45 @@ def get_settings() -> Settings:
     llm_timeout_seconds = float(os.getenv("LLM_TIMEOUT_SECONDS", "30"))
     llm_temperature = float(os.getenv("LLM_TEMPERATURE", "0.2"))
     parser_version = os.getenv("PARSER_VERSION", "poc-v1")
+    summary_cache_max_entries = int(os.getenv("SUMMARY_CACHE_MAX_ENTRIES", "1024"))
+    summary_cache_ttl_seconds = float(os.getenv("SUMMARY_CACHE_TTL_SECONDS", "60"))
+    if summary_cache_ttl_seconds < 0:
+        raise RuntimeError("SUMMARY_CACHE_TTL_SECONDS must not be negative")
+    parser_output_codec = os.getenv("PARSER_OUTPUT_CODEC", "zlib").lower()
+    if parser_output_codec not in {"zlib", "zstd"}:
+        raise RuntimeError(f"Unsupported PARSER_OUTPUT_CODEC: {parser_output_codec}")
+    archive_retention_days = int(os.getenv("ARCHIVE_RETENTION_DAYS", "30"))
+    if archive_retention_days < 0:
+        raise RuntimeError("ARCHIVE_RETENTION_DAYS must not be negative")
+    idempotency_ttl_seconds = int(os.getenv("IDEMPOTENCY_TTL_SECONDS", "86400"))
+    idempotency_wait_seconds = float(
+        os.getenv("IDEMPOTENCY_WAIT_SECONDS", str(llm_timeout_seconds + 5))
+    )
+    write_batch_window_ms = float(os.getenv("WRITE_BATCH_WINDOW_MS", "0"))
+    write_batch_max_items = int(os.getenv("WRITE_BATCH_MAX_ITEMS", "64"))
+    if write_batch_max_items < 1:
+        raise RuntimeError("WRITE_BATCH_MAX_ITEMS must be at least 1")
+    sync_safety_lag_seconds = float(os.getenv("SYNC_SAFETY_LAG_SECONDS", "2"))
+    reporting_currency = os.getenv("REPORTING_CURRENCY", "INR").upper()
+    if len(reporting_currency) != 3 or not reporting_currency.isalpha():
+        raise RuntimeError(f"Unsupported REPORTING_CURRENCY: {reporting_currency}")
+    fx_cache_ttl_seconds = float(os.getenv("FX_CACHE_TTL_SECONDS", "300"))
+    default_timezone = os.getenv("DEFAULT_TIMEZONE", "Asia/Kolkata")
+    try:
+        ZoneInfo(default_timezone)
+    except (ZoneInfoNotFoundError, ValueError) as exc:
+        raise RuntimeError(f"Unsupported DEFAULT_TIMEZONE: {default_timezone}") from exc
     return Settings(
         database_url=database_url,
+        database_read_url=database_read_url,
+        read_your_writes_seconds=read_your_writes_seconds,
+        db_pool_size=db_pool_size,
+        db_max_overflow=db_max_overflow,
+        db_pool_timeout=db_pool_timeout,
+        db_pool_recycle=db_pool_recycle,
+        db_statement_cache_size=db_statement_cache_size,
+        db_pool_liveness=db_pool_liveness,
+        db_pool_idle_ping_seconds=db_pool_idle_ping_seconds,
         environment=environment,
         default_user_id=default_user_id,
         llm_api_key=llm_api_key,
@@ -62,4 +141,16 @@ def get_settings() -> Settings:
         parser_version=parser_version,
         llm_provider=llm_provider,
         cors_allow_origins=cors_allow_origins,
+        summary_cache_max_entries=summary_cache_max_entries,
+        summary_cache_ttl_seconds=summary_cache_ttl_seconds,
+        parser_output_codec=parser_output_codec,
+        archive_retention_days=archive_retention_days,
+        idempotency_ttl_seconds=idempotency_ttl_seconds,
+        idempotency_wait_seconds=idempotency_wait_seconds,
+        write_batch_window_ms=write_batch_window_ms,
+        write_batch_max_items=write_batch_max_items,
+        sync_safety_lag_seconds=sync_safety_lag_seconds,
+        reporting_currency=reporting_currency,
+        fx_cache_ttl_seconds=fx_cache_ttl_seconds,
+        default_timezone=default_timezone,
     )
@@ -1,3 +1,23 @@
-from src.database.connection import SessionLocal, engine, get_session
+from src.database.connection import (
+    ReadSessionLocal,
+    SessionLocal,
+    engine,
+    get_pool_stats,
+    get_read_session,
+    get_session,
+    get_write_batcher,
+    read_engine,
+    session_router,
+)
 
-__all__ = ["SessionLocal", "engine", "get_session"]
+__all__ = [
+    "ReadSessionLocal",
+    "SessionLocal",
+    "engine",
+    "get_pool_stats",
+    "get_read_session",
+    "get_session",
+    "get_write_batcher",
+    "read_engine",
+    "session_router",
+]
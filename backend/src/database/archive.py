@@ -0,0 +1,185 @@
+"""Move long-dead soft-deleted transactions out of the hot table.
+
+Every re-confirm soft-deletes the entry's previous transactions, so dead rows
+accumulate in `transactions` and inflate its indexes and vacuum work. This job
+copies `is_deleted` rows whose `updated_at` (the soft-delete time) is older
+than the retention window into `transactions_archive` and deletes them, one
+short transaction per batch. The same run also purges expired Idempotency-Key
+responses.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import and_, delete, insert, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from src.config import get_settings
+from src.models.transaction import (
+    DELETED_TRANSACTION_PREDICATE,
+    Transaction,
+    TransactionArchive,
+)
+from src.services.idempotency_service import purge_expired_idempotency_keys
+
+# Columns copied verbatim; archived_at is filled by the archive table default.
+ARCHIVED_COLUMNS = (
+    "id",
+    "user_id",
+    "entry_id",
+    "occurred_at",
+    "local_date",
+    "created_at",
+    "updated_at",
+    "amount",
+    "currency",
+    "direction",
+    "type",
+    "category",
+    "assumptions_json",
+)
+
+
+@dataclass(frozen=True, slots=True)
+class ArchiveBatch:
+    number: int
+    rows: int
+    last_updated_at: datetime
+    last_id: int
+    seconds: float
+
+
+async def _archive_batch(
+    session: AsyncSession,
+    *,
+    cutoff: datetime,
+    batch_size: int,
+    after: tuple[datetime, int] | None,
+) -> list[tuple[datetime, int]]:
+    query = (
+        select(Transaction.updated_at, Transaction.id)
+        .where(DELETED_TRANSACTION_PREDICATE, Transaction.updated_at < cutoff)
+        .order_by(Transaction.updated_at, Transaction.id)
+        .limit(batch_size)
+    )
+    if after is not None:
+        updated_at, transaction_id = after
+        query = query.where(
+            or_(
+                Transaction.updated_at > updated_at,
+                and_(Transaction.updated_at == updated_at, Transaction.id > transaction_id),
+            )
+        )
+    keys = [(updated_at, row_id) for updated_at, row_id in (await session.execute(query)).all()]
+    if not keys:
+        return keys
+    ids = [transaction_id for _, transaction_id in keys]
+    columns = [getattr(Transaction, name) for name in ARCHIVED_COLUMNS]
+    await session.execute(
+        insert(TransactionArchive).from_select(
+            list(ARCHIVED_COLUMNS),
+            select(*columns).where(Transaction.id.in_(ids), DELETED_TRANSACTION_PREDICATE),
+        )
+    )
+    await session.execute(
+        delete(Transaction).where(Transaction.id.in_(ids), DELETED_TRANSACTION_PREDICATE)
+    )
+    return keys
+
+
+async def archive_deleted_transactions(
+    session_factory: async_sessionmaker[AsyncSession],
+    *,
+    cutoff: datetime,
+    batch_size: int = 1000,
+    max_batches: int | None = None,
+    pause_seconds: float = 0.0,
+    on_batch: Callable[[ArchiveBatch], None] | None = None,
+) -> list[ArchiveBatch]:
+    """Archive soft-deleted rows last touched before `cutoff`, oldest first.
+
+    Iterates by keyset on (updated_at, id) rather than re-scanning from the
+    start, so index entries of rows already moved (dead until vacuum) are not
+    walked again. Each batch commits on its own; an interrupted run loses at
+    most the batch in flight, which the next run picks up.
+    """
+    batches: list[ArchiveBatch] = []
+    after: tuple[datetime, int] | None = None
+    while max_batches is None or len(batches) < max_batches:
+        started = time.perf_counter()
+        async with session_factory() as session, session.begin():
+            keys = await _archive_batch(
+                session,
+                cutoff=cutoff,
+                batch_size=batch_size,
+                after=after,
+            )
+        if not keys:
+            break
+        after = keys[-1]
+        batch = ArchiveBatch(
+            number=len(batches) + 1,
+            rows=len(keys),
+            last_updated_at=after[0],
+            last_id=after[1],
+            seconds=time.perf_counter() - started,
+        )
+        batches.append(batch)
+        if on_batch is not None:
+            on_batch(batch)
+        if len(keys) < batch_size:
+            break
+        if pause_seconds:
+            await asyncio.sleep(pause_seconds)
+    return batches
+
+
+def _print_batch(batch: ArchiveBatch) -> None:
+    print(
+        f"batch {batch.number}: archived {batch.rows} rows in {batch.seconds * 1000:.1f} ms "
+        f"(up to updated_at={batch.last_updated_at.isoformat()}, id={batch.last_id})"
+    )
+
+
+async def _run(args: argparse.Namespace) -> None:
+    engine = create_async_engine(get_settings().database_url)
+    sessions = async_sessionmaker(engine, expire_on_commit=False)
+    cutoff = datetime.now(timezone.utc) - timedelta(days=args.retention_days)
+    batches = await archive_deleted_transactions(
+        sessions,
+        cutoff=cutoff,
+        batch_size=args.batch_size,
+        max_batches=args.max_batches,
+        pause_seconds=args.pause,
+        on_batch=_print_batch,
+    )
+    total = sum(batch.rows for batch in batches)
+    print(f"archived {total} rows deleted before {cutoff.isoformat()} in {len(batches)} batches")
+    async with sessions() as session:
+        purged = await purge_expired_idempotency_keys(session)
+    print(f"purged {purged} expired idempotency keys")
+    await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Archive old soft-deleted transactions.")
+    parser.add_argument(
+        "--retention-days",
+        type=int,
+        default=get_settings().archive_retention_days,
+        help="keep soft-deleted rows in the live table for this many days",
+    )
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--max-batches", type=int, default=None)
+    parser.add_argument("--pause", type=float, default=0.0, help="seconds between batches")
+    asyncio.run(_run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
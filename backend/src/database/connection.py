@@ -3,15 +3,61 @@
 from __future__ import annotations
 
 from collections.abc import AsyncGenerator
+from functools import lru_cache
 
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
 from src.config import get_settings
+from src.database.batching import WriteBatcher
+from src.database.pool import PoolMetrics, PoolStats, build_engine
+from src.database.routing import SessionRouter
 
-engine = create_async_engine(get_settings().database_url, pool_pre_ping=True)
+pool_metrics = {"primary": PoolMetrics()}
+engine = build_engine(
+    get_settings().database_url,
+    settings=get_settings(),
+    metrics=pool_metrics["primary"],
+)
 SessionLocal = async_sessionmaker(engine, expire_on_commit=False)
 
+read_engine = None
+ReadSessionLocal = None
+database_read_url = get_settings().database_read_url
+if database_read_url:
+    pool_metrics["replica"] = PoolMetrics()
+    read_engine = build_engine(
+        database_read_url,
+        settings=get_settings(),
+        metrics=pool_metrics["replica"],
+    )
+    ReadSessionLocal = async_sessionmaker(read_engine, expire_on_commit=False)
+
+session_router = SessionRouter(SessionLocal, ReadSessionLocal)
+
 
 async def get_session() -> AsyncGenerator[AsyncSession, None]:
-    async with SessionLocal() as session:
+    async with session_router.for_write()() as session:
+        yield session
+
+
+async def get_read_session() -> AsyncGenerator[AsyncSession, None]:
+    session_factory = session_router.for_read(get_settings().default_user_id)
+    async with session_factory() as session:
         yield session
+
+
+@lru_cache
+def get_write_batcher() -> WriteBatcher | None:
+    """Shared group-commit batcher, or None when WRITE_BATCH_WINDOW_MS is 0."""
+    settings = get_settings()
+    if settings.write_batch_window_ms <= 0:
+        return None
+    return WriteBatcher(
+        SessionLocal,
+        window_seconds=settings.write_batch_window_ms / 1000,
+        max_items=settings.write_batch_max_items,
+    )
+
+
+def get_pool_stats() -> dict[str, PoolStats]:
+    return {name: metrics.snapshot() for name, metrics in pool_metrics.items()}
@@ -0,0 +1,203 @@
+"""Monthly range partitioning helpers for the transactions table (PostgreSQL only)."""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import re
+from datetime import date, datetime, timezone
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection, create_async_engine
+
+from src.config import get_settings
+
+PARENT_TABLE = "transactions"
+LEGACY_TABLE = "transactions_unpartitioned"
+DEFAULT_PARTITION = "transactions_default"
+PARTITION_PATTERN = re.compile(r"^transactions_p(\d{4})_(\d{2})$")
+
+
+def month_start(value: date) -> date:
+    return date(value.year, value.month, 1)
+
+
+def add_months(value: date, months: int) -> date:
+    index = value.year * 12 + value.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    return f"{PARENT_TABLE}_p{month:%Y_%m}"
+
+
+def partition_month(name: str) -> date | None:
+    match = PARTITION_PATTERN.match(name)
+    if not match:
+        return None
+    return date(int(match.group(1)), int(match.group(2)), 1)
+
+
+def create_partition_sql(month: date) -> str:
+    start = month_start(month)
+    end = add_months(start, 1)
+    return (
+        f"CREATE TABLE IF NOT EXISTS {partition_name(start)} PARTITION OF {PARENT_TABLE} "
+        f"FOR VALUES FROM ('{start.isoformat()} 00:00:00+00') "
+        f"TO ('{end.isoformat()} 00:00:00+00')"
+    )
+
+
+def months_between(first: date, last: date) -> list[date]:
+    months = []
+    current = month_start(first)
+    while current <= last:
+        months.append(current)
+        current = add_months(current, 1)
+    return months
+
+
+def _index_name(statement: str) -> str:
+    return statement.split()[2]
+
+
+def partition_statements(
+    first_month: date,
+    last_month: date,
+    *,
+    indexes: list[str],
+) -> list[str]:
+    """DDL that converts the plain transactions table into a partitioned one.
+
+    `indexes` holds the CREATE INDEX statements of the table at the calling
+    migration's revision; they are dropped from the old table and rebuilt on
+    the partitioned parent.
+    """
+    statements = [f"ALTER TABLE {PARENT_TABLE} RENAME TO {LEGACY_TABLE}"]
+    statements += [f"DROP INDEX IF EXISTS {_index_name(sql)}" for sql in indexes]
+    statements += [
+        f"ALTER TABLE {LEGACY_TABLE} RENAME CONSTRAINT transactions_pkey TO {LEGACY_TABLE}_pkey",
+        f"CREATE TABLE {PARENT_TABLE} (LIKE {LEGACY_TABLE} INCLUDING DEFAULTS "
+        f"INCLUDING CONSTRAINTS) PARTITION BY RANGE (occurred_at)",
+        f"ALTER TABLE {PARENT_TABLE} ADD CONSTRAINT transactions_pkey "
+        f"PRIMARY KEY (id, occurred_at)",
+        f"ALTER TABLE {PARENT_TABLE} ADD CONSTRAINT transactions_entry_id_fkey "
+        f"FOREIGN KEY (entry_id) REFERENCES entries (id)",
+    ]
+    statements += [create_partition_sql(month) for month in months_between(first_month, last_month)]
+    statements += [
+        f"CREATE TABLE IF NOT EXISTS {DEFAULT_PARTITION} PARTITION OF {PARENT_TABLE} DEFAULT",
+        f"INSERT INTO {PARENT_TABLE} SELECT * FROM {LEGACY_TABLE}",
+        f"ALTER SEQUENCE transactions_id_seq OWNED BY {PARENT_TABLE}.id",
+        f"DROP TABLE {LEGACY_TABLE}",
+    ]
+    statements += indexes
+    return statements
+
+
+def unpartition_statements(*, indexes: list[str]) -> list[str]:
+    """DDL that folds the partitioned transactions table back into a plain table."""
+    statements = [f"ALTER TABLE {PARENT_TABLE} RENAME TO {LEGACY_TABLE}"]
+    statements += [f"DROP INDEX IF EXISTS {_index_name(sql)}" for sql in indexes]
+    statements += [
+        f"ALTER TABLE {LEGACY_TABLE} RENAME CONSTRAINT transactions_pkey TO {LEGACY_TABLE}_pkey",
+        f"CREATE TABLE {PARENT_TABLE} (LIKE {LEGACY_TABLE} INCLUDING DEFAULTS "
+        f"INCLUDING CONSTRAINTS)",
+        f"ALTER TABLE {PARENT_TABLE} ADD CONSTRAINT transactions_pkey PRIMARY KEY (id)",
+        f"ALTER TABLE {PARENT_TABLE} ADD CONSTRAINT transactions_entry_id_fkey "
+        f"FOREIGN KEY (entry_id) REFERENCES entries (id)",
+        f"INSERT INTO {PARENT_TABLE} SELECT * FROM {LEGACY_TABLE}",
+        f"ALTER SEQUENCE transactions_id_seq OWNED BY {PARENT_TABLE}.id",
+        f"DROP TABLE {LEGACY_TABLE} CASCADE",
+    ]
+    statements += indexes
+    return statements
+
+
+async def is_partitioned(connection: AsyncConnection) -> bool:
+    result = await connection.execute(
+        text("SELECT 1 FROM pg_partitioned_table WHERE partrelid = CAST(:table AS regclass)"),
+        {"table": PARENT_TABLE},
+    )
+    return result.scalar_one_or_none() is not None
+
+
+async def list_partitions(connection: AsyncConnection) -> list[str]:
+    result = await connection.execute(
+        text(
+            "SELECT child.relname FROM pg_inherits "
+            "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+            "WHERE pg_inherits.inhparent = CAST(:table AS regclass) "
+            "ORDER BY child.relname"
+        ),
+        {"table": PARENT_TABLE},
+    )
+    return list(result.scalars())
+
+
+async def ensure_future_partitions(
+    connection: AsyncConnection,
+    *,
+    months_ahead: int = 3,
+    today: date | None = None,
+) -> list[str]:
+    """Create partitions from the current month through `months_ahead` months out."""
+    today = today or datetime.now(timezone.utc).date()
+    existing = set(await list_partitions(connection))
+    created = []
+    for month in months_between(today, add_months(month_start(today), months_ahead)):
+        name = partition_name(month)
+        if name in existing:
+            continue
+        await connection.execute(text(create_partition_sql(month)))
+        created.append(name)
+    return created
+
+
+async def detach_partitions_before(
+    connection: AsyncConnection,
+    *,
+    cutoff: date,
+    drop: bool = False,
+) -> list[str]:
+    """Detach (and optionally drop) monthly partitions that end on or before `cutoff`."""
+    detached = []
+    for name in await list_partitions(connection):
+        month = partition_month(name)
+        if month is None or add_months(month, 1) > month_start(cutoff):
+            continue
+        await connection.execute(text(f"ALTER TABLE {PARENT_TABLE} DETACH PARTITION {name}"))
+        if drop:
+            await connection.execute(text(f"DROP TABLE {name}"))
+        detached.append(name)
+    return detached
+
+
+async def _run(args: argparse.Namespace) -> None:
+    engine = create_async_engine(get_settings().database_url)
+    async with engine.begin() as connection:
+        if not await is_partitioned(connection):
+            raise SystemExit("transactions is not partitioned; run migration 0005 first")
+        if args.command == "ensure":
+            names = await ensure_future_partitions(connection, months_ahead=args.months_ahead)
+            print("created:", ", ".join(names) or "none")
+        else:
+            cutoff = datetime.strptime(args.before, "%Y-%m").date()
+            names = await detach_partitions_before(connection, cutoff=cutoff, drop=args.drop)
+            print("detached:", ", ".join(names) or "none")
+    await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Manage monthly transaction partitions.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    ensure = subparsers.add_parser("ensure", help="pre-create upcoming monthly partitions")
+    ensure.add_argument("--months-ahead", type=int, default=3)
+    detach = subparsers.add_parser("detach", help="detach partitions older than a month")
+    detach.add_argument("--before", required=True, help="YYYY-MM; partitions before it go")
+    detach.add_argument("--drop", action="store_true", help="drop detached partitions")
+    asyncio.run(_run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
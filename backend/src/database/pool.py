@@ -0,0 +1,221 @@
+"""Engine construction with configurable, instrumented connection pools."""
+
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass
+from typing import Any
+
+from sqlalchemy import event, exc
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, ConnectionPoolEntry, PoolProxiedConnection
+from sqlalchemy.util.queue import AsyncAdaptedQueue
+
+from src.config import Settings
+
+_CHECKED_IN_AT_KEY = "checked_in_at"
+
+
+@dataclass(frozen=True, slots=True)
+class PoolStats:
+    pool_size: int
+    max_overflow: int
+    checked_out: int
+    checked_in: int
+    overflow_in_use: int
+    peak_checked_out: int
+    peak_overflow_in_use: int
+    checkouts: int
+    timeouts: int
+    wait_seconds_total: float
+    wait_seconds_max: float
+    connects: int
+    invalidations: int
+    liveness_failures: int
+
+
+class PoolMetrics:
+    def __init__(self) -> None:
+        self.pool: AsyncAdaptedQueuePool | None = None
+        self.max_overflow = 0
+        self.checked_out = 0
+        self.peak_checked_out = 0
+        self.peak_overflow_in_use = 0
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+        self.connects = 0
+        self.invalidations = 0
+        self.liveness_failures = 0
+
+    def observe_wait(self, seconds: float) -> None:
+        self.wait_seconds_total += seconds
+        self.wait_seconds_max = max(self.wait_seconds_max, seconds)
+
+    def snapshot(self) -> PoolStats:
+        pool = self.pool
+        return PoolStats(
+            pool_size=pool.size() if pool else 0,
+            max_overflow=self.max_overflow,
+            checked_out=self.checked_out,
+            checked_in=pool.checkedin() if pool else 0,
+            overflow_in_use=max(pool.overflow(), 0) if pool else 0,
+            peak_checked_out=self.peak_checked_out,
+            peak_overflow_in_use=self.peak_overflow_in_use,
+            checkouts=self.checkouts,
+            timeouts=self.timeouts,
+            wait_seconds_total=round(self.wait_seconds_total, 6),
+            wait_seconds_max=round(self.wait_seconds_max, 6),
+            connects=self.connects,
+            invalidations=self.invalidations,
+            liveness_failures=self.liveness_failures,
+        )
+
+
+class _TimedQueue(AsyncAdaptedQueue[ConnectionPoolEntry]):
+    """Pool queue that reports how long callers block waiting for a free connection.
+
+    Only blocking gets are timed, so opening a new (overflow) connection, which
+    the pool does without waiting on the queue, is not counted as wait.
+    """
+
+    metrics: PoolMetrics
+
+    def get(self, block: bool = True, timeout: float | None = None) -> ConnectionPoolEntry:
+        if not block:
+            return super().get(block, timeout)
+        started = time.perf_counter()
+        try:
+            return super().get(block, timeout)
+        finally:
+            self.metrics.observe_wait(time.perf_counter() - started)
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """Queue pool that reports how long callers wait for a connection.
+
+    Use `instrumented_pool_class` to bind a PoolMetrics instance; the binding
+    lives on the class so pools rebuilt by `recreate()` keep reporting.
+    """
+
+    metrics: PoolMetrics
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.metrics.pool = self
+        self.metrics.max_overflow = self._max_overflow
+
+    def connect(self) -> PoolProxiedConnection:
+        try:
+            return super().connect()
+        except exc.TimeoutError:
+            self.metrics.timeouts += 1
+            raise
+
+
+def instrumented_pool_class(metrics: PoolMetrics) -> type[InstrumentedQueuePool]:
+    queue_class = type(_TimedQueue.__name__, (_TimedQueue,), {"metrics": metrics})
+    return type(
+        InstrumentedQueuePool.__name__,
+        (InstrumentedQueuePool,),
+        {"metrics": metrics, "_queue_class": queue_class},
+    )
+
+
+def _attach_metrics(engine: AsyncEngine, metrics: PoolMetrics) -> None:
+    pool = engine.sync_engine.pool
+
+    @event.listens_for(pool, "connect")
+    def _on_connect(dbapi_connection: Any, connection_record: ConnectionPoolEntry) -> None:
+        metrics.connects += 1
+
+    @event.listens_for(pool, "checkout")
+    def _on_checkout(
+        dbapi_connection: Any,
+        connection_record: ConnectionPoolEntry,
+        connection_proxy: PoolProxiedConnection,
+    ) -> None:
+        metrics.checkouts += 1
+        metrics.checked_out += 1
+        metrics.peak_checked_out = max(metrics.peak_checked_out, metrics.checked_out)
+        if metrics.pool is not None:
+            metrics.peak_overflow_in_use = max(
+                metrics.peak_overflow_in_use,
+                metrics.pool.overflow(),
+            )
+
+    @event.listens_for(pool, "checkin")
+    def _on_checkin(dbapi_connection: Any, connection_record: ConnectionPoolEntry) -> None:
+        metrics.checked_out = max(metrics.checked_out - 1, 0)
+
+    @event.listens_for(pool, "invalidate")
+    def _on_invalidate(
+        dbapi_connection: Any,
+        connection_record: ConnectionPoolEntry,
+        exception: BaseException | None,
+    ) -> None:
+        metrics.invalidations += 1
+
+
+def _attach_idle_ping(engine: AsyncEngine, idle_seconds: float, metrics: PoolMetrics) -> None:
+    """Ping only connections that sat idle longer than `idle_seconds`.
+
+    Unlike pool_pre_ping this skips the extra round trip for connections that
+    were returned moments ago, which is the common case under load.
+    """
+    pool = engine.sync_engine.pool
+
+    @event.listens_for(pool, "checkin")
+    def _stamp_checkin(dbapi_connection: Any, connection_record: ConnectionPoolEntry) -> None:
+        connection_record.info[_CHECKED_IN_AT_KEY] = time.monotonic()
+
+    @event.listens_for(pool, "checkout")
+    def _ping_if_idle(
+        dbapi_connection: Any,
+        connection_record: ConnectionPoolEntry,
+        connection_proxy: PoolProxiedConnection,
+    ) -> None:
+        checked_in_at = connection_record.info.get(_CHECKED_IN_AT_KEY)
+        if checked_in_at is None or time.monotonic() - checked_in_at < idle_seconds:
+            return
+        cursor = dbapi_connection.cursor()
+        try:
+            cursor.execute("SELECT 1")
+        except Exception as error:
+            metrics.liveness_failures += 1
+            # The metrics checkout listener, attached first, already counted this
+            # connection; the pool invalidates it and checks out again.
+            metrics.checked_out = max(metrics.checked_out - 1, 0)
+            raise exc.DisconnectionError() from error
+        finally:
+            cursor.close()
+
+
+def build_engine(url: str, *, settings: Settings, metrics: PoolMetrics) -> AsyncEngine:
+    database_url = make_url(url)
+    options: dict[str, Any] = {"pool_pre_ping": settings.db_pool_liveness == "pre_ping"}
+    in_memory_sqlite = database_url.get_backend_name() == "sqlite" and (
+        database_url.database in (None, "", ":memory:")
+    )
+    if not in_memory_sqlite:
+        options.update(
+            poolclass=instrumented_pool_class(metrics),
+            pool_size=settings.db_pool_size,
+            max_overflow=settings.db_max_overflow,
+            pool_timeout=settings.db_pool_timeout,
+            pool_recycle=settings.db_pool_recycle,
+        )
+    if database_url.get_driver_name() == "asyncpg":
+        cache_size = settings.db_statement_cache_size
+        options["connect_args"] = {"statement_cache_size": cache_size}
+        database_url = database_url.update_query_dict(
+            {"prepared_statement_cache_size": str(cache_size)}
+        )
+
+    engine = create_async_engine(database_url, **options)
+    _attach_metrics(engine, metrics)
+    if settings.db_pool_liveness == "idle_ping":
+        _attach_idle_ping(engine, settings.db_pool_idle_ping_seconds, metrics)
+    return engine
@@ -0,0 +1,119 @@
+"""Read-replica routing with a read-your-writes window."""
+
+from __future__ import annotations
+
+import time
+from collections.abc import Callable, Iterable
+from functools import lru_cache
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.orm import Session, UOWTransaction
+
+from src.config import get_settings
+
+_WRITTEN_USERS_KEY = "routing_written_user_ids"
+
+
+class WriteTracker:
+    """Remembers when each user last committed a write.
+
+    State is per process, so the window only covers reads served by the
+    worker that handled the write.
+    """
+
+    def __init__(
+        self,
+        window_seconds: float,
+        *,
+        clock: Callable[[], float] = time.monotonic,
+        max_users: int = 10_000,
+    ) -> None:
+        self._window = window_seconds
+        self._clock = clock
+        self._max_users = max_users
+        self._last_write: dict[str, float] = {}
+
+    def record(self, user_ids: Iterable[str]) -> None:
+        if self._window <= 0:
+            return
+        now = self._clock()
+        for user_id in user_ids:
+            self._last_write.pop(user_id, None)
+            self._last_write[user_id] = now
+        if len(self._last_write) > self._max_users:
+            self._prune(now)
+
+    def wrote_recently(self, user_id: str) -> bool:
+        written_at = self._last_write.get(user_id)
+        return written_at is not None and self._clock() - written_at < self._window
+
+    def _prune(self, now: float) -> None:
+        cutoff = now - self._window
+        for user_id, written_at in list(self._last_write.items()):
+            if written_at >= cutoff and len(self._last_write) <= self._max_users:
+                break
+            del self._last_write[user_id]
+
+
+class SessionRouter:
+    def __init__(
+        self,
+        primary: async_sessionmaker[AsyncSession],
+        replica: async_sessionmaker[AsyncSession] | None,
+        tracker: WriteTracker | None = None,
+    ) -> None:
+        self._primary = primary
+        self._replica = replica
+        self._tracker = tracker
+
+    def for_write(self) -> async_sessionmaker[AsyncSession]:
+        return self._primary
+
+    def for_read(self, user_id: str) -> async_sessionmaker[AsyncSession]:
+        tracker = self._tracker or get_write_tracker()
+        if self._replica is None or tracker.wrote_recently(user_id):
+            return self._primary
+        return self._replica
+
+
+@lru_cache
+def get_write_tracker() -> WriteTracker:
+    return WriteTracker(get_settings().read_your_writes_seconds)
+
+
+def record_writes(session: AsyncSession | Session, user_ids: Iterable[str]) -> None:
+    """Flag users whose data this session changed; recorded once it commits."""
+    written: set[str] = session.info.setdefault(_WRITTEN_USERS_KEY, set())
+    written.update(user_ids)
+
+
+def pending_written_users(session: Session) -> set[str]:
+    """Users flagged by `record_writes` (or flushed entities) in the open transaction."""
+    written: set[str] = session.info.get(_WRITTEN_USERS_KEY, set())
+    return written
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_written_users(
+    session: Session,
+    flush_context: UOWTransaction,
+) -> None:
+    instances: list[Any] = [*session.new, *session.dirty, *session.deleted]
+    record_writes(
+        session,
+        (instance.user_id for instance in instances if getattr(instance, "user_id", None)),
+    )
+
+
+@event.listens_for(Session, "after_commit")
+def _record_after_commit(session: Session) -> None:
+    written = session.info.pop(_WRITTEN_USERS_KEY, None)
+    if written:
+        get_write_tracker().record(written)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_after_rollback(session: Session) -> None:
+    session.info.pop(_WRITTEN_USERS_KEY, None)
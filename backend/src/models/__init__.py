@@ -1,5 +1,28 @@
+from src.models.anomaly import Anomaly, CategoryStats
 from src.models.base import Base
-from src.models.entry import Entry
-from src.models.transaction import Transaction
+from src.models.budget import Budget, CategorySpend
+from src.models.change_counter import UserChangeCounter
+from src.models.entry import Entry, EntryParserOutput
+from src.models.fx import FxRate
+from src.models.idempotency import IdempotencyKey
+from src.models.preference import UserPreference
+from src.models.recurring import RecurringGroupChange, RecurringSeries
+from src.models.transaction import Transaction, TransactionArchive
 
-__all__ = ["Base", "Entry", "Transaction"]
+__all__ = [
+    "Anomaly",
+    "Base",
+    "Budget",
+    "CategorySpend",
+    "CategoryStats",
+    "Entry",
+    "EntryParserOutput",
+    "FxRate",
+    "IdempotencyKey",
+    "RecurringGroupChange",
+    "RecurringSeries",
+    "Transaction",
+    "TransactionArchive",
+    "UserChangeCounter",
+    "UserPreference",
+]
@@ -0,0 +1,58 @@
+"""Rolling category statistics and the anomalies scored against them."""
+
+from __future__ import annotations
+
+from datetime import datetime
+from decimal import Decimal
+
+from sqlalchemy import DateTime, Float, Index, Integer, Numeric, String
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.sql import func
+
+from src.models.base import Base
+
+
+class CategoryStats(Base):
+    """EWMA mean and variance of log outflow amounts and log gaps (in days).
+
+    Updated in place by each confirm; a bulk recompute rebuilds it from history.
+    """
+
+    __tablename__ = "category_stats"
+
+    user_id: Mapped[str] = mapped_column(String(64), primary_key=True)
+    category: Mapped[str] = mapped_column(String(50), primary_key=True)
+    currency: Mapped[str] = mapped_column(String(3), primary_key=True)
+    amount_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    amount_mean: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
+    amount_var: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
+    gap_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    gap_mean: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
+    gap_var: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
+    last_occurred_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
+
+
+class Anomaly(Base):
+    __tablename__ = "anomalies"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    user_id: Mapped[str] = mapped_column(String(64), nullable=False)
+    transaction_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    # "amount", "frequency" or "large_amount"
+    kind: Mapped[str] = mapped_column(String(20), nullable=False)
+    score: Mapped[float] = mapped_column(Float, nullable=False)
+    category: Mapped[str] = mapped_column(String(50), nullable=False)
+    currency: Mapped[str] = mapped_column(String(3), nullable=False)
+    amount: Mapped[Decimal] = mapped_column(Numeric(12, 2), nullable=False)
+    # Typical amount, or typical gap in days for frequency anomalies.
+    expected: Mapped[float | None] = mapped_column(Float)
+    occurred_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    detected_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        nullable=False,
+    )
+
+
+Index("ix_anomalies_user_occurred_at_id", Anomaly.user_id, Anomaly.occurred_at, Anomaly.id)
+Index("ix_anomalies_transaction_id", Anomaly.transaction_id)
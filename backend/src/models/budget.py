@@ -0,0 +1,54 @@
+"""Budget and running category spend models."""
+
+from __future__ import annotations
+
+from datetime import datetime
+from decimal import Decimal
+
+from sqlalchemy import DateTime, Integer, Numeric, String, UniqueConstraint
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.sql import func
+
+from src.models.base import Base
+
+
+class Budget(Base):
+    __tablename__ = "budgets"
+    __table_args__ = (UniqueConstraint("user_id", "category", "month", name="uq_budgets_scope"),)
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    user_id: Mapped[str] = mapped_column(String(64), nullable=False)
+    category: Mapped[str] = mapped_column(String(50), nullable=False)
+    # Calendar month in the owner's timezone ("YYYY-MM", of Transaction.local_date),
+    # matching the summary cache's month keys.
+    month: Mapped[str] = mapped_column(String(7), nullable=False)
+    currency: Mapped[str] = mapped_column(String(3), nullable=False, server_default="INR")
+    limit_amount: Mapped[Decimal] = mapped_column(Numeric(12, 2), nullable=False)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        nullable=False,
+    )
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        onupdate=func.now(),
+        nullable=False,
+    )
+
+
+class CategorySpend(Base):
+    """Running total of live outflows per (user, category, month, currency).
+
+    Maintained by the transaction write services, so budget checks read one
+    row instead of aggregating the user's history.
+    """
+
+    __tablename__ = "category_spend"
+
+    user_id: Mapped[str] = mapped_column(String(64), primary_key=True)
+    category: Mapped[str] = mapped_column(String(50), primary_key=True)
+    month: Mapped[str] = mapped_column(String(7), primary_key=True)
+    currency: Mapped[str] = mapped_column(String(3), primary_key=True)
+    spent: Mapped[Decimal] = mapped_column(Numeric(14, 2), nullable=False)
+    transaction_count: Mapped[int] = mapped_column(Integer, nullable=False)
@@ -0,0 +1,17 @@
+"""Per-user change counter model."""
+
+from __future__ import annotations
+
+from sqlalchemy import BigInteger, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from src.models.base import Base
+
+
+class UserChangeCounter(Base):
+    """Bumped in the same transaction as every commit that writes a user's data."""
+
+    __tablename__ = "user_change_counters"
+
+    user_id: Mapped[str] = mapped_column(String(64), primary_key=True)
+    version: Mapped[int] = mapped_column(BigInteger, nullable=False)
@@ -5,7 +5,20 @@ from __future__ import annotations
 from datetime import datetime
 from typing import Any
 
-from sqlalchemy import JSON, DateTime, Enum, String, Text
+from sqlalchemy import (
+    JSON,
+    Connection,
+    DateTime,
+    Enum,
+    ForeignKey,
+    Index,
+    Integer,
+    LargeBinary,
+    String,
+    Table,
+    Text,
+    event,
+)
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.sql import func
@@ -35,9 +48,11 @@ class Entry(Base):
         onupdate=func.now(),
         nullable=False,
     )
+    # Post-processed parser output only; the raw LLM output is in EntryParserOutput.
     parser_output_json: Mapped[dict[str, Any] | None] = mapped_column(
         JSON().with_variant(JSONB, "postgresql"),
         nullable=True,
+        deferred=True,
     )
     parser_version: Mapped[str | None] = mapped_column(String(50), nullable=True)
     status: Mapped[EntryStatus] = mapped_column(
@@ -46,8 +61,84 @@ class Entry(Base):
         server_default=EntryStatus.parsed.value,
     )
     notes: Mapped[str | None] = mapped_column(Text, nullable=True)
+    # Raw text, parser summary and categories; kept current by the entry services.
+    search_document: Mapped[str | None] = mapped_column(Text, nullable=True, deferred=True)
 
     transactions: Mapped[list["Transaction"]] = relationship(
         back_populates="entry",
         cascade="all, delete-orphan",
     )
+    raw_parser_output: Mapped[EntryParserOutput | None] = relationship(
+        cascade="all, delete-orphan",
+        passive_deletes=True,
+        lazy="raise",
+    )
+
+
+class EntryParserOutput(Base):
+    """Compressed raw LLM output, read only when explicitly requested."""
+
+    __tablename__ = "entry_parser_outputs"
+
+    entry_id: Mapped[int] = mapped_column(
+        ForeignKey("entries.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    codec: Mapped[str] = mapped_column(String(10), nullable=False)
+    payload: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)
+    raw_bytes: Mapped[int] = mapped_column(Integer, nullable=False)
+
+
+Index("ix_entries_user_created_at_id", Entry.user_id, Entry.created_at.desc(), Entry.id.desc())
+Index("ix_entries_user_updated_at_id", Entry.user_id, Entry.updated_at, Entry.id)
+Index(
+    "ix_entries_user_status_created_at_id",
+    Entry.user_id,
+    Entry.status,
+    Entry.created_at.desc(),
+    Entry.id.desc(),
+)
+
+# Full-text search. PostgreSQL indexes a generated tsvector plus trigrams for
+# fuzzy matches; SQLite mirrors search_document into an FTS5 table.
+ENTRY_SEARCH_VECTOR_SQL = (
+    "ALTER TABLE entries ADD COLUMN search_vector tsvector GENERATED ALWAYS AS "
+    "(to_tsvector('simple', coalesce(search_document, ''))) STORED"
+)
+ENTRY_SEARCH_POSTGRESQL_DDL = (
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    ENTRY_SEARCH_VECTOR_SQL,
+    "CREATE INDEX ix_entries_search_vector ON entries USING gin (search_vector)",
+    "CREATE INDEX ix_entries_search_document_trgm ON entries "
+    "USING gin (search_document gin_trgm_ops)",
+)
+ENTRY_SEARCH_SQLITE_DDL = (
+    "CREATE VIRTUAL TABLE entries_fts USING fts5("
+    "search_document, content='entries', content_rowid='id', "
+    "tokenize='unicode61 remove_diacritics 2')",
+    "CREATE TRIGGER entries_fts_ai AFTER INSERT ON entries BEGIN "
+    "INSERT INTO entries_fts(rowid, search_document) "
+    "VALUES (new.id, coalesce(new.search_document, '')); END",
+    "CREATE TRIGGER entries_fts_ad AFTER DELETE ON entries BEGIN "
+    "INSERT INTO entries_fts(entries_fts, rowid, search_document) "
+    "VALUES ('delete', old.id, coalesce(old.search_document, '')); END",
+    "CREATE TRIGGER entries_fts_au AFTER UPDATE OF search_document ON entries BEGIN "
+    "INSERT INTO entries_fts(entries_fts, rowid, search_document) "
+    "VALUES ('delete', old.id, coalesce(old.search_document, '')); "
+    "INSERT INTO entries_fts(rowid, search_document) "
+    "VALUES (new.id, coalesce(new.search_document, '')); END",
+)
+
+ENTRY_SEARCH_DDL = {"postgresql": ENTRY_SEARCH_POSTGRESQL_DDL, "sqlite": ENTRY_SEARCH_SQLITE_DDL}
+
+
+@event.listens_for(Entry.__table__, "after_create")
+def _create_entry_search(target: Table, connection: Connection, **kw: Any) -> None:
+    for statement in ENTRY_SEARCH_DDL.get(connection.dialect.name, ()):
+        connection.exec_driver_sql(statement)
+
+
+@event.listens_for(Entry.__table__, "before_drop")
+def _drop_entry_search(target: Table, connection: Connection, **kw: Any) -> None:
+    if connection.dialect.name == "sqlite":
+        connection.exec_driver_sql("DROP TABLE IF EXISTS entries_fts")
@@ -5,6 +5,7 @@ from enum import Enum
 
 class EntrySource(str, Enum):
     manual_text = "manual_text"
+    bulk_import = "bulk_import"
 
 
 class EntryStatus(str, Enum):
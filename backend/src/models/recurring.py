@@ -0,0 +1,77 @@
+"""Recurring transaction series models."""
+
+from __future__ import annotations
+
+from datetime import datetime
+from decimal import Decimal
+
+from sqlalchemy import BigInteger, DateTime, Enum, Float, Index, Integer, Numeric, String
+from sqlalchemy.dialects.postgresql import ENUM
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.sql import func
+
+from src.models.base import Base
+from src.models.enums import TransactionDirection
+
+
+class RecurringSeries(Base):
+    """A detected run of similar transactions at a regular interval (rent, salary, ...)."""
+
+    __tablename__ = "recurring_series"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    user_id: Mapped[str] = mapped_column(String(64), nullable=False)
+    direction: Mapped[TransactionDirection] = mapped_column(
+        # Created with `transactions`; see TransactionArchive.direction.
+        Enum(TransactionDirection, name="transaction_direction").with_variant(
+            ENUM(TransactionDirection, name="transaction_direction", create_type=False),
+            "postgresql",
+        ),
+        nullable=False,
+    )
+    currency: Mapped[str] = mapped_column(String(3), nullable=False)
+    category: Mapped[str] = mapped_column(String(50), nullable=False)
+    cadence: Mapped[str] = mapped_column(String(20), nullable=False)
+    period_days: Mapped[float] = mapped_column(Float, nullable=False)
+    amount: Mapped[Decimal] = mapped_column(Numeric(12, 2), nullable=False)
+    amount_min: Mapped[Decimal] = mapped_column(Numeric(12, 2), nullable=False)
+    amount_max: Mapped[Decimal] = mapped_column(Numeric(12, 2), nullable=False)
+    occurrences: Mapped[int] = mapped_column(Integer, nullable=False)
+    first_seen_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    last_seen_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    next_expected_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    confidence: Mapped[float] = mapped_column(Float, nullable=False)
+    detected_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        nullable=False,
+    )
+
+
+class RecurringGroupChange(Base):
+    """A (user, direction, currency, category) group whose transactions changed.
+
+    Maintained by the transaction write services; the detection job re-analyses
+    only these groups and removes a row once it has seen its latest version.
+    """
+
+    __tablename__ = "recurring_group_changes"
+
+    user_id: Mapped[str] = mapped_column(String(64), primary_key=True)
+    direction: Mapped[TransactionDirection] = mapped_column(
+        Enum(TransactionDirection, name="transaction_direction").with_variant(
+            ENUM(TransactionDirection, name="transaction_direction", create_type=False),
+            "postgresql",
+        ),
+        primary_key=True,
+    )
+    currency: Mapped[str] = mapped_column(String(3), primary_key=True)
+    category: Mapped[str] = mapped_column(String(50), primary_key=True)
+    version: Mapped[int] = mapped_column(BigInteger, nullable=False)
+
+
+Index(
+    "ix_recurring_series_user_next_expected",
+    RecurringSeries.user_id,
+    RecurringSeries.next_expected_at,
+)
@@ -2,14 +2,25 @@
 
 from __future__ import annotations
 
-from datetime import datetime
+from datetime import date, datetime
 from decimal import Decimal
 from typing import Any
 
-from sqlalchemy import Boolean, DateTime, Enum, ForeignKey, JSON, Numeric, String, false
-from sqlalchemy.sql import func
-from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy import (
+    JSON,
+    Boolean,
+    Date,
+    DateTime,
+    Enum,
+    ForeignKey,
+    Index,
+    Numeric,
+    String,
+    false,
+)
+from sqlalchemy.dialects.postgresql import ENUM, JSONB
 from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy.sql import func
 
 from src.models.base import Base
 from src.models.enums import TransactionDirection, TransactionType
@@ -19,6 +30,7 @@ class Transaction(Base):
     __tablename__ = "transactions"
 
     id: Mapped[int] = mapped_column(primary_key=True)
+    user_id: Mapped[str] = mapped_column(String(64), nullable=False)
     entry_id: Mapped[int] = mapped_column(
         ForeignKey("entries.id"),
         nullable=False,
@@ -29,6 +41,9 @@ class Transaction(Base):
         nullable=False,
         index=True,
     )
+    # Calendar date of occurred_at in the owner's timezone when written; months,
+    # trend buckets and date filters use it so they need no per-row zone math.
+    local_date: Mapped[date] = mapped_column(Date, nullable=False)
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True),
         server_default=func.now(),
@@ -66,3 +81,89 @@ class Transaction(Base):
     )
 
     entry: Mapped["Entry"] = relationship(back_populates="transactions")
+
+
+class TransactionArchive(Base):
+    """Soft-deleted transactions moved out of the hot table by the archive job."""
+
+    __tablename__ = "transactions_archive"
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=False)
+    user_id: Mapped[str] = mapped_column(String(64), nullable=False)
+    entry_id: Mapped[int] = mapped_column(nullable=False)
+    occurred_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    local_date: Mapped[date | None] = mapped_column(Date)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    amount: Mapped[Decimal] = mapped_column(Numeric(12, 2), nullable=False)
+    currency: Mapped[str] = mapped_column(String(3), nullable=False)
+    direction: Mapped[TransactionDirection] = mapped_column(
+        # The PostgreSQL types are created with `transactions`; the variant does not re-create
+        # them (generic Enum only accepts create_type from SQLAlchemy 2.1).
+        Enum(TransactionDirection, name="transaction_direction").with_variant(
+            ENUM(TransactionDirection, name="transaction_direction", create_type=False),
+            "postgresql",
+        ),
+        nullable=False,
+    )
+    type: Mapped[TransactionType] = mapped_column(
+        Enum(TransactionType, name="transaction_type").with_variant(
+            ENUM(TransactionType, name="transaction_type", create_type=False), "postgresql"
+        ),
+        nullable=False,
+    )
+    category: Mapped[str] = mapped_column(String(50), nullable=False)
+    assumptions_json: Mapped[dict[str, Any] | list[str] | None] = mapped_column(
+        JSON().with_variant(JSONB, "postgresql"),
+        nullable=True,
+    )
+    archived_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        nullable=False,
+    )
+
+
+LIVE_TRANSACTION_PREDICATE = Transaction.is_deleted.is_(False)
+DELETED_TRANSACTION_PREDICATE = Transaction.is_deleted.is_(True)
+
+Index(
+    "ix_transactions_live_user_occurred_at",
+    Transaction.user_id,
+    Transaction.occurred_at.desc(),
+    Transaction.id,
+    postgresql_where=LIVE_TRANSACTION_PREDICATE,
+    sqlite_where=LIVE_TRANSACTION_PREDICATE,
+)
+Index(
+    "ix_transactions_live_entry_id",
+    Transaction.entry_id,
+    postgresql_where=LIVE_TRANSACTION_PREDICATE,
+    sqlite_where=LIVE_TRANSACTION_PREDICATE,
+)
+Index(
+    "ix_transactions_live_user_local_date",
+    Transaction.user_id,
+    Transaction.local_date,
+    postgresql_include=["direction", "category", "currency", "amount", "id"],
+    postgresql_where=LIVE_TRANSACTION_PREDICATE,
+    sqlite_where=LIVE_TRANSACTION_PREDICATE,
+)
+Index(
+    "ix_transactions_user_updated_at_id",
+    Transaction.user_id,
+    Transaction.updated_at,
+    Transaction.id,
+)
+Index(
+    "ix_transactions_deleted_updated_at_id",
+    Transaction.updated_at,
+    Transaction.id,
+    postgresql_where=DELETED_TRANSACTION_PREDICATE,
+    sqlite_where=DELETED_TRANSACTION_PREDICATE,
+)
+Index(
+    "ix_transactions_archive_user_occurred_at",
+    TransactionArchive.user_id,
+    TransactionArchive.occurred_at,
+)
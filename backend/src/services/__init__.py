@@ -1,26 +1,110 @@
+from src.services.anomaly_service import (
+    list_anomalies,
+    observe_imported_transactions,
+    observe_transactions,
+    recompute_user_stats,
+)
+from src.services.budget_service import (
+    budget_events,
+    get_budget_statuses,
+    list_budgets,
+    pending_spend_changes,
+    upsert_budget,
+)
+from src.services.change_counter import get_change_version
 from src.services.entry_service import (
     create_entry,
     get_entry,
     list_entries,
+    list_entry_feed,
+    load_parser_outputs,
+    refresh_search_document,
     update_entry_status,
 )
-from src.services.schemas import EntryCreate, TransactionCreate
+from src.services.idempotency_service import (
+    IdempotencyKeyInProgress,
+    IdempotencyKeyReused,
+    claim_idempotency_key,
+    complete_idempotency_key,
+    purge_expired_idempotency_keys,
+    release_idempotency_key,
+    request_fingerprint,
+    wait_for_idempotent_response,
+)
+from src.services.preference_service import (
+    UnknownTimezone,
+    get_user_timezone,
+    set_user_timezone,
+)
+from src.services.recurring_service import is_active, list_recurring_series
+from src.services.schemas import (
+    EntryCreate,
+    StoredResponse,
+    SyncPosition,
+    TransactionCreate,
+    TrendGranularity,
+    TrendGroupBy,
+)
+from src.services.search_service import search_entries
+from src.services.sync_service import get_sync_changes
 from src.services.transaction_service import (
+    bulk_insert_transactions,
+    count_transactions,
     create_transactions,
+    list_transaction_rows,
     list_transactions,
     list_transactions_for_entry,
     soft_delete_transactions_for_entry,
+    stream_transaction_rows,
 )
+from src.services.trend_service import get_trends
 
 __all__ = [
+    "list_anomalies",
+    "observe_imported_transactions",
+    "observe_transactions",
+    "recompute_user_stats",
+    "budget_events",
+    "get_budget_statuses",
+    "list_budgets",
+    "pending_spend_changes",
+    "upsert_budget",
+    "get_change_version",
     "create_entry",
     "EntryCreate",
     "get_entry",
     "list_entries",
+    "list_entry_feed",
+    "load_parser_outputs",
+    "refresh_search_document",
     "update_entry_status",
+    "IdempotencyKeyInProgress",
+    "IdempotencyKeyReused",
+    "claim_idempotency_key",
+    "complete_idempotency_key",
+    "purge_expired_idempotency_keys",
+    "release_idempotency_key",
+    "request_fingerprint",
+    "wait_for_idempotent_response",
+    "UnknownTimezone",
+    "get_user_timezone",
+    "set_user_timezone",
+    "is_active",
+    "list_recurring_series",
+    "StoredResponse",
+    "search_entries",
+    "get_sync_changes",
+    "SyncPosition",
+    "bulk_insert_transactions",
+    "count_transactions",
     "create_transactions",
+    "list_transaction_rows",
     "list_transactions",
     "list_transactions_for_entry",
     "soft_delete_transactions_for_entry",
+    "stream_transaction_rows",
     "TransactionCreate",
+    "get_trends",
+    "TrendGranularity",
+    "TrendGroupBy",
 ]
@@ -0,0 +1,557 @@
+"""Spending anomalies scored against rolling per-category statistics.
+
+Each (user, category, currency) keeps an exponentially weighted mean and
+variance of log outflow amounts and of log gaps between outflows. A confirm
+scores its transactions against the stored statistics and folds them in, a
+constant amount of work per transaction whatever the history length. Until a
+category has MIN_OBSERVATIONS outflows, the parser's LARGE_AMOUNT_THRESHOLD is
+the only amount check.
+
+The statistics are not unwound when transactions are deleted or backdated;
+the bulk recompute rebuilds them, and the anomalies, from history with the
+same recurrences evaluated as NumPy scans. A re-confirm passes the rows it
+soft-deleted, so unchanged copies are not folded in a second time. Imports
+are folded in oldest first, and fall back to the recompute only when they
+reach back before a category's last outflow.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import math
+import time
+from collections import Counter
+from collections.abc import Callable, Iterable, Sequence
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from decimal import Decimal
+from typing import Any
+
+import numpy as np
+from sqlalchemy import BigInteger, and_, cast, delete, func, insert, or_, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from src.config import get_settings
+from src.database.dialects import upsert_insert
+from src.models.anomaly import Anomaly, CategoryStats
+from src.models.change_counter import UserChangeCounter
+from src.models.enums import TransactionDirection
+from src.models.transaction import LIVE_TRANSACTION_PREDICATE, Transaction
+from src.parser.postprocess import LARGE_AMOUNT_THRESHOLD
+from src.services.recurring_service import epoch_days_expression
+
+EWMA_ALPHA = 0.1
+MIN_OBSERVATIONS = 5
+AMOUNT_Z_THRESHOLD = 3.0
+FREQUENCY_Z_THRESHOLD = 3.0
+# Standard deviation floor (log units) so a run of identical amounts does not
+# make every small change an outlier.
+MIN_LOG_STD = 0.1
+
+_LARGE_AMOUNT_CENTS = int(LARGE_AMOUNT_THRESHOLD * 100)
+_SECONDS_PER_DAY = 86400.0
+
+
+@dataclass(frozen=True, slots=True)
+class StatsBatch:
+    number: int
+    users: int
+    transactions: int
+    anomalies: int
+    seconds: float
+
+
+def _as_utc(value: datetime) -> datetime:
+    # SQLite hands timestamps back naive; they are stored in UTC.
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+def _ewma_update(count: int, mean: float, var: float, value: float) -> tuple[float, float]:
+    if count == 0:
+        return value, 0.0
+    diff = value - mean
+    return mean + EWMA_ALPHA * diff, (1 - EWMA_ALPHA) * (var + EWMA_ALPHA * diff * diff)
+
+
+def _z_score(value: float, mean: float, var: float) -> float:
+    return (value - mean) / max(math.sqrt(var), MIN_LOG_STD)
+
+
+def _identity(item: Any) -> tuple[str, str, str, datetime, Decimal]:
+    return (
+        item.user_id,
+        item.category,
+        item.currency,
+        _as_utc(item.occurred_at),
+        Decimal(item.amount),
+    )
+
+
+def _score(
+    stats: CategoryStats,
+    transaction: Transaction,
+    *,
+    measure_gap: bool = True,
+) -> tuple[list[Anomaly], float | None]:
+    """Anomalies for one outflow against the stats before it, and its log gap."""
+    amount = Decimal(transaction.amount)
+    log_amount = math.log1p(float(amount))
+    occurred_at = _as_utc(transaction.occurred_at)
+    found = []
+
+    def anomaly(kind: str, score: float, expected: float | None) -> Anomaly:
+        return Anomaly(
+            user_id=transaction.user_id,
+            transaction_id=transaction.id,
+            kind=kind,
+            score=round(score, 3),
+            category=transaction.category,
+            currency=transaction.currency,
+            amount=amount,
+            expected=None if expected is None else round(expected, 2),
+            occurred_at=occurred_at,
+        )
+
+    if stats.amount_count >= MIN_OBSERVATIONS:
+        z = _z_score(log_amount, stats.amount_mean, stats.amount_var)
+        if z >= AMOUNT_Z_THRESHOLD:
+            found.append(anomaly("amount", z, math.expm1(stats.amount_mean)))
+    elif amount >= LARGE_AMOUNT_THRESHOLD:
+        found.append(anomaly("large_amount", float(amount / LARGE_AMOUNT_THRESHOLD), None))
+
+    log_gap = None
+    last = stats.last_occurred_at
+    if measure_gap and last is not None and occurred_at >= _as_utc(last):
+        log_gap = math.log1p((occurred_at - _as_utc(last)).total_seconds() / _SECONDS_PER_DAY)
+        if stats.gap_count >= MIN_OBSERVATIONS:
+            z = _z_score(log_gap, stats.gap_mean, stats.gap_var)
+            if z <= -FREQUENCY_Z_THRESHOLD:
+                found.append(anomaly("frequency", -z, math.expm1(stats.gap_mean)))
+    return found, log_gap
+
+
+async def observe_transactions(
+    session: AsyncSession,
+    transactions: Sequence[Transaction],
+    *,
+    replaced: Iterable[Any] = (),
+) -> list[Anomaly]:
+    """Score flushed transactions and fold their outflows into the category stats.
+
+    `replaced` are the rows the same write soft-deleted (anything with
+    user_id, category, currency, occurred_at, amount and direction). A new
+    outflow identical to one of them is already in the stats and is skipped;
+    one at the same time with another amount is scored on its amount only,
+    since its gap would be measured against its own previous copy.
+
+    The stats rows are locked for the rest of the transaction, so concurrent
+    confirms in the same category apply their updates one after the other.
+    """
+    previous = Counter(
+        _identity(item) for item in replaced if item.direction == TransactionDirection.outflow
+    )
+    outflows = []
+    for item in transactions:
+        if item.direction != TransactionDirection.outflow:
+            continue
+        identity = _identity(item)
+        if previous[identity]:
+            previous[identity] -= 1
+            continue
+        outflows.append(item)
+    outflows.sort(key=lambda item: _as_utc(item.occurred_at))
+    if not outflows:
+        return []
+    edited = {identity[:4] for identity, count in previous.items() if count}
+    keys = sorted({(item.user_id, item.category, item.currency) for item in outflows})
+    await session.execute(
+        upsert_insert(session, CategoryStats)
+        .values([{"user_id": user, "category": cat, "currency": cur} for user, cat, cur in keys])
+        .on_conflict_do_nothing()
+    )
+    result = await session.execute(
+        select(CategoryStats)
+        .where(
+            tuple_(CategoryStats.user_id, CategoryStats.category, CategoryStats.currency).in_(keys)
+        )
+        .order_by(CategoryStats.user_id, CategoryStats.category, CategoryStats.currency)
+        .with_for_update()
+        .execution_options(populate_existing=True)
+    )
+    stats = {(row.user_id, row.category, row.currency): row for row in result.scalars()}
+
+    anomalies: list[Anomaly] = []
+    for item in outflows:
+        row = stats[(item.user_id, item.category, item.currency)]
+        found, log_gap = _score(row, item, measure_gap=_identity(item)[:4] not in edited)
+        anomalies.extend(found)
+        row.amount_mean, row.amount_var = _ewma_update(
+            row.amount_count,
+            row.amount_mean,
+            row.amount_var,
+            math.log1p(float(item.amount)),
+        )
+        row.amount_count += 1
+        if log_gap is not None:
+            row.gap_mean, row.gap_var = _ewma_update(
+                row.gap_count,
+                row.gap_mean,
+                row.gap_var,
+                log_gap,
+            )
+            row.gap_count += 1
+        if row.last_occurred_at is None or _as_utc(item.occurred_at) > _as_utc(
+            row.last_occurred_at
+        ):
+            row.last_occurred_at = item.occurred_at
+    session.add_all(anomalies)
+    await session.flush()
+    return anomalies
+
+
+def affine_scan(decay: np.ndarray, offset: np.ndarray) -> np.ndarray:
+    """Evaluate y[i] = decay[i] * y[i - 1] + offset[i] for every i at once.
+
+    A zero decay starts a new run, so independent groups laid end to end are
+    scanned together. Uses log2(longest run) doubling steps.
+    """
+    decay = decay.astype(np.float64)
+    offset = offset.astype(np.float64)
+    step = 1
+    while step < len(offset) and decay[step:].any():
+        offset[step:] = offset[step:] + decay[step:] * offset[:-step]
+        decay[step:] = decay[step:] * decay[:-step]
+        step *= 2
+    return offset
+
+
+def _previous(values: np.ndarray) -> np.ndarray:
+    return np.concatenate(([0.0], values[:-1]))
+
+
+def _ewma_prefix(values: np.ndarray, first: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """EWMA mean and variance after each value; `first` marks where a series starts.
+
+    The same recurrences as `_ewma_update`, so a recompute matches online updates.
+    """
+    decay = np.where(first, 0.0, 1 - EWMA_ALPHA)
+    mean = affine_scan(decay, np.where(first, values, EWMA_ALPHA * values))
+    diff = np.where(first, 0.0, values - _previous(mean))
+    var = affine_scan(decay, (1 - EWMA_ALPHA) * EWMA_ALPHA * diff * diff)
+    return mean, var
+
+
+def _robust_z(values: np.ndarray, mean: np.ndarray, var: np.ndarray) -> np.ndarray:
+    z: np.ndarray = (values - mean) / np.maximum(np.sqrt(var), MIN_LOG_STD)
+    return z
+
+
+async def observe_imported_transactions(
+    session: AsyncSession,
+    *,
+    user_id: str,
+    entry_id: int,
+    batch_size: int = 5000,
+) -> None:
+    """Fold a bulk import's outflows into the stats, oldest first.
+
+    The online update assumes each outflow is newer than the ones already in
+    its category's stats. If the import has an outflow older than its
+    category's last one, the user's stats are rebuilt from history instead.
+    """
+    imported = [
+        Transaction.user_id == user_id,
+        Transaction.entry_id == entry_id,
+        Transaction.direction == TransactionDirection.outflow,
+        LIVE_TRANSACTION_PREDICATE,
+    ]
+    first_imported = (
+        select(
+            Transaction.category,
+            Transaction.currency,
+            func.min(Transaction.occurred_at).label("occurred_at"),
+        )
+        .where(*imported)
+        .group_by(Transaction.category, Transaction.currency)
+        .subquery()
+    )
+    backdated = await session.scalar(
+        select(func.count())
+        .select_from(first_imported)
+        .join(
+            CategoryStats,
+            and_(
+                CategoryStats.user_id == user_id,
+                CategoryStats.category == first_imported.c.category,
+                CategoryStats.currency == first_imported.c.currency,
+            ),
+        )
+        .where(CategoryStats.last_occurred_at > first_imported.c.occurred_at)
+    )
+    if backdated:
+        await recompute_user_stats(session, [user_id])
+        return
+
+    # Keyset pages on (occurred_at, id) keep memory bounded by one batch.
+    query = (
+        select(Transaction)
+        .where(*imported)
+        .order_by(Transaction.occurred_at, Transaction.id)
+        .limit(batch_size)
+    )
+    page = query
+    while True:
+        batch = (await session.scalars(page)).all()
+        if batch:
+            await observe_transactions(session, batch)
+        if len(batch) < batch_size:
+            return
+        last = batch[-1]
+        page = query.where(
+            or_(
+                Transaction.occurred_at > last.occurred_at,
+                and_(Transaction.occurred_at == last.occurred_at, Transaction.id > last.id),
+            )
+        )
+
+
+async def recompute_user_stats(session: AsyncSession, user_ids: Sequence[str]) -> tuple[int, int]:
+    """Rebuild the users' stats and anomalies from live history in the caller's transaction.
+
+    Used by the batch job, and after bulk imports whose rows are backdated.
+    """
+    # Lock existing stats first: a confirm waiting on them then reads the
+    # recomputed values instead of overwriting them.
+    await session.execute(
+        select(CategoryStats.user_id).where(CategoryStats.user_id.in_(user_ids)).with_for_update()
+    )
+    query = (
+        select(
+            Transaction.id,
+            Transaction.user_id,
+            Transaction.category,
+            Transaction.currency,
+            cast(func.round(Transaction.amount * 100), BigInteger),
+            epoch_days_expression(session.get_bind().dialect.name, Transaction.occurred_at),
+            Transaction.occurred_at,
+        )
+        .where(
+            LIVE_TRANSACTION_PREDICATE,
+            Transaction.user_id.in_(user_ids),
+            Transaction.direction == TransactionDirection.outflow,
+        )
+        .order_by(
+            Transaction.user_id,
+            Transaction.category,
+            Transaction.currency,
+            Transaction.occurred_at,
+            Transaction.id,
+        )
+    )
+    rows = (await session.execute(query)).all()
+    await session.execute(delete(Anomaly).where(Anomaly.user_id.in_(user_ids)))
+    if not rows:
+        await session.execute(delete(CategoryStats).where(CategoryStats.user_id.in_(user_ids)))
+        return 0, 0
+
+    ids, users, categories, currencies, cents, days, occurred_at = (
+        np.array(column, dtype=object) for column in zip(*rows, strict=True)
+    )
+    cents = cents.astype(np.int64)
+    days = days.astype(np.float64)
+    first = np.ones(len(rows), dtype=bool)
+    first[1:] = (
+        (users[1:] != users[:-1])
+        | (categories[1:] != categories[:-1])
+        | (currencies[1:] != currencies[:-1])
+    )
+    starts = np.flatnonzero(first)
+    sizes = np.diff(np.append(starts, len(rows)))
+    position = np.arange(len(rows)) - np.repeat(starts, sizes)
+    last = starts + sizes - 1
+
+    log_amounts = np.log1p(cents / 100)
+    amount_mean, amount_var = _ewma_prefix(log_amounts, first)
+    amount_z = _robust_z(log_amounts, _previous(amount_mean), _previous(amount_var))
+    scored = position >= MIN_OBSERVATIONS
+    amount_hits = np.flatnonzero(scored & (amount_z >= AMOUNT_Z_THRESHOLD))
+    large_hits = np.flatnonzero(~scored & (cents >= _LARGE_AMOUNT_CENTS))
+
+    # The gap series of a group starts at its second row.
+    log_gaps = np.log1p(np.maximum(np.diff(days, prepend=0.0), 0.0))
+    gap_first = position <= 1
+    gap_mean, gap_var = _ewma_prefix(np.where(position == 0, 0.0, log_gaps), gap_first)
+    gap_var = np.where(position == 0, 0.0, gap_var)
+    gap_z = _robust_z(log_gaps, _previous(gap_mean), _previous(gap_var))
+    frequency_hits = np.flatnonzero(
+        (position - 1 >= MIN_OBSERVATIONS) & (gap_z <= -FREQUENCY_Z_THRESHOLD)
+    )
+
+    def anomaly_values(
+        kind: str,
+        hits: np.ndarray,
+        score: np.ndarray,
+        expected: np.ndarray | None,
+    ) -> list[dict[str, Any]]:
+        return [
+            {
+                "user_id": users[row],
+                "transaction_id": int(ids[row]),
+                "kind": kind,
+                "score": round(float(score[row]), 3),
+                "category": categories[row],
+                "currency": currencies[row],
+                "amount": Decimal(int(cents[row])).scaleb(-2),
+                "expected": None if expected is None else round(float(expected[row]), 2),
+                "occurred_at": occurred_at[row],
+            }
+            for row in hits
+        ]
+
+    anomalies = [
+        *anomaly_values("amount", amount_hits, amount_z, np.expm1(_previous(amount_mean))),
+        *anomaly_values("large_amount", large_hits, cents / _LARGE_AMOUNT_CENTS, None),
+        *anomaly_values("frequency", frequency_hits, -gap_z, np.expm1(_previous(gap_mean))),
+    ]
+    if anomalies:
+        await session.execute(insert(Anomaly), anomalies)
+
+    stats = [
+        {
+            "user_id": users[row],
+            "category": categories[row],
+            "currency": currencies[row],
+            "amount_count": int(sizes[group]),
+            "amount_mean": float(amount_mean[row]),
+            "amount_var": float(amount_var[row]),
+            "gap_count": int(sizes[group] - 1),
+            "gap_mean": float(gap_mean[row]),
+            "gap_var": float(gap_var[row]),
+            "last_occurred_at": occurred_at[row],
+        }
+        for group, row in enumerate(last)
+    ]
+    statement = upsert_insert(session, CategoryStats).values(stats)
+    await session.execute(
+        statement.on_conflict_do_update(
+            index_elements=["user_id", "category", "currency"],
+            set_={
+                column: getattr(statement.excluded, column)
+                for column in (
+                    "amount_count",
+                    "amount_mean",
+                    "amount_var",
+                    "gap_count",
+                    "gap_mean",
+                    "gap_var",
+                    "last_occurred_at",
+                )
+            },
+        )
+    )
+    keys = [(row["user_id"], row["category"], row["currency"]) for row in stats]
+    await session.execute(
+        delete(CategoryStats).where(
+            CategoryStats.user_id.in_(user_ids),
+            tuple_(CategoryStats.user_id, CategoryStats.category, CategoryStats.currency).not_in(
+                keys
+            ),
+        )
+    )
+    return len(rows), len(anomalies)
+
+
+async def recompute_category_stats(
+    session_factory: async_sessionmaker[AsyncSession],
+    *,
+    batch_size: int = 500,
+    max_batches: int | None = None,
+    on_batch: Callable[[StatsBatch], None] | None = None,
+) -> list[StatsBatch]:
+    """Rebuild stats and anomalies from live history, one short transaction per user batch."""
+    batches: list[StatsBatch] = []
+    after: str | None = None
+    while max_batches is None or len(batches) < max_batches:
+        started = time.perf_counter()
+        async with session_factory() as session, session.begin():
+            query = select(UserChangeCounter.user_id).order_by(UserChangeCounter.user_id)
+            if after is not None:
+                query = query.where(UserChangeCounter.user_id > after)
+            user_ids = list((await session.execute(query.limit(batch_size))).scalars())
+            if not user_ids:
+                break
+            transactions, anomalies = await recompute_user_stats(session, user_ids)
+        after = user_ids[-1]
+        batch = StatsBatch(
+            number=len(batches) + 1,
+            users=len(user_ids),
+            transactions=transactions,
+            anomalies=anomalies,
+            seconds=time.perf_counter() - started,
+        )
+        batches.append(batch)
+        if on_batch is not None:
+            on_batch(batch)
+        if len(user_ids) < batch_size:
+            break
+    return batches
+
+
+async def list_anomalies(
+    session: AsyncSession,
+    *,
+    user_id: str,
+    limit: int = 50,
+    after_id: int | None = None,
+) -> list[Anomaly]:
+    """Newest first, keyset-paginated on (occurred_at, id); deleted transactions drop out."""
+    query = (
+        select(Anomaly)
+        .join(Transaction, Transaction.id == Anomaly.transaction_id)
+        .where(Anomaly.user_id == user_id, LIVE_TRANSACTION_PREDICATE)
+        .order_by(Anomaly.occurred_at.desc(), Anomaly.id.desc())
+        .limit(limit)
+    )
+    if after_id is not None:
+        anchor = select(Anomaly.occurred_at).where(Anomaly.id == after_id).scalar_subquery()
+        query = query.where(
+            or_(
+                Anomaly.occurred_at < anchor,
+                and_(Anomaly.occurred_at == anchor, Anomaly.id < after_id),
+            )
+        )
+    result = await session.execute(query)
+    return list(result.scalars())
+
+
+def _print_batch(batch: StatsBatch) -> None:
+    print(
+        f"batch {batch.number}: {batch.users} users, {batch.transactions} outflows, "
+        f"{batch.anomalies} anomalies in {batch.seconds * 1000:.1f} ms"
+    )
+
+
+async def _run(args: argparse.Namespace) -> None:
+    engine = create_async_engine(get_settings().database_url)
+    sessions = async_sessionmaker(engine, expire_on_commit=False)
+    batches = await recompute_category_stats(
+        sessions,
+        batch_size=args.batch_size,
+        max_batches=args.max_batches,
+        on_batch=_print_batch,
+    )
+    users = sum(batch.users for batch in batches)
+    print(f"recomputed category stats for {users} users in {len(batches)} batches")
+    await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Rebuild category stats and anomalies.")
+    parser.add_argument("--batch-size", type=int, default=500, help="users per batch")
+    parser.add_argument("--max-batches", type=int, default=None)
+    asyncio.run(_run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
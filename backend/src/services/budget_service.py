@@ -0,0 +1,257 @@
+"""Monthly category budgets over running spend counters."""
+
+from __future__ import annotations
+
+import calendar
+from collections.abc import Iterable
+from datetime import date
+from decimal import ROUND_HALF_UP, Decimal
+
+from sqlalchemy import SQLColumnExpression, and_, delete, event, func, insert, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.elements import ColumnElement
+
+from src.database.dialects import upsert_insert
+from src.models.budget import Budget, CategorySpend
+from src.models.enums import TransactionDirection
+from src.models.transaction import LIVE_TRANSACTION_PREDICATE, Transaction
+from src.services.schemas import BudgetEvent, BudgetStatus, SpendChange
+from src.services.summary_cache import month_key
+
+# Fractions of the limit at which confirm reports a crossing.
+BUDGET_THRESHOLDS = (Decimal("0.5"), Decimal("0.8"), Decimal("1"))
+
+# (user_id, category, month, currency)
+SpendKey = tuple[str, str, str, str]
+SpendRow = tuple[str, str, date, str, TransactionDirection, Decimal]
+
+_SPEND_CHANGES_KEY = "budget_spend_changes"
+_CENT = Decimal("0.01")
+
+
+def spend_deltas(rows: Iterable[SpendRow], *, sign: int) -> dict[SpendKey, tuple[Decimal, int]]:
+    """Sum outflows per counter key; `sign` is 1 for inserts and -1 for deletes.
+
+    Rows are (user_id, category, local_date, currency, direction, amount).
+    """
+    deltas: dict[SpendKey, tuple[Decimal, int]] = {}
+    for user_id, category, local_date, currency, direction, amount in rows:
+        if direction != TransactionDirection.outflow:
+            continue
+        key = (user_id, category, month_key(local_date), currency)
+        spent, count = deltas.get(key, (Decimal("0"), 0))
+        deltas[key] = (spent + sign * Decimal(amount), count + sign)
+    return deltas
+
+
+async def record_spend(
+    session: AsyncSession,
+    deltas: dict[SpendKey, tuple[Decimal, int]],
+) -> None:
+    """Apply deltas to the running counters: one upsert, O(keys touched)."""
+    if not deltas:
+        return
+    values = [
+        {
+            "user_id": user_id,
+            "category": category,
+            "month": month,
+            "currency": currency,
+            "spent": spent,
+            "transaction_count": count,
+        }
+        for (user_id, category, month, currency), (spent, count) in sorted(deltas.items())
+    ]
+    statement = upsert_insert(session, CategorySpend).values(values)
+    statement = statement.on_conflict_do_update(
+        index_elements=["user_id", "category", "month", "currency"],
+        set_={
+            "spent": CategorySpend.spent + statement.excluded.spent,
+            "transaction_count": CategorySpend.transaction_count
+            + statement.excluded.transaction_count,
+        },
+    ).returning(
+        CategorySpend.user_id,
+        CategorySpend.category,
+        CategorySpend.month,
+        CategorySpend.currency,
+        CategorySpend.spent,
+    )
+    result = await session.execute(statement)
+    changes: dict[SpendKey, SpendChange] = session.info.setdefault(_SPEND_CHANGES_KEY, {})
+    for user_id, category, month, currency, spent in result.all():
+        key = (user_id, category, month, currency)
+        before = changes[key].before if key in changes else spent - deltas[key][0]
+        changes[key] = SpendChange(before=before, after=spent)
+
+
+def _month_expression(dialect_name: str, column: SQLColumnExpression[date]) -> ColumnElement[str]:
+    if dialect_name == "postgresql":
+        return func.to_char(column, "YYYY-MM")
+    return func.strftime("%Y-%m", column)
+
+
+async def rebuild_category_spend(session: AsyncSession, *, user_id: str) -> None:
+    """Recompute a user's counters from their live outflows, grouped by local month."""
+    month = _month_expression(session.get_bind().dialect.name, Transaction.local_date)
+    await session.execute(delete(CategorySpend).where(CategorySpend.user_id == user_id))
+    await session.execute(
+        insert(CategorySpend).from_select(
+            ["user_id", "category", "month", "currency", "spent", "transaction_count"],
+            select(
+                Transaction.user_id,
+                Transaction.category,
+                month,
+                Transaction.currency,
+                func.sum(Transaction.amount),
+                func.count(),
+            )
+            .where(
+                LIVE_TRANSACTION_PREDICATE,
+                Transaction.user_id == user_id,
+                Transaction.direction == TransactionDirection.outflow,
+            )
+            .group_by(Transaction.user_id, Transaction.category, month, Transaction.currency),
+        )
+    )
+
+
+def pending_spend_changes(session: AsyncSession | Session) -> dict[SpendKey, SpendChange]:
+    """Counter movements made in the session's open transaction."""
+    return dict(session.info.get(_SPEND_CHANGES_KEY, {}))
+
+
+@event.listens_for(Session, "after_commit")
+@event.listens_for(Session, "after_rollback")
+def _discard_spend_changes(session: Session) -> None:
+    session.info.pop(_SPEND_CHANGES_KEY, None)
+
+
+async def budget_events(
+    session: AsyncSession,
+    changes: dict[SpendKey, SpendChange],
+) -> list[BudgetEvent]:
+    """Budget thresholds the given counter movements crossed upwards."""
+    if not changes:
+        return []
+    scopes = {(user_id, category, month) for user_id, category, month, _ in changes}
+    result = await session.execute(
+        select(Budget).where(tuple_(Budget.user_id, Budget.category, Budget.month).in_(scopes))
+    )
+    events = []
+    for budget in result.scalars():
+        change = changes.get((budget.user_id, budget.category, budget.month, budget.currency))
+        if change is None:
+            continue
+        for threshold in BUDGET_THRESHOLDS:
+            mark = budget.limit_amount * threshold
+            if change.before < mark <= change.after:
+                events.append(
+                    BudgetEvent(
+                        category=budget.category,
+                        month=budget.month,
+                        currency=budget.currency,
+                        threshold_percent=int(threshold * 100),
+                        limit_amount=budget.limit_amount,
+                        spent=change.after,
+                    )
+                )
+    return sorted(events, key=lambda item: (item.month, item.category, item.threshold_percent))
+
+
+async def upsert_budget(
+    session: AsyncSession,
+    *,
+    user_id: str,
+    category: str,
+    month: str,
+    limit_amount: Decimal,
+    currency: str = "INR",
+    commit: bool = True,
+) -> Budget:
+    budget = await session.scalar(
+        select(Budget).where(
+            Budget.user_id == user_id,
+            Budget.category == category,
+            Budget.month == month,
+        )
+    )
+    if budget is None:
+        budget = Budget(user_id=user_id, category=category, month=month)
+        session.add(budget)
+    budget.limit_amount = limit_amount
+    budget.currency = currency
+    if commit:
+        await session.commit()
+        await session.refresh(budget)
+    else:
+        await session.flush()
+    return budget
+
+
+async def list_budgets(session: AsyncSession, *, user_id: str, month: str) -> list[Budget]:
+    result = await session.execute(
+        select(Budget)
+        .where(Budget.user_id == user_id, Budget.month == month)
+        .order_by(Budget.category)
+    )
+    return list(result.scalars())
+
+
+def _days_elapsed(month: str, today: date) -> tuple[int, int]:
+    year, month_number = (int(part) for part in month.split("-"))
+    days_in_month = calendar.monthrange(year, month_number)[1]
+    if (today.year, today.month) < (year, month_number):
+        return 0, days_in_month
+    if (today.year, today.month) > (year, month_number):
+        return days_in_month, days_in_month
+    return today.day, days_in_month
+
+
+async def get_budget_statuses(
+    session: AsyncSession,
+    *,
+    user_id: str,
+    month: str,
+    today: date,
+) -> list[BudgetStatus]:
+    """Spent, remaining and burn rate per budget, from the counters alone."""
+    result = await session.execute(
+        select(Budget, CategorySpend.spent)
+        .outerjoin(
+            CategorySpend,
+            and_(
+                CategorySpend.user_id == Budget.user_id,
+                CategorySpend.category == Budget.category,
+                CategorySpend.month == Budget.month,
+                CategorySpend.currency == Budget.currency,
+            ),
+        )
+        .where(Budget.user_id == user_id, Budget.month == month)
+        .order_by(Budget.category)
+    )
+    days_elapsed, days_in_month = _days_elapsed(month, today)
+    statuses = []
+    for budget, spent in result.all():
+        spent = spent or Decimal("0")
+        daily_burn = (spent / days_elapsed) if days_elapsed else Decimal("0")
+        statuses.append(
+            BudgetStatus(
+                category=budget.category,
+                month=budget.month,
+                currency=budget.currency,
+                limit_amount=budget.limit_amount,
+                spent=spent,
+                remaining=budget.limit_amount - spent,
+                percent_used=float(spent / budget.limit_amount * 100),
+                days_elapsed=days_elapsed,
+                days_in_month=days_in_month,
+                daily_burn_rate=daily_burn.quantize(_CENT, rounding=ROUND_HALF_UP),
+                projected_spend=(daily_burn * days_in_month).quantize(
+                    _CENT,
+                    rounding=ROUND_HALF_UP,
+                ),
+            )
+        )
+    return statuses
@@ -0,0 +1,40 @@
+"""Per-user data version, bumped by every committing write.
+
+Conditional GETs compare it instead of re-running list or aggregate
+queries: if a user's version has not moved, nothing they can read has.
+"""
+
+from __future__ import annotations
+
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from src.database.dialects import upsert_insert
+from src.database.routing import pending_written_users
+from src.models.change_counter import UserChangeCounter
+
+
+async def get_change_version(session: AsyncSession, user_id: str) -> int:
+    version = await session.scalar(
+        select(UserChangeCounter.version).where(UserChangeCounter.user_id == user_id)
+    )
+    return version or 0
+
+
+@event.listens_for(Session, "before_commit")
+def _bump_versions_before_commit(session: Session) -> None:
+    # Flush first so users written by the final autoflush are included too.
+    session.flush()
+    user_ids = sorted(pending_written_users(session))
+    if not user_ids:
+        return
+    statement = upsert_insert(session, UserChangeCounter).values(
+        [{"user_id": user_id, "version": 1} for user_id in user_ids]
+    )
+    session.execute(
+        statement.on_conflict_do_update(
+            index_elements=[UserChangeCounter.user_id],
+            set_={"version": UserChangeCounter.version + 1},
+        )
+    )
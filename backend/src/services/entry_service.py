@@ -2,12 +2,21 @@
 
 from __future__ import annotations
 
-from sqlalchemy import select
+import json
+from collections.abc import Iterable
+from typing import Any
+
+from sqlalchemy import and_, or_, select
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
 
-from src.models.entry import Entry
+from src.config import get_settings
+from src.models.entry import Entry, EntryParserOutput
 from src.models.enums import EntryStatus
+from src.models.transaction import LIVE_TRANSACTION_PREDICATE
 from src.services.schemas import EntryCreate
+from src.services.search_service import entry_search_document
+from src.utils.compression import compress, decompress
 
 
 async def create_entry(
@@ -16,22 +25,61 @@ async def create_entry(
     entry: EntryCreate,
     commit: bool = True,
 ) -> Entry:
-    entry = Entry(
+    parser_output = dict(entry.parser_output_json or {})
+    raw_output = parser_output.pop("raw_output", None)
+    search_document = entry_search_document(entry.raw_text, entry.parser_output_json)
+    created = Entry(
         user_id=entry.user_id,
         raw_text=entry.raw_text,
         source=entry.source,
-        parser_output_json=entry.parser_output_json,
+        parser_output_json=parser_output or None,
         parser_version=entry.parser_version,
         status=entry.status,
         notes=entry.notes,
+        search_document=search_document,
     )
-    session.add(entry)
+    if raw_output is not None:
+        created.raw_parser_output = _compressed_parser_output(raw_output)
+    session.add(created)
     if commit:
         await session.commit()
-        await session.refresh(entry)
+        await session.refresh(created)
     else:
         await session.flush()
-    return entry
+    return created
+
+
+def _compressed_parser_output(raw_output: Any) -> EntryParserOutput:
+    codec = get_settings().parser_output_codec
+    raw = json.dumps(raw_output, separators=(",", ":"), default=str).encode()
+    return EntryParserOutput(codec=codec, payload=compress(raw, codec), raw_bytes=len(raw))
+
+
+async def load_parser_outputs(
+    session: AsyncSession,
+    entry_ids: Iterable[int],
+) -> dict[int, dict[str, Any]]:
+    """Full parser output ({"raw_output", "post_processed"}) for the given entries."""
+    ids = list(entry_ids)
+    if not ids:
+        return {}
+    result = await session.execute(
+        select(
+            Entry.id,
+            Entry.parser_output_json,
+            EntryParserOutput.codec,
+            EntryParserOutput.payload,
+        )
+        .outerjoin(EntryParserOutput, EntryParserOutput.entry_id == Entry.id)
+        .where(Entry.id.in_(ids))
+    )
+    outputs = {}
+    for entry_id, parser_output, codec, payload in result.all():
+        output = dict(parser_output or {})
+        if payload is not None:
+            output["raw_output"] = json.loads(decompress(payload, codec))
+        outputs[entry_id] = output
+    return outputs
 
 
 async def get_entry(session: AsyncSession, entry_id: int) -> Entry | None:
@@ -55,6 +103,23 @@ async def update_entry_status(
     return entry
 
 
+async def refresh_search_document(
+    session: AsyncSession,
+    entry: Entry,
+    *,
+    categories: Iterable[str],
+) -> dict[str, Any] | None:
+    """Re-index an entry after its confirmed transactions (and so categories) change.
+
+    Returns the entry's parser output, read here without loading the deferred column.
+    """
+    parser_output: dict[str, Any] | None = await session.scalar(
+        select(Entry.parser_output_json).where(Entry.id == entry.id)
+    )
+    entry.search_document = entry_search_document(entry.raw_text, parser_output, categories)
+    return parser_output
+
+
 async def list_entries(
     session: AsyncSession,
     *,
@@ -67,3 +132,38 @@ async def list_entries(
         query = query.where(Entry.user_id == user_id)
     result = await session.execute(query)
     return list(result.scalars())
+
+
+async def list_entry_feed(
+    session: AsyncSession,
+    *,
+    user_id: str,
+    status: EntryStatus | None = None,
+    limit: int = 50,
+    after_id: int | None = None,
+) -> list[Entry]:
+    """Newest entries first with their live transactions loaded in one extra query.
+
+    Keyset-paginated on (created_at, id); `after_id` is the last entry of the
+    previous page, and its created_at is read back from the table so the
+    comparison always uses the stored value.
+    """
+    query = (
+        select(Entry)
+        .where(Entry.user_id == user_id)
+        .options(selectinload(Entry.transactions.and_(LIVE_TRANSACTION_PREDICATE)))
+        .order_by(Entry.created_at.desc(), Entry.id.desc())
+        .limit(limit)
+    )
+    if status is not None:
+        query = query.where(Entry.status == status)
+    if after_id is not None:
+        anchor = select(Entry.created_at).where(Entry.id == after_id).scalar_subquery()
+        query = query.where(
+            or_(
+                Entry.created_at < anchor,
+                and_(Entry.created_at == anchor, Entry.id < after_id),
+            )
+        )
+    result = await session.execute(query)
+    return list(result.scalars())
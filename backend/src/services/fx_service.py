@@ -0,0 +1,223 @@
+"""Exchange rates: a date-indexed in-memory cache over `fx_rates` and a file loader.
+
+Summaries and trends are grouped by (currency, day) in SQL and converted to
+the reporting currency here, one vectorized lookup per currency present.
+Currencies without any loaded rate are reported apart rather than failing the
+whole read.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import csv
+import time
+from collections.abc import Callable, Iterable, Sequence
+from dataclasses import dataclass
+from datetime import date, timezone
+from decimal import Decimal
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from src.config import get_settings
+from src.database.dialects import upsert_insert
+from src.models.fx import FxRate
+from src.services.summary_cache import get_summary_cache
+
+# (rate_date, base, quote, rate)
+RateRow = tuple[date, str, str, Decimal]
+
+
+class FxRateMissing(LookupError):
+    def __init__(self, base: str, quote: str) -> None:
+        super().__init__(f"No {base} to {quote} exchange rate is loaded.")
+        self.base = base
+        self.quote = quote
+
+
+@dataclass(frozen=True, slots=True)
+class RateSeries:
+    days: np.ndarray
+    rates: np.ndarray
+
+
+class FxRateCache:
+    """Every row of `fx_rates`, held as one sorted date array per currency pair.
+
+    The table is loaded in bulk and reloaded only when its row count or last
+    update moves, which is checked at most every `ttl_seconds`. A lookup uses
+    the latest rate on or before each date, or the earliest rate for dates
+    before it; a pair missing in one direction is inverted from the other.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: float,
+        *,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._ttl = ttl_seconds
+        self._clock = clock
+        self._series: dict[tuple[str, str], RateSeries] = {}
+        self._revision: str | None = None
+        self._checked_at: float | None = None
+
+    @property
+    def revision(self) -> str | None:
+        """Identifies the loaded rates across processes; None when there are none."""
+        return self._revision
+
+    async def refresh(self, session: AsyncSession, *, force: bool = False) -> None:
+        now = self._clock()
+        if not force and self._checked_at is not None and now - self._checked_at < self._ttl:
+            return
+        count, updated_at = (
+            await session.execute(select(func.count(), func.max(FxRate.updated_at)))
+        ).one()
+        self._checked_at = now
+        revision = None
+        if count:
+            if updated_at.tzinfo is None:
+                updated_at = updated_at.replace(tzinfo=timezone.utc)
+            # Full precision: two rate loads within one second must still differ.
+            revision = f"{count}.{updated_at.isoformat()}"
+        if revision == self._revision:
+            return
+        result = await session.execute(
+            select(FxRate.base, FxRate.quote, FxRate.rate_date, FxRate.rate).order_by(
+                FxRate.base,
+                FxRate.quote,
+                FxRate.rate_date,
+            )
+        )
+        self._series = build_rate_series(result.all())
+        self._revision = revision
+        # Cached summaries were converted with the previous rates.
+        get_summary_cache().clear()
+
+    def missing_currencies(self, currencies: np.ndarray, *, to: str) -> list[str]:
+        """Currencies among `currencies` with no rate to `to` in either direction."""
+        return [
+            str(currency)
+            for currency in np.unique(currencies)
+            if currency != to
+            and (currency, to) not in self._series
+            and (to, currency) not in self._series
+        ]
+
+    def rates_on(self, base: str, quote: str, days: np.ndarray) -> np.ndarray:
+        if base == quote:
+            return np.ones(len(days))
+        inverse = (base, quote) not in self._series
+        series = self._series.get((quote, base) if inverse else (base, quote))
+        if series is None:
+            raise FxRateMissing(base, quote)
+        index = np.maximum(np.searchsorted(series.days, days, side="right") - 1, 0)
+        rates = series.rates[index]
+        return 1 / rates if inverse else rates
+
+    def convert(
+        self,
+        cents: np.ndarray,
+        currencies: np.ndarray,
+        days: np.ndarray,
+        *,
+        to: str,
+    ) -> np.ndarray:
+        """Amounts in integer cents of `to`, using each row's own day's rate."""
+        converted = cents.astype(np.float64)
+        for currency in np.unique(currencies):
+            if currency == to:
+                continue
+            mask = currencies == currency
+            converted[mask] *= self.rates_on(str(currency), to, days[mask])
+        return np.rint(converted).astype(np.int64)
+
+
+def build_rate_series(
+    rows: Sequence[tuple[str, str, date, Decimal]],
+) -> dict[tuple[str, str], RateSeries]:
+    """Split (base, quote, rate_date, rate) rows sorted by those columns into per-pair arrays."""
+    if not rows:
+        return {}
+    bases, quotes, days, rates = zip(*rows, strict=True)
+    bases_array = np.array(bases)
+    quotes_array = np.array(quotes)
+    days_array = np.array(days, dtype="datetime64[D]")
+    rates_array = np.array(rates, dtype=np.float64)
+    new_pair = np.ones(len(rows), dtype=bool)
+    new_pair[1:] = (bases_array[1:] != bases_array[:-1]) | (quotes_array[1:] != quotes_array[:-1])
+    starts = np.flatnonzero(new_pair)
+    ends = np.append(starts[1:], len(rows))
+    return {
+        (str(bases_array[start]), str(quotes_array[start])): RateSeries(
+            days=days_array[start:end],
+            rates=rates_array[start:end],
+        )
+        for start, end in zip(starts, ends, strict=True)
+    }
+
+
+@lru_cache
+def get_fx_rate_cache() -> FxRateCache:
+    return FxRateCache(get_settings().fx_cache_ttl_seconds)
+
+
+def read_rates_file(path: Path) -> list[RateRow]:
+    """Rows of a CSV file with a `date,base,quote,rate` header."""
+    with path.open(newline="") as handle:
+        return [
+            (
+                date.fromisoformat(row["date"]),
+                row["base"].strip().upper(),
+                row["quote"].strip().upper(),
+                Decimal(row["rate"]),
+            )
+            for row in csv.DictReader(handle)
+        ]
+
+
+async def upsert_fx_rates(
+    session: AsyncSession,
+    rows: Iterable[RateRow],
+    *,
+    batch_size: int = 1000,
+) -> int:
+    """Insert or replace rates, one statement per batch. Nothing is committed here."""
+    values = [
+        {"rate_date": rate_date, "base": base, "quote": quote, "rate": rate}
+        for rate_date, base, quote, rate in rows
+    ]
+    for offset in range(0, len(values), batch_size):
+        statement = upsert_insert(session, FxRate).values(values[offset : offset + batch_size])
+        await session.execute(
+            statement.on_conflict_do_update(
+                index_elements=["base", "quote", "rate_date"],
+                set_={"rate": statement.excluded.rate, "updated_at": func.now()},
+            )
+        )
+    return len(values)
+
+
+async def _run(args: argparse.Namespace) -> None:
+    engine = create_async_engine(get_settings().database_url)
+    sessions = async_sessionmaker(engine, expire_on_commit=False)
+    rows = read_rates_file(args.path)
+    async with sessions() as session, session.begin():
+        loaded = await upsert_fx_rates(session, rows)
+    print(f"loaded {loaded} rates from {args.path}")
+    await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Load exchange rates from a CSV file.")
+    parser.add_argument("path", type=Path, help="CSV with a date,base,quote,rate header")
+    asyncio.run(_run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+"""Idempotency-Key bookkeeping for retried writes."""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+from datetime import datetime, timedelta, timezone
+from typing import Any, cast
+
+from sqlalchemy import CursorResult, and_, delete, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import ColumnElement
+
+from src.config import get_settings
+from src.database.dialects import upsert_insert
+from src.models.idempotency import IdempotencyKey
+from src.services.schemas import StoredResponse
+
+
+class IdempotencyKeyReused(ValueError):
+    """The key was already used for a different request body or endpoint."""
+
+
+class IdempotencyKeyInProgress(TimeoutError):
+    """The request holding the key did not finish within the wait window."""
+
+
+def request_fingerprint(endpoint: str, body: bytes) -> str:
+    return hashlib.sha256(endpoint.encode() + b"\0" + body).hexdigest()
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _key_filter(user_id: str, key: str) -> ColumnElement[bool]:
+    return and_(IdempotencyKey.user_id == user_id, IdempotencyKey.key == key)
+
+
+async def claim_idempotency_key(
+    session: AsyncSession,
+    *,
+    user_id: str,
+    key: str,
+    endpoint: str,
+    request_hash: str,
+) -> bool:
+    """Take the key for this request; False if another request already holds it.
+
+    Expired keys, and in-progress claims older than the wait window (their
+    worker most likely died), are cleared first so they can be taken over.
+    The claim is committed immediately so concurrent duplicates can see it.
+    """
+    settings = get_settings()
+    now = _utcnow()
+    stale_lock = now - timedelta(seconds=settings.idempotency_wait_seconds)
+    await session.execute(
+        delete(IdempotencyKey).where(
+            _key_filter(user_id, key),
+            or_(
+                IdempotencyKey.expires_at <= now,
+                and_(IdempotencyKey.status_code.is_(None), IdempotencyKey.locked_at <= stale_lock),
+            ),
+        )
+    )
+    claimed = await session.scalar(
+        upsert_insert(session, IdempotencyKey)
+        .values(
+            user_id=user_id,
+            key=key,
+            endpoint=endpoint,
+            request_hash=request_hash,
+            locked_at=now,
+            expires_at=now + timedelta(seconds=settings.idempotency_ttl_seconds),
+        )
+        .on_conflict_do_nothing(index_elements=["user_id", "key"])
+        .returning(IdempotencyKey.key)
+    )
+    await session.commit()
+    return claimed is not None
+
+
+async def wait_for_idempotent_response(
+    session: AsyncSession,
+    *,
+    user_id: str,
+    key: str,
+    request_hash: str,
+    timeout: float,
+    poll_interval: float = 0.05,
+) -> StoredResponse | None:
+    """Stored response for a key held by another request, polling until it finishes.
+
+    Returns None if the holder released the key (its request failed), in which
+    case the caller should try to claim it again.
+    """
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    query = select(
+        IdempotencyKey.request_hash,
+        IdempotencyKey.status_code,
+        IdempotencyKey.response_body,
+    ).where(_key_filter(user_id, key))
+    while True:
+        row = (await session.execute(query)).one_or_none()
+        # End the read transaction so the next poll sees a fresh snapshot.
+        await session.rollback()
+        if row is None:
+            return None
+        if row.request_hash != request_hash:
+            raise IdempotencyKeyReused("Idempotency-Key was already used for another request")
+        if row.status_code is not None:
+            return StoredResponse(status_code=row.status_code, body=row.response_body or b"")
+        if loop.time() >= deadline:
+            raise IdempotencyKeyInProgress("A request with this Idempotency-Key is in progress")
+        await asyncio.sleep(poll_interval)
+
+
+async def complete_idempotency_key(
+    session: AsyncSession,
+    *,
+    user_id: str,
+    key: str,
+    response: StoredResponse,
+    commit: bool = True,
+) -> None:
+    await session.execute(
+        update(IdempotencyKey)
+        .where(_key_filter(user_id, key))
+        .values(status_code=response.status_code, response_body=response.body)
+    )
+    if commit:
+        await session.commit()
+
+
+async def release_idempotency_key(session: AsyncSession, *, user_id: str, key: str) -> None:
+    await session.execute(
+        delete(IdempotencyKey).where(
+            _key_filter(user_id, key),
+            IdempotencyKey.status_code.is_(None),
+        )
+    )
+    await session.commit()
+
+
+async def purge_expired_idempotency_keys(session: AsyncSession) -> int:
+    # A DELETE without RETURNING gives a CursorResult, which carries the row count.
+    result = cast(
+        CursorResult[Any],
+        await session.execute(delete(IdempotencyKey).where(IdempotencyKey.expires_at <= _utcnow())),
+    )
+    await session.commit()
+    return result.rowcount
@@ -0,0 +1,135 @@
+"""Per-user timezone and the local dates derived from it.
+
+A transaction's `local_date` is fixed when it is written, from the owner's
+timezone at that moment. Changing the timezone re-derives it for the user's
+existing rows in the same transaction, so reads never convert per row.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterable
+from datetime import date, datetime, timezone
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from sqlalchemy import Date, bindparam, cast, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.config import get_settings
+from src.database.dialects import upsert_insert
+from src.database.routing import record_writes
+from src.models.preference import UserPreference
+from src.models.transaction import Transaction
+from src.services.budget_service import rebuild_category_spend
+from src.services.summary_cache import get_summary_cache
+
+
+class UnknownTimezone(ValueError):
+    def __init__(self, name: str) -> None:
+        super().__init__(f"Unknown timezone: {name}")
+        self.name = name
+
+
+def load_timezone(name: str) -> ZoneInfo:
+    try:
+        return ZoneInfo(name)
+    except (ZoneInfoNotFoundError, ValueError) as exc:
+        raise UnknownTimezone(name) from exc
+
+
+def local_date(occurred_at: datetime, tzinfo: ZoneInfo) -> date:
+    """Calendar date of `occurred_at` in `tzinfo`; naive values are taken as UTC."""
+    if occurred_at.tzinfo is None:
+        occurred_at = occurred_at.replace(tzinfo=timezone.utc)
+    return occurred_at.astimezone(tzinfo).date()
+
+
+async def get_user_timezones(
+    session: AsyncSession,
+    user_ids: Iterable[str],
+) -> dict[str, ZoneInfo]:
+    """Timezone per user, the configured default for users without a preference."""
+    wanted = set(user_ids)
+    default = ZoneInfo(get_settings().default_timezone)
+    zones = dict.fromkeys(wanted, default)
+    if wanted:
+        result = await session.execute(
+            select(UserPreference.user_id, UserPreference.timezone).where(
+                UserPreference.user_id.in_(wanted)
+            )
+        )
+        zones.update((user_id, load_timezone(name)) for user_id, name in result.all())
+    return zones
+
+
+async def get_user_timezone(session: AsyncSession, user_id: str) -> ZoneInfo:
+    return (await get_user_timezones(session, [user_id]))[user_id]
+
+
+async def _relocalize_transactions(
+    session: AsyncSession,
+    *,
+    user_id: str,
+    tzinfo: ZoneInfo,
+) -> None:
+    # updated_at is kept: local_date is not synced, so clients have nothing to re-fetch.
+    # Loaded objects are not synchronized; the caller commits, which expires them.
+    if session.get_bind().dialect.name == "postgresql":
+        await session.execute(
+            update(Transaction)
+            .where(Transaction.user_id == user_id)
+            .values(
+                local_date=cast(func.timezone(tzinfo.key, Transaction.occurred_at), Date),
+                updated_at=Transaction.updated_at,
+            )
+            .execution_options(synchronize_session=False)
+        )
+        return
+    rows = (
+        await session.execute(
+            select(Transaction.id, Transaction.occurred_at).where(Transaction.user_id == user_id)
+        )
+    ).all()
+    if rows:
+        await session.execute(
+            update(Transaction)
+            .where(Transaction.id == bindparam("row_id"))
+            .values(local_date=bindparam("row_local_date"), updated_at=Transaction.updated_at)
+            .execution_options(dml_strategy="core_only"),
+            [
+                {"row_id": row_id, "row_local_date": local_date(occurred_at, tzinfo)}
+                for row_id, occurred_at in rows
+            ],
+        )
+
+
+async def set_user_timezone(
+    session: AsyncSession,
+    *,
+    user_id: str,
+    name: str,
+) -> UserPreference:
+    """Store the user's timezone and re-derive their local dates and spend counters.
+
+    A one-off cost proportional to the user's history, paid at the change
+    rather than on every read.
+    """
+    tzinfo = load_timezone(name)
+    statement = upsert_insert(session, UserPreference).values(user_id=user_id, timezone=tzinfo.key)
+    await session.execute(
+        statement.on_conflict_do_update(
+            index_elements=[UserPreference.user_id],
+            set_={"timezone": statement.excluded.timezone, "updated_at": func.now()},
+        )
+    )
+    await _relocalize_transactions(session, user_id=user_id, tzinfo=tzinfo)
+    await rebuild_category_spend(session, user_id=user_id)
+    record_writes(session, [user_id])
+    await session.commit()
+    # Any of the user's months may have moved; this is rare enough to drop them all.
+    get_summary_cache().clear()
+    result = await session.execute(
+        select(UserPreference)
+        .where(UserPreference.user_id == user_id)
+        .execution_options(populate_existing=True)
+    )
+    return result.scalar_one()
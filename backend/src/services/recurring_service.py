@@ -0,0 +1,412 @@
+"""Recurring payment detection (rent, subscriptions, salary) over transaction history.
+
+Detection works on column arrays: each user batch is loaded as one query
+sorted by (user, direction, currency, category, amount), split into amount
+clusters where consecutive amounts differ by more than AMOUNT_TOLERANCE, and
+each cluster's gaps between occurrences are reduced to a mean and spread with
+NumPy. A cluster is a series when its mean gap matches a known cadence and the
+gaps are regular. No Python code runs per transaction.
+
+The job is incremental at group granularity: transaction writes flag the
+(user, direction, currency, category) groups they touch in
+recurring_group_changes, and a run re-analyses only those groups. Writes that
+leave transactions alone (budgets, preferences, ...) queue nothing.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+from collections.abc import Callable, Iterable, Sequence
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+import numpy as np
+from sqlalchemy import (
+    BigInteger,
+    Float,
+    SQLColumnExpression,
+    String,
+    cast,
+    delete,
+    func,
+    insert,
+    select,
+    tuple_,
+)
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.sql.elements import ColumnElement
+
+from src.config import get_settings
+from src.database.dialects import upsert_insert
+from src.models.enums import TransactionDirection
+from src.models.recurring import RecurringGroupChange, RecurringSeries
+from src.models.transaction import LIVE_TRANSACTION_PREDICATE, Transaction
+
+# (name, period in days, allowed distance of the mean gap from the period)
+CADENCES = (
+    ("weekly", 7.0, 1.5),
+    ("biweekly", 14.0, 2.0),
+    ("monthly", 30.44, 4.0),
+    ("quarterly", 91.31, 8.0),
+    ("yearly", 365.25, 15.0),
+)
+# Consecutive amounts (sorted) further apart than this fraction start a new cluster.
+AMOUNT_TOLERANCE = 0.1
+# Gap standard deviation / mean gap above which a cluster is not regular.
+MAX_INTERVAL_CV = 0.25
+MIN_OCCURRENCES = 3
+# A series stays active until this fraction of a period past its expected date.
+ACTIVE_GRACE = 0.5
+
+_PERIODS = np.array([period for _, period, _ in CADENCES])
+_PERIOD_TOLERANCES = np.array([tolerance for _, _, tolerance in CADENCES])
+_SECONDS_PER_DAY = 86400.0
+
+# (user_id, direction, currency, category): the rows one group of series is detected from.
+RecurringGroup = tuple[str, TransactionDirection, str, str]
+
+
+@dataclass(frozen=True, slots=True)
+class DetectedSeries:
+    """Per-series arrays; `first_row` indexes the input row the series starts at."""
+
+    first_row: np.ndarray
+    cadence: np.ndarray
+    period_days: np.ndarray
+    amount_cents: np.ndarray
+    min_cents: np.ndarray
+    max_cents: np.ndarray
+    occurrences: np.ndarray
+    first_day: np.ndarray
+    last_day: np.ndarray
+    confidence: np.ndarray
+
+
+@dataclass(frozen=True, slots=True)
+class RecurringBatch:
+    number: int
+    users: int
+    transactions: int
+    series: int
+    seconds: float
+
+
+def detect_series(group_ids: np.ndarray, cents: np.ndarray, days: np.ndarray) -> DetectedSeries:
+    """Find recurring series in rows sorted by (group_ids, cents).
+
+    `days` are occurrence times as fractional days since the epoch.
+    """
+    count = len(cents)
+    new_cluster = np.ones(count, dtype=bool)
+    new_cluster[1:] = (group_ids[1:] != group_ids[:-1]) | (
+        cents[1:] > cents[:-1] * (1 + AMOUNT_TOLERANCE)
+    )
+    cluster = np.cumsum(new_cluster) - 1
+    starts = np.flatnonzero(new_cluster)
+    occurrences = np.diff(np.append(starts, count))
+
+    # Clusters stay contiguous and in place; only rows within each are reordered by time.
+    order = np.lexsort((days, cluster))
+    days = days[order]
+    cents = cents[order]
+
+    same_cluster = cluster[1:] == cluster[:-1]
+    gap_cluster = cluster[1:][same_cluster]
+    gaps = np.diff(days)[same_cluster]
+    gap_count = occurrences - 1
+    gap_sum = np.bincount(gap_cluster, weights=gaps, minlength=len(starts))
+    gap_squares = np.bincount(gap_cluster, weights=gaps * gaps, minlength=len(starts))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean_gap = gap_sum / gap_count
+        spread = np.sqrt(np.maximum(gap_squares / gap_count - mean_gap**2, 0.0))
+        variation = spread / mean_gap
+
+    matches = np.abs(mean_gap[:, None] - _PERIODS[None, :]) <= _PERIOD_TOLERANCES[None, :]
+    keep = (
+        (occurrences >= MIN_OCCURRENCES)
+        & matches.any(axis=1)
+        & (mean_gap > 0)
+        & (variation <= MAX_INTERVAL_CV)
+    )
+    ends = starts + occurrences - 1
+    return DetectedSeries(
+        first_row=order[starts][keep],
+        cadence=matches.argmax(axis=1)[keep],
+        period_days=mean_gap[keep],
+        amount_cents=np.rint(np.add.reduceat(cents, starts) / occurrences)[keep].astype(np.int64),
+        min_cents=np.minimum.reduceat(cents, starts)[keep],
+        max_cents=np.maximum.reduceat(cents, starts)[keep],
+        occurrences=occurrences[keep],
+        first_day=days[starts][keep],
+        last_day=days[ends][keep],
+        confidence=np.clip(1 - variation[keep] / MAX_INTERVAL_CV, 0.0, 1.0),
+    )
+
+
+def epoch_days_expression(
+    dialect_name: str,
+    column: SQLColumnExpression[datetime],
+) -> ColumnElement[float]:
+    if dialect_name == "postgresql":
+        return cast(func.extract("epoch", column) / _SECONDS_PER_DAY, Float)
+    return func.julianday(column) - 2440587.5
+
+
+def _from_epoch_days(value: float) -> datetime:
+    return datetime.fromtimestamp(float(value) * _SECONDS_PER_DAY, timezone.utc)
+
+
+def _from_cents(value: int) -> Decimal:
+    return Decimal(int(value)).scaleb(-2)
+
+
+async def record_group_changes(session: AsyncSession, groups: Iterable[RecurringGroup]) -> None:
+    """Queue groups whose transactions were written for the next detection run."""
+    keys = sorted(set(groups))
+    if not keys:
+        return
+    statement = upsert_insert(session, RecurringGroupChange).values(
+        [
+            {
+                "user_id": user_id,
+                "direction": direction,
+                "currency": currency,
+                "category": category,
+                "version": 1,
+            }
+            for user_id, direction, currency, category in keys
+        ]
+    )
+    await session.execute(
+        statement.on_conflict_do_update(
+            index_elements=["user_id", "direction", "currency", "category"],
+            set_={"version": RecurringGroupChange.version + 1},
+        )
+    )
+
+
+async def _changed_groups(
+    session: AsyncSession,
+    *,
+    after: str | None,
+    limit: int,
+) -> list[tuple[RecurringGroup, int]]:
+    """Queued groups, with their versions, of the next `limit` users after `after`."""
+    users = select(RecurringGroupChange.user_id).distinct()
+    if after is not None:
+        users = users.where(RecurringGroupChange.user_id > after)
+    query = (
+        select(
+            RecurringGroupChange.user_id,
+            RecurringGroupChange.direction,
+            RecurringGroupChange.currency,
+            RecurringGroupChange.category,
+            RecurringGroupChange.version,
+        )
+        .where(
+            RecurringGroupChange.user_id.in_(
+                users.order_by(RecurringGroupChange.user_id).limit(limit).scalar_subquery()
+            )
+        )
+        .order_by(RecurringGroupChange.user_id)
+    )
+    return [
+        ((user_id, direction, currency, category), version)
+        for user_id, direction, currency, category, version in (await session.execute(query)).all()
+    ]
+
+
+async def _analyse_groups(
+    session: AsyncSession,
+    groups: Sequence[RecurringGroup],
+) -> tuple[int, int]:
+    dialect_name = session.get_bind().dialect.name
+    direction = cast(Transaction.direction, String)
+    query = (
+        select(
+            Transaction.user_id,
+            direction,
+            Transaction.currency,
+            Transaction.category,
+            cast(func.round(Transaction.amount * 100), BigInteger),
+            epoch_days_expression(dialect_name, Transaction.occurred_at),
+        )
+        .where(
+            LIVE_TRANSACTION_PREDICATE,
+            tuple_(
+                Transaction.user_id,
+                Transaction.direction,
+                Transaction.currency,
+                Transaction.category,
+            ).in_(groups),
+        )
+        .order_by(
+            Transaction.user_id,
+            direction,
+            Transaction.currency,
+            Transaction.category,
+            Transaction.amount,
+        )
+    )
+    rows = (await session.execute(query)).all()
+    await session.execute(
+        delete(RecurringSeries).where(
+            tuple_(
+                RecurringSeries.user_id,
+                RecurringSeries.direction,
+                RecurringSeries.currency,
+                RecurringSeries.category,
+            ).in_(groups)
+        )
+    )
+    if not rows:
+        return 0, 0
+
+    users, directions, currencies, categories, cents, days = (
+        np.array(column) for column in zip(*rows, strict=True)
+    )
+    group_break = np.zeros(len(rows), dtype=bool)
+    for column in (users, directions, currencies, categories):
+        group_break[1:] |= column[1:] != column[:-1]
+    detected = detect_series(
+        np.cumsum(group_break),
+        cents.astype(np.int64),
+        days.astype(np.float64),
+    )
+
+    values = [
+        {
+            "user_id": str(users[row]),
+            "direction": str(directions[row]),
+            "currency": str(currencies[row]),
+            "category": str(categories[row]),
+            "cadence": CADENCES[detected.cadence[index]][0],
+            "period_days": round(float(detected.period_days[index]), 2),
+            "amount": _from_cents(detected.amount_cents[index]),
+            "amount_min": _from_cents(detected.min_cents[index]),
+            "amount_max": _from_cents(detected.max_cents[index]),
+            "occurrences": int(detected.occurrences[index]),
+            "first_seen_at": _from_epoch_days(detected.first_day[index]),
+            "last_seen_at": _from_epoch_days(detected.last_day[index]),
+            "next_expected_at": _from_epoch_days(
+                detected.last_day[index] + detected.period_days[index]
+            ),
+            "confidence": round(float(detected.confidence[index]), 3),
+        }
+        for index, row in enumerate(detected.first_row)
+    ]
+    if values:
+        await session.execute(insert(RecurringSeries), values)
+    return len(rows), len(values)
+
+
+async def refresh_recurring_series(
+    session_factory: async_sessionmaker[AsyncSession],
+    *,
+    batch_size: int = 500,
+    max_batches: int | None = None,
+    on_batch: Callable[[RecurringBatch], None] | None = None,
+) -> list[RecurringBatch]:
+    """Recompute series for groups whose transactions changed since the last run.
+
+    Each batch (the queued groups of up to `batch_size` users) is read,
+    analysed and replaced in one short transaction; other groups' series are
+    left alone. Versions are read before the history and a queued group is
+    only cleared at the version seen, so a write landing mid-batch leaves it
+    queued for the next run rather than skipped.
+    """
+    batches: list[RecurringBatch] = []
+    after: str | None = None
+    while max_batches is None or len(batches) < max_batches:
+        started = time.perf_counter()
+        async with session_factory() as session, session.begin():
+            changed = await _changed_groups(session, after=after, limit=batch_size)
+            if not changed:
+                break
+            groups = [group for group, _ in changed]
+            transactions, series = await _analyse_groups(session, groups)
+            await session.execute(
+                delete(RecurringGroupChange).where(
+                    tuple_(
+                        RecurringGroupChange.user_id,
+                        RecurringGroupChange.direction,
+                        RecurringGroupChange.currency,
+                        RecurringGroupChange.category,
+                        RecurringGroupChange.version,
+                    ).in_([(*group, version) for group, version in changed])
+                )
+            )
+        user_ids = sorted({user_id for user_id, *_ in groups})
+        after = user_ids[-1]
+        batch = RecurringBatch(
+            number=len(batches) + 1,
+            users=len(user_ids),
+            transactions=transactions,
+            series=series,
+            seconds=time.perf_counter() - started,
+        )
+        batches.append(batch)
+        if on_batch is not None:
+            on_batch(batch)
+        if len(user_ids) < batch_size:
+            break
+    return batches
+
+
+def is_active(series: RecurringSeries, now: datetime) -> bool:
+    next_expected_at = series.next_expected_at
+    if next_expected_at.tzinfo is None:
+        # SQLite hands timestamps back naive; they are stored in UTC.
+        next_expected_at = next_expected_at.replace(tzinfo=timezone.utc)
+    return now <= next_expected_at + timedelta(days=series.period_days * ACTIVE_GRACE)
+
+
+async def list_recurring_series(
+    session: AsyncSession,
+    *,
+    user_id: str,
+    now: datetime,
+    include_inactive: bool = False,
+) -> list[RecurringSeries]:
+    result = await session.execute(
+        select(RecurringSeries)
+        .where(RecurringSeries.user_id == user_id)
+        .order_by(RecurringSeries.next_expected_at, RecurringSeries.id)
+    )
+    return [series for series in result.scalars() if include_inactive or is_active(series, now)]
+
+
+def _print_batch(batch: RecurringBatch) -> None:
+    print(
+        f"batch {batch.number}: {batch.users} users, {batch.transactions} transactions, "
+        f"{batch.series} series in {batch.seconds * 1000:.1f} ms"
+    )
+
+
+async def _run(args: argparse.Namespace) -> None:
+    engine = create_async_engine(get_settings().database_url)
+    sessions = async_sessionmaker(engine, expire_on_commit=False)
+    batches = await refresh_recurring_series(
+        sessions,
+        batch_size=args.batch_size,
+        max_batches=args.max_batches,
+        on_batch=_print_batch,
+    )
+    users = sum(batch.users for batch in batches)
+    series = sum(batch.series for batch in batches)
+    print(f"analysed {users} users into {series} recurring series in {len(batches)} batches")
+    await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Detect recurring transactions.")
+    parser.add_argument("--batch-size", type=int, default=500, help="users per batch")
+    parser.add_argument("--max-batches", type=int, default=None)
+    asyncio.run(_run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -2,11 +2,15 @@
 
 from __future__ import annotations
 
+from collections.abc import Sequence
 from dataclasses import dataclass
-from datetime import datetime
+from datetime import date, datetime
 from decimal import Decimal
+from enum import Enum
 from typing import Any
 
+from sqlalchemy import RowMapping
+
 from src.models.enums import EntrySource, EntryStatus, TransactionDirection, TransactionType
 
 
@@ -31,3 +35,127 @@ class TransactionCreate:
     type: TransactionType
     category: str
     assumptions_json: dict[str, Any] | list[str] | None = None
+    user_id: str | None = None
+    # Filled in from the owner's timezone when not given.
+    local_date: date | None = None
+
+
+class TrendGranularity(str, Enum):
+    day = "day"
+    week = "week"
+    month = "month"
+
+
+class TrendGroupBy(str, Enum):
+    category = "category"
+    direction = "direction"
+    type = "type"
+
+
+@dataclass(frozen=True, slots=True)
+class TrendSeries:
+    key: str
+    totals: list[Decimal]
+    counts: list[int]
+
+
+@dataclass(frozen=True, slots=True)
+class TrendResult:
+    buckets: list[date]
+    series: list[TrendSeries]
+    # Currencies left out of the totals because no rate to the target is loaded.
+    unconverted_currencies: list[str]
+
+
+@dataclass(frozen=True, slots=True)
+class CategoryTotal:
+    direction: TransactionDirection
+    category: str
+    total: Decimal
+
+
+@dataclass(frozen=True, slots=True)
+class CurrencyTotal:
+    direction: TransactionDirection
+    currency: str
+    total: Decimal
+    transaction_count: int
+
+
+@dataclass(frozen=True, slots=True)
+class MonthSummary:
+    currency: str
+    total_inflow: Decimal
+    total_outflow: Decimal
+    by_category: list[CategoryTotal]
+    transaction_count: int
+    # Amounts in currencies with no loaded rate, kept out of the totals above.
+    unconverted: list[CurrencyTotal]
+
+
+@dataclass(frozen=True, slots=True)
+class SearchHit:
+    entry_id: int
+    raw_text: str
+    entry_summary: str | None
+    status: EntryStatus
+    created_at: datetime
+    score: float
+
+
+@dataclass(frozen=True, slots=True)
+class StoredResponse:
+    status_code: int
+    body: bytes
+
+
+SyncKey = tuple[datetime, int]
+
+
+@dataclass(frozen=True, slots=True)
+class SyncPosition:
+    """Last (updated_at, id) a client has seen in each synced table."""
+
+    transactions: SyncKey
+    entries: SyncKey
+
+
+@dataclass(frozen=True, slots=True)
+class SyncChanges:
+    entries: Sequence[RowMapping]
+    transactions: Sequence[RowMapping]
+    deleted_transaction_ids: list[int]
+    position: SyncPosition
+    has_more: bool
+    reset: bool
+
+
+@dataclass(frozen=True, slots=True)
+class SpendChange:
+    before: Decimal
+    after: Decimal
+
+
+@dataclass(frozen=True, slots=True)
+class BudgetEvent:
+    category: str
+    month: str
+    currency: str
+    threshold_percent: int
+    limit_amount: Decimal
+    spent: Decimal
+
+
+@dataclass(frozen=True, slots=True)
+class BudgetStatus:
+    category: str
+    month: str
+    currency: str
+    limit_amount: Decimal
+    spent: Decimal
+    remaining: Decimal
+    percent_used: float
+    days_elapsed: int
+    days_in_month: int
+    daily_burn_rate: Decimal
+    projected_spend: Decimal
@@ -0,0 +1,117 @@
+"""Ranked full-text search over entries."""
+
+from __future__ import annotations
+
+import re
+from collections.abc import Iterable
+from typing import Any
+
+from sqlalchemy import (
+    Float,
+    Select,
+    and_,
+    column,
+    func,
+    literal,
+    literal_column,
+    or_,
+    select,
+    table,
+)
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.models.entry import Entry
+from src.services.schemas import SearchHit
+
+_TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+_HIT_COLUMNS = (Entry.id, Entry.raw_text, Entry.parser_output_json, Entry.status, Entry.created_at)
+_entries_fts = table("entries_fts", column("rowid"), column("search_document"))
+
+
+def _post_processed(parser_output_json: dict[str, Any] | None) -> dict[str, Any]:
+    return (parser_output_json or {}).get("post_processed") or {}
+
+
+def entry_search_document(
+    raw_text: str,
+    parser_output_json: dict[str, Any] | None,
+    categories: Iterable[str] | None = None,
+) -> str:
+    """Text indexed for an entry: what the user typed, the summary and categories."""
+    post_processed = _post_processed(parser_output_json)
+    if categories is None:
+        categories = [item.get("category") for item in post_processed.get("transactions") or []]
+    parts = [raw_text, post_processed.get("entry_summary") or ""]
+    parts.extend(dict.fromkeys(category for category in categories if category))
+    return "\n".join(part for part in parts if part)
+
+
+def fts5_query(text: str) -> str | None:
+    """Quote each token as an FTS5 prefix term, so user input cannot inject syntax."""
+    tokens = _TOKEN_PATTERN.findall(text)
+    if not tokens:
+        return None
+    return " ".join(f'"{token}"*' for token in tokens)
+
+
+def _postgresql_query(user_id: str, text: str) -> Select[Any]:
+    vector = literal_column("entries.search_vector", TSVECTOR)
+    ts_query = func.websearch_to_tsquery("simple", text)
+    similarity = func.word_similarity(literal(text), Entry.search_document)
+    score = (func.ts_rank_cd(vector, ts_query) + similarity).cast(Float)
+    return select(*_HIT_COLUMNS, score.label("score")).where(
+        Entry.user_id == user_id,
+        # <% (word similarity above pg_trgm.word_similarity_threshold) catches typos.
+        or_(vector.op("@@")(ts_query), literal(text).op("<%")(Entry.search_document)),
+    )
+
+
+def _sqlite_query(user_id: str, match: str) -> Select[Any]:
+    # bm25() is lower-is-better; negate so both dialects sort by score descending.
+    score = (-func.bm25(literal_column("entries_fts"))).cast(Float)
+    return (
+        select(*_HIT_COLUMNS, score.label("score"))
+        .join(_entries_fts, _entries_fts.c.rowid == Entry.id)
+        .where(
+            Entry.user_id == user_id,
+            literal_column("entries_fts").op("MATCH")(match),
+        )
+    )
+
+
+async def search_entries(
+    session: AsyncSession,
+    *,
+    user_id: str,
+    text: str,
+    limit: int = 20,
+    after: tuple[float, int] | None = None,
+) -> list[SearchHit]:
+    """Entries matching `text`, best first, keyset-paginated on (score, id)."""
+    if session.get_bind().dialect.name == "postgresql":
+        query = _postgresql_query(user_id, text)
+    else:
+        match = fts5_query(text)
+        if match is None:
+            return []
+        query = _sqlite_query(user_id, match)
+
+    ranked = query.subquery()
+    entry = ranked.c
+    page = select(ranked).order_by(entry.score.desc(), entry.id.desc()).limit(limit)
+    if after is not None:
+        score, entry_id = after
+        page = page.where(or_(entry.score < score, and_(entry.score == score, entry.id < entry_id)))
+    rows = (await session.execute(page)).mappings().all()
+    return [
+        SearchHit(
+            entry_id=row["id"],
+            raw_text=row["raw_text"],
+            entry_summary=_post_processed(row["parser_output_json"]).get("entry_summary"),
+            status=row["status"],
+            created_at=row["created_at"],
+            score=float(row["score"]),
+        )
+        for row in rows
+    ]
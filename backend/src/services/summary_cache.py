@@ -0,0 +1,170 @@
+"""In-process LRU cache for monthly summary responses.
+
+Each worker process has its own cache, and commit-time invalidation only
+reaches the cache of the process that committed. Entries are therefore also
+tagged with the data version they were computed at and expire after a TTL,
+so writes made through other workers are never served from a stale entry.
+"""
+
+from __future__ import annotations
+
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass
+from datetime import date
+from functools import lru_cache
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from src.config import get_settings
+
+SummaryKey = tuple[str, str]
+
+_PENDING_MONTHS_KEY = "summary_cache_pending_months"
+
+
+@dataclass(frozen=True, slots=True)
+class SummaryCacheStats:
+    hits: int
+    misses: int
+    evictions: int
+    invalidations: int
+    size: int
+    max_entries: int
+
+
+class SummaryCache:
+    """Bounded LRU cache keyed by (user_id, month).
+
+    Values are only stored if no invalidation happened since the caller read
+    `generation`, so a summary computed while a write commits is never cached.
+    An entry stored with a `tag` (the data version it was computed at) is
+    only returned to a caller asking for the same tag, which covers writes
+    committed by other processes that this one never saw. Entries older than
+    `ttl_seconds` are dropped on read, a backstop for writes that change data
+    without moving the version.
+    """
+
+    def __init__(
+        self,
+        max_entries: int,
+        *,
+        ttl_seconds: float | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._max_entries = max_entries
+        self._ttl = ttl_seconds
+        self._clock = clock
+        self._entries: OrderedDict[SummaryKey, tuple[str | None, float, Any]] = OrderedDict()
+        self._generation = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._invalidations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self._max_entries > 0
+
+    @property
+    def generation(self) -> int:
+        return self._generation
+
+    def get(self, key: SummaryKey, *, tag: str | None = None) -> Any | None:
+        entry = self._entries.get(key)
+        if entry is not None and (entry[0] != tag or self._expired(entry[1])):
+            del self._entries[key]
+            self._invalidations += 1
+            entry = None
+        if entry is None:
+            self._misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self._hits += 1
+        return entry[2]
+
+    def _expired(self, stored_at: float) -> bool:
+        return self._ttl is not None and self._clock() - stored_at >= self._ttl
+
+    def set(
+        self,
+        key: SummaryKey,
+        value: Any,
+        *,
+        generation: int,
+        tag: str | None = None,
+    ) -> None:
+        if not self.enabled or generation != self._generation:
+            return
+        self._entries[key] = (tag, self._clock(), value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+            self._evictions += 1
+
+    def invalidate(self, keys: Iterable[SummaryKey]) -> int:
+        targets = set(keys)
+        if not targets:
+            return 0
+        self._generation += 1
+        stale = [key for key in targets if key in self._entries]
+        for key in stale:
+            del self._entries[key]
+        self._invalidations += len(stale)
+        return len(stale)
+
+    def clear(self) -> None:
+        self._generation += 1
+        self._entries.clear()
+
+    def stats(self) -> SummaryCacheStats:
+        return SummaryCacheStats(
+            hits=self._hits,
+            misses=self._misses,
+            evictions=self._evictions,
+            invalidations=self._invalidations,
+            size=len(self._entries),
+            max_entries=self._max_entries,
+        )
+
+
+@lru_cache
+def get_summary_cache() -> SummaryCache:
+    settings = get_settings()
+    return SummaryCache(
+        settings.summary_cache_max_entries,
+        ttl_seconds=settings.summary_cache_ttl_seconds or None,
+    )
+
+
+def month_key(value: date) -> str:
+    """The "YYYY-MM" month of a transaction's local_date."""
+    return value.strftime("%Y-%m")
+
+
+def mark_months_changed(
+    session: AsyncSession,
+    changes: Iterable[tuple[str, date]],
+) -> None:
+    """Record (user_id, local_date) pairs touched by a write.
+
+    The matching (user, month) summaries are invalidated once the session commits.
+    """
+    pending: set[SummaryKey] = session.info.setdefault(_PENDING_MONTHS_KEY, set())
+    pending.update((user_id, month_key(local_date)) for user_id, local_date in changes)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_after_commit(session: Session) -> None:
+    pending = session.info.pop(_PENDING_MONTHS_KEY, None)
+    if pending:
+        get_summary_cache().invalidate(pending)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_after_rollback(session: Session) -> None:
+    session.info.pop(_PENDING_MONTHS_KEY, None)
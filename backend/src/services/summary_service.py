@@ -0,0 +1,134 @@
+"""Monthly totals converted to a single reporting currency."""
+
+from __future__ import annotations
+
+from datetime import date, timedelta
+from decimal import Decimal
+
+import numpy as np
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.models.enums import TransactionDirection
+from src.models.transaction import LIVE_TRANSACTION_PREDICATE, Transaction
+from src.services.fx_service import FxRateCache
+from src.services.schemas import CategoryTotal, CurrencyTotal, MonthSummary
+from src.services.transaction_service import local_date_filters
+
+
+async def get_month_summary(
+    session: AsyncSession,
+    *,
+    user_id: str,
+    start: date,
+    end: date,
+    currency: str,
+    rates: FxRateCache,
+) -> MonthSummary:
+    """Totals per direction and category from one (direction, category, currency, day) query.
+
+    Days are local dates in [start, end). Each group is converted at its day's
+    rate, so a month mixing currencies costs one lookup per currency rather
+    than per transaction. Currencies with no rate at all are totalled in
+    their own currency under `unconverted` instead.
+    """
+    query = (
+        select(
+            Transaction.direction,
+            Transaction.category,
+            Transaction.currency,
+            Transaction.local_date,
+            func.sum(Transaction.amount),
+            func.count(Transaction.id),
+        )
+        .where(
+            LIVE_TRANSACTION_PREDICATE,
+            Transaction.user_id == user_id,
+            *local_date_filters(start, end - timedelta(days=1)),
+        )
+        .group_by(
+            Transaction.direction,
+            Transaction.category,
+            Transaction.currency,
+            Transaction.local_date,
+        )
+    )
+    rows = (await session.execute(query)).all()
+    zero = Decimal("0.00")
+    if not rows:
+        return MonthSummary(
+            currency=currency,
+            total_inflow=zero,
+            total_outflow=zero,
+            by_category=[],
+            transaction_count=0,
+            unconverted=[],
+        )
+
+    directions = np.array([row[0].value for row in rows])
+    categories = np.array([row[1] for row in rows])
+    currencies = np.array([row[2] for row in rows])
+    days = np.array([row[3] for row in rows], dtype="datetime64[D]")
+    cents = np.array([int(Decimal(row[4]) * 100) for row in rows], dtype=np.int64)
+    counts = np.array([row[5] for row in rows], dtype=np.int64)
+
+    missing = np.isin(currencies, rates.missing_currencies(currencies, to=currency))
+    unconverted = _native_totals(
+        directions[missing],
+        currencies[missing],
+        cents[missing],
+        counts[missing],
+    )
+    keep = ~missing
+    directions, categories, currencies, days, cents = (
+        column[keep] for column in (directions, categories, currencies, days, cents)
+    )
+    converted = rates.convert(cents, currencies, days, to=currency)
+    keys, key_index = np.unique(
+        np.char.add(np.char.add(directions, "\x1f"), categories),
+        return_inverse=True,
+    )
+    totals = np.zeros(len(keys), dtype=np.int64)
+    np.add.at(totals, key_index, converted)
+    by_category = []
+    direction_totals = {direction: 0 for direction in TransactionDirection}
+    for key, total in zip(keys, totals, strict=True):
+        direction, category = str(key).split("\x1f", 1)
+        by_category.append(
+            CategoryTotal(
+                direction=TransactionDirection(direction),
+                category=category,
+                total=Decimal(int(total)).scaleb(-2),
+            )
+        )
+        direction_totals[TransactionDirection(direction)] += int(total)
+    return MonthSummary(
+        currency=currency,
+        total_inflow=Decimal(direction_totals[TransactionDirection.inflow]).scaleb(-2),
+        total_outflow=Decimal(direction_totals[TransactionDirection.outflow]).scaleb(-2),
+        by_category=by_category,
+        transaction_count=int(counts.sum()),
+        unconverted=unconverted,
+    )
+
+
+def _native_totals(
+    directions: np.ndarray,
+    currencies: np.ndarray,
+    cents: np.ndarray,
+    counts: np.ndarray,
+) -> list[CurrencyTotal]:
+    totals: dict[tuple[str, str], tuple[int, int]] = {}
+    for direction, code, amount, count in zip(directions, currencies, cents, counts, strict=True):
+        key = (str(direction), str(code))
+        total, transactions = totals.get(key, (0, 0))
+        totals[key] = (total + int(amount), transactions + int(count))
+    return [
+        CurrencyTotal(
+            direction=TransactionDirection(direction),
+            currency=code,
+            total=Decimal(total).scaleb(-2),
+            transaction_count=transactions,
+        )
+        for (direction, code), (total, transactions) in sorted(totals.items())
+    ]
@@ -0,0 +1,152 @@
+"""Incremental (delta) sync of entries and transactions."""
+
+from __future__ import annotations
+
+from collections.abc import Sequence
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+from sqlalchemy import RowMapping, and_, or_, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import InstrumentedAttribute
+
+from src.models.entry import Entry
+from src.models.transaction import LIVE_TRANSACTION_PREDICATE, Transaction
+from src.services.schemas import SyncChanges, SyncKey, SyncPosition
+from src.services.transaction_service import TRANSACTION_READ_COLUMNS
+
+SYNC_ENTRY_COLUMNS = (
+    Entry.id,
+    Entry.raw_text,
+    Entry.source,
+    Entry.status,
+    Entry.created_at,
+    Entry.updated_at,
+    Entry.parser_version,
+    Entry.notes,
+)
+
+
+# Start of the oldest other open transaction in this database, or the time this
+# statement began if there is none: every later transaction starts after it.
+_OPEN_TRANSACTIONS_WATERMARK = text(
+    """
+    SELECT least(statement_timestamp(), min(xact_start))
+    FROM pg_stat_activity
+    WHERE datname = current_database()
+      AND backend_type = 'client backend'
+      AND pid <> pg_backend_pid()
+    """
+)
+
+
+def _as_utc(value: datetime) -> datetime:
+    # SQLite hands timestamps back naive; they are stored in UTC.
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+async def _changed_rows(
+    session: AsyncSession,
+    columns: Sequence[InstrumentedAttribute[Any]],
+    *,
+    updated_at: InstrumentedAttribute[datetime],
+    id_column: InstrumentedAttribute[int],
+    filters: list[Any],
+    after: SyncKey | None,
+    until: datetime,
+    limit: int,
+) -> tuple[Sequence[RowMapping], SyncKey, bool]:
+    query = (
+        select(*columns)
+        .where(*filters, updated_at < until)
+        .order_by(updated_at, id_column)
+        .limit(limit + 1)
+    )
+    if after is not None:
+        after_updated_at, after_id = after
+        query = query.where(
+            or_(
+                updated_at > after_updated_at,
+                and_(updated_at == after_updated_at, id_column > after_id),
+            )
+        )
+    rows = (await session.execute(query)).mappings().all()
+    if len(rows) > limit:
+        rows = rows[:limit]
+        return rows, (rows[-1]["updated_at"], rows[-1]["id"]), True
+    # Everything changed before `until` has been seen.
+    return rows, (until, 0), False
+
+
+async def _write_watermark(session: AsyncSession) -> datetime | None:
+    """Earliest `updated_at` a not-yet-committed write can still carry (PostgreSQL only)."""
+    if session.get_bind().dialect.name != "postgresql":
+        return None
+    watermark: datetime | None = await session.scalar(_OPEN_TRANSACTIONS_WATERMARK)
+    return watermark
+
+
+async def get_sync_changes(
+    session: AsyncSession,
+    *,
+    user_id: str,
+    since: SyncPosition | None,
+    limit: int = 500,
+    safety_lag_seconds: float = 2.0,
+    retention_days: int = 30,
+) -> SyncChanges:
+    """Entries and transactions changed after `since`, each ordered by (updated_at, id).
+
+    updated_at is now(), the writing transaction's start time, so a slow
+    transaction commits rows stamped behind a cursor handed out meanwhile.
+    Invariant: a cursor never passes the start of a transaction that is still
+    open. On PostgreSQL the page is cut at the oldest open transaction's start
+    (see `_write_watermark`); a long transaction delays rows but never hides
+    them. `safety_lag_seconds` is an extra margin and the only guard on
+    dialects without that view (SQLite). A `since` older than
+    the archive retention may have missed tombstones the archive job has since
+    removed, so it is answered with a full sync and `reset=True`. A full sync
+    carries live transactions only, since the client has nothing to delete.
+    """
+    now = datetime.now(timezone.utc)
+    until = now - timedelta(seconds=safety_lag_seconds)
+    watermark = await _write_watermark(session)
+    if watermark is not None:
+        until = min(until, _as_utc(watermark))
+    reset = False
+    if since is not None:
+        oldest = min(since.transactions[0], since.entries[0], key=_as_utc)
+        if _as_utc(oldest) < now - timedelta(days=retention_days):
+            since, reset = None, True
+
+    transaction_filters: list[Any] = [Transaction.user_id == user_id]
+    if since is None:
+        transaction_filters.append(LIVE_TRANSACTION_PREDICATE)
+    transactions, transactions_key, more_transactions = await _changed_rows(
+        session,
+        [*TRANSACTION_READ_COLUMNS, Transaction.is_deleted],
+        updated_at=Transaction.updated_at,
+        id_column=Transaction.id,
+        filters=transaction_filters,
+        after=since.transactions if since else None,
+        until=until,
+        limit=limit,
+    )
+    entries, entries_key, more_entries = await _changed_rows(
+        session,
+        SYNC_ENTRY_COLUMNS,
+        updated_at=Entry.updated_at,
+        id_column=Entry.id,
+        filters=[Entry.user_id == user_id],
+        after=since.entries if since else None,
+        until=until,
+        limit=limit,
+    )
+    return SyncChanges(
+        entries=entries,
+        transactions=[row for row in transactions if not row["is_deleted"]],
+        deleted_transaction_ids=[row["id"] for row in transactions if row["is_deleted"]],
+        position=SyncPosition(transactions=transactions_key, entries=entries_key),
+        has_more=more_transactions or more_entries,
+        reset=reset,
+    )
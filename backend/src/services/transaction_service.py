@@ -2,14 +2,75 @@
 
 from __future__ import annotations
 
-from datetime import datetime
+import json
+from collections.abc import AsyncIterator, Sequence
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta, timezone
+from decimal import Decimal
+from typing import Any
 
-from sqlalchemy import select
+from sqlalchemy import Row, RowMapping, insert, select
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.sql import func
+from sqlalchemy.sql import ColumnElement, func
 
+from src.database.routing import record_writes
+from src.models.entry import Entry
+from src.models.enums import TransactionDirection, TransactionType
 from src.models.transaction import Transaction
+from src.services.budget_service import SpendRow, record_spend, spend_deltas
+from src.services.preference_service import get_user_timezones, local_date
+from src.services.recurring_service import RecurringGroup, record_group_changes
 from src.services.schemas import TransactionCreate
+from src.services.summary_cache import mark_months_changed
+
+# Columns written by bulk_insert_transactions, in COPY order.
+BULK_INSERT_COLUMNS = (
+    "user_id",
+    "entry_id",
+    "occurred_at",
+    "local_date",
+    "amount",
+    "currency",
+    "direction",
+    "type",
+    "category",
+    "assumptions_json",
+)
+
+
+@dataclass(frozen=True, slots=True)
+class _LocalizedTransaction:
+    """A TransactionCreate with its owner and local date resolved."""
+
+    user_id: str
+    entry_id: int
+    occurred_at: datetime
+    local_date: date
+    amount: Decimal
+    currency: str
+    direction: TransactionDirection
+    type: TransactionType
+    category: str
+    assumptions_json: dict[str, Any] | list[str] | None
+
+
+# A local date is never more than this far from the UTC date of `occurred_at`.
+_ZONE_SLACK = timedelta(days=1)
+
+# Columns needed to render a transaction in API responses.
+TRANSACTION_READ_COLUMNS = (
+    Transaction.id,
+    Transaction.entry_id,
+    Transaction.occurred_at,
+    Transaction.created_at,
+    Transaction.updated_at,
+    Transaction.amount,
+    Transaction.currency,
+    Transaction.direction,
+    Transaction.type,
+    Transaction.category,
+    Transaction.assumptions_json,
+)
 
 
 async def create_transactions(
@@ -20,8 +81,10 @@ async def create_transactions(
 ) -> list[Transaction]:
     transactions = [
         Transaction(
+            user_id=item.user_id,
             entry_id=item.entry_id,
             occurred_at=item.occurred_at,
+            local_date=item.local_date,
             amount=item.amount,
             currency=item.currency,
             direction=item.direction,
@@ -29,9 +92,15 @@ async def create_transactions(
             category=item.category,
             assumptions_json=item.assumptions_json,
         )
-        for item in items
+        for item in await _localize(session, items)
     ]
     session.add_all(transactions)
+    mark_months_changed(
+        session,
+        ((transaction.user_id, transaction.local_date) for transaction in transactions),
+    )
+    await record_spend(session, spend_deltas(map(_spend_row, transactions), sign=1))
+    await record_group_changes(session, map(_recurring_group, transactions))
     if commit:
         await session.commit()
         for transaction in transactions:
@@ -41,24 +110,224 @@ async def create_transactions(
     return transactions
 
 
+async def bulk_insert_transactions(
+    session: AsyncSession,
+    *,
+    items: Sequence[TransactionCreate],
+) -> int:
+    """Insert already-validated rows without building ORM objects.
+
+    Uses COPY on asyncpg and a single executemany INSERT elsewhere. Every item
+    must carry `user_id`. Nothing is committed here.
+    """
+    if not items:
+        return 0
+    rows = await _localize(session, items)
+    connection = await session.connection()
+    if connection.dialect.driver == "asyncpg":
+        driver_connection = (await connection.get_raw_connection()).driver_connection
+        if driver_connection is None:
+            raise RuntimeError("The database connection was invalidated before COPY.")
+        await driver_connection.copy_records_to_table(
+            Transaction.__tablename__,
+            columns=BULK_INSERT_COLUMNS,
+            records=[_copy_record(row) for row in rows],
+        )
+    else:
+        await session.execute(
+            insert(Transaction),
+            [{column: getattr(row, column) for column in BULK_INSERT_COLUMNS} for row in rows],
+        )
+    mark_months_changed(session, ((row.user_id, row.local_date) for row in rows))
+    record_writes(session, {row.user_id for row in rows})
+    await record_spend(session, spend_deltas(map(_spend_row, rows), sign=1))
+    await record_group_changes(session, map(_recurring_group, rows))
+    return len(rows)
+
+
+def _spend_row(item: Transaction | _LocalizedTransaction | Row[Any]) -> SpendRow:
+    return (
+        item.user_id,
+        item.category,
+        item.local_date,
+        item.currency,
+        item.direction,
+        item.amount,
+    )
+
+
+def _recurring_group(item: Transaction | _LocalizedTransaction | Row[Any]) -> RecurringGroup:
+    return (item.user_id, item.direction, item.currency, item.category)
+
+
+def _copy_record(item: _LocalizedTransaction) -> tuple[Any, ...]:
+    # SQLAlchemy's asyncpg JSON codecs expect serialized text.
+    assumptions = item.assumptions_json
+    return (
+        item.user_id,
+        item.entry_id,
+        item.occurred_at,
+        item.local_date,
+        item.amount,
+        item.currency,
+        item.direction.value,
+        item.type.value,
+        item.category,
+        json.dumps(assumptions) if assumptions is not None else None,
+    )
+
+
+async def _resolve_user_ids(
+    session: AsyncSession,
+    items: Sequence[TransactionCreate],
+) -> dict[int, str]:
+    missing = {item.entry_id for item in items if item.user_id is None}
+    if not missing:
+        return {}
+    result = await session.execute(select(Entry.id, Entry.user_id).where(Entry.id.in_(missing)))
+    return {entry_id: user_id for entry_id, user_id in result.all()}
+
+
+async def _localize(
+    session: AsyncSession,
+    items: Sequence[TransactionCreate],
+) -> list[_LocalizedTransaction]:
+    """Items with `user_id` and `local_date` filled in, one query for each if needed."""
+    user_ids = await _resolve_user_ids(session, items)
+    owners = [item.user_id or user_ids[item.entry_id] for item in items]
+    pending = {owner for owner, item in zip(owners, items, strict=True) if item.local_date is None}
+    zones = await get_user_timezones(session, pending) if pending else {}
+    return [
+        _LocalizedTransaction(
+            user_id=owner,
+            entry_id=item.entry_id,
+            occurred_at=item.occurred_at,
+            local_date=item.local_date or local_date(item.occurred_at, zones[owner]),
+            amount=item.amount,
+            currency=item.currency,
+            direction=item.direction,
+            type=item.type,
+            category=item.category,
+            assumptions_json=item.assumptions_json,
+        )
+        for owner, item in zip(owners, items, strict=True)
+    ]
+
+
+def live_transaction_filters(
+    *,
+    user_id: str | None = None,
+    from_date: date | None = None,
+    to_date: date | None = None,
+) -> list[ColumnElement[bool]]:
+    filters: list[ColumnElement[bool]] = [Transaction.is_deleted.is_(False)]
+    if user_id:
+        filters.append(Transaction.user_id == user_id)
+    return filters + local_date_filters(from_date, to_date)
+
+
+def local_date_filters(
+    from_date: date | None,
+    to_date: date | None,
+) -> list[ColumnElement[bool]]:
+    """`local_date` within [from_date, to_date], with matching `occurred_at` bounds.
+
+    transactions is range-partitioned on `occurred_at` (0005). Every UTC offset
+    is within a day of UTC, so the bounds widened by a day never exclude a row
+    yet let PostgreSQL prune to the partitions the range can touch.
+    """
+    filters: list[ColumnElement[bool]] = []
+    if from_date:
+        filters.append(Transaction.local_date >= from_date)
+        filters.append(Transaction.occurred_at >= _utc_midnight(from_date - _ZONE_SLACK))
+    if to_date:
+        filters.append(Transaction.local_date <= to_date)
+        filters.append(Transaction.occurred_at < _utc_midnight(to_date + 2 * _ZONE_SLACK))
+    return filters
+
+
+def _utc_midnight(day: date) -> datetime:
+    return datetime.combine(day, time.min, tzinfo=timezone.utc)
+
+
 async def list_transactions(
     session: AsyncSession,
     *,
-    from_date: datetime | None = None,
-    to_date: datetime | None = None,
+    user_id: str | None = None,
+    from_date: date | None = None,
+    to_date: date | None = None,
     limit: int = 200,
     offset: int = 0,
 ) -> list[Transaction]:
-    query = select(Transaction).where(Transaction.is_deleted.is_(False))
-    if from_date:
-        query = query.where(Transaction.occurred_at >= from_date)
-    if to_date:
-        query = query.where(Transaction.occurred_at <= to_date)
-    query = query.order_by(Transaction.occurred_at.desc()).limit(limit).offset(offset)
+    query = (
+        select(Transaction)
+        .where(*live_transaction_filters(user_id=user_id, from_date=from_date, to_date=to_date))
+        .order_by(Transaction.occurred_at.desc(), Transaction.id)
+        .limit(limit)
+        .offset(offset)
+    )
     result = await session.execute(query)
     return list(result.scalars())
 
 
+async def list_transaction_rows(
+    session: AsyncSession,
+    *,
+    user_id: str | None = None,
+    from_date: date | None = None,
+    to_date: date | None = None,
+    limit: int = 200,
+    offset: int = 0,
+) -> Sequence[RowMapping]:
+    """Same page as `list_transactions`, as plain row mappings without ORM entities."""
+    query = (
+        select(*TRANSACTION_READ_COLUMNS)
+        .where(*live_transaction_filters(user_id=user_id, from_date=from_date, to_date=to_date))
+        .order_by(Transaction.occurred_at.desc(), Transaction.id)
+        .limit(limit)
+        .offset(offset)
+    )
+    result = await session.execute(query)
+    return result.mappings().all()
+
+
+async def stream_transaction_rows(
+    session: AsyncSession,
+    *,
+    user_id: str | None = None,
+    from_date: date | None = None,
+    to_date: date | None = None,
+    batch_size: int = 1000,
+) -> AsyncIterator[Sequence[RowMapping]]:
+    """Yield live transactions oldest first, `batch_size` rows at a time.
+
+    Rows come from a server-side cursor, so memory stays bounded by one batch
+    however long the history is.
+    """
+    query = (
+        select(*TRANSACTION_READ_COLUMNS)
+        .where(*live_transaction_filters(user_id=user_id, from_date=from_date, to_date=to_date))
+        .order_by(Transaction.occurred_at, Transaction.id)
+        .execution_options(yield_per=batch_size)
+    )
+    result = await session.stream(query)
+    async for batch in result.mappings().partitions():
+        yield batch
+
+
+async def count_transactions(
+    session: AsyncSession,
+    *,
+    user_id: str | None = None,
+    from_date: date | None = None,
+    to_date: date | None = None,
+) -> int:
+    query = select(func.count(Transaction.id)).where(
+        *live_transaction_filters(user_id=user_id, from_date=from_date, to_date=to_date)
+    )
+    return int(await session.scalar(query) or 0)
+
+
 async def list_transactions_for_entry(
     session: AsyncSession,
     *,
@@ -77,13 +346,32 @@ async def soft_delete_transactions_for_entry(
     *,
     entry_id: int,
     commit: bool = True,
-) -> None:
-    await session.execute(
+) -> Sequence[Row[Any]]:
+    """Soft-delete the entry's live transactions and return what they were."""
+    result = await session.execute(
         Transaction.__table__.update()
-        .where(Transaction.entry_id == entry_id)
+        .where(
+            Transaction.entry_id == entry_id,
+            Transaction.is_deleted.is_(False),
+        )
         .values(is_deleted=True, updated_at=func.now())
+        .returning(
+            Transaction.user_id,
+            Transaction.category,
+            Transaction.local_date,
+            Transaction.currency,
+            Transaction.direction,
+            Transaction.amount,
+            Transaction.occurred_at,
+        )
     )
+    changed = result.all()
+    mark_months_changed(session, ((row.user_id, row.local_date) for row in changed))
+    record_writes(session, (row.user_id for row in changed))
+    await record_spend(session, spend_deltas(map(_spend_row, changed), sign=-1))
+    await record_group_changes(session, map(_recurring_group, changed))
     if commit:
         await session.commit()
     else:
         await session.flush()
+    return changed
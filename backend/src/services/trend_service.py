@@ -0,0 +1,119 @@
+"""Bucketed time-series aggregation over transactions."""
+
+from __future__ import annotations
+
+from datetime import date
+from decimal import Decimal
+
+import numpy as np
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.models.transaction import Transaction
+from src.services.fx_service import FxRateCache
+from src.services.schemas import TrendGranularity, TrendGroupBy, TrendResult, TrendSeries
+from src.services.transaction_service import local_date_filters
+
+MAX_TREND_BUCKETS = 1000
+
+_GROUP_COLUMNS = {
+    TrendGroupBy.category: Transaction.category,
+    TrendGroupBy.direction: Transaction.direction,
+    TrendGroupBy.type: Transaction.type,
+}
+
+
+def bucket_axis(start: date, end: date, granularity: TrendGranularity) -> np.ndarray:
+    first = np.datetime64(start, "D")
+    stop = np.datetime64(end, "D") + np.timedelta64(1, "D")
+    if granularity is TrendGranularity.day:
+        return np.arange(first, stop, dtype="datetime64[D]")
+    if granularity is TrendGranularity.week:
+        monday = first - np.timedelta64(start.weekday(), "D")
+        return np.arange(monday, stop, np.timedelta64(7, "D"))
+    months = np.arange(
+        first.astype("datetime64[M]"),
+        np.datetime64(end, "M") + np.timedelta64(1, "M"),
+        dtype="datetime64[M]",
+    )
+    return months.astype("datetime64[D]")
+
+
+async def get_trends(
+    session: AsyncSession,
+    *,
+    user_id: str,
+    start: date,
+    end: date,
+    granularity: TrendGranularity,
+    group_by: TrendGroupBy,
+    currency: str,
+    rates: FxRateCache,
+) -> TrendResult:
+    """Totals per bucket in `currency`.
+
+    Rows are summed per (local date, group, currency) so each sum converts
+    at its day's rate, then folded into buckets with NumPy. Currencies with no
+    rate at all are left out and listed in `unconverted_currencies`.
+    """
+    if end < start:
+        raise ValueError("end must not be before start")
+    axis = bucket_axis(start, end, granularity)
+    if len(axis) > MAX_TREND_BUCKETS:
+        raise ValueError(f"range spans more than {MAX_TREND_BUCKETS} buckets")
+
+    group_column = _GROUP_COLUMNS[group_by]
+    query = (
+        select(
+            Transaction.local_date,
+            group_column.label("group_key"),
+            Transaction.currency,
+            func.coalesce(func.sum(Transaction.amount), 0),
+            func.count(Transaction.id),
+        )
+        .where(
+            Transaction.is_deleted.is_(False),
+            Transaction.user_id == user_id,
+            *local_date_filters(start, end),
+        )
+        .group_by(Transaction.local_date, group_column, Transaction.currency)
+    )
+    rows = (await session.execute(query)).all()
+    if not rows:
+        return TrendResult(buckets=axis.astype(date).tolist(), series=[], unconverted_currencies=[])
+
+    row_currencies = np.array([row[2] for row in rows])
+    unconverted = rates.missing_currencies(row_currencies, to=currency)
+    if unconverted:
+        rows = [row for row in rows if row[2] not in unconverted]
+        row_currencies = np.array([row[2] for row in rows])
+    row_days = np.array([row[0] for row in rows], dtype="datetime64[D]")
+    row_keys = np.array([str(getattr(row[1], "value", row[1])) for row in rows])
+    row_cents = rates.convert(
+        np.array([int(Decimal(row[3]) * 100) for row in rows], dtype=np.int64),
+        row_currencies,
+        row_days,
+        to=currency,
+    )
+    row_counts = np.array([row[4] for row in rows], dtype=np.int64)
+
+    keys, key_index = np.unique(row_keys, return_inverse=True)
+    bucket_index = np.searchsorted(axis, row_days, side="right") - 1
+    totals = np.zeros((len(keys), len(axis)), dtype=np.int64)
+    counts = np.zeros((len(keys), len(axis)), dtype=np.int64)
+    np.add.at(totals, (key_index, bucket_index), row_cents)
+    np.add.at(counts, (key_index, bucket_index), row_counts)
+
+    series = [
+        TrendSeries(
+            key=str(key),
+            totals=[Decimal(int(value)).scaleb(-2) for value in totals[position]],
+            counts=counts[position].tolist(),
+        )
+        for position, key in enumerate(keys)
+    ]
+    return TrendResult(
+        buckets=axis.astype(date).tolist(),
+        series=series,
+        unconverted_currencies=unconverted,
+    )
@@ -0,0 +1,34 @@
+"""Byte compression with a recorded codec name."""
+
+from __future__ import annotations
+
+import zlib
+from typing import Any
+
+CODECS = ("zlib", "zstd")
+
+
+def _zstandard() -> Any:
+    try:
+        import zstandard
+    except ImportError as exc:
+        raise RuntimeError("the zstd codec requires the 'zstd' extra (zstandard)") from exc
+    return zstandard
+
+
+def compress(data: bytes, codec: str) -> bytes:
+    if codec == "zlib":
+        return zlib.compress(data, 6)
+    if codec == "zstd":
+        compressed: bytes = _zstandard().ZstdCompressor(level=6).compress(data)
+        return compressed
+    raise ValueError(f"unknown codec: {codec}")
+
+
+def decompress(payload: bytes, codec: str) -> bytes:
+    if codec == "zlib":
+        return zlib.decompress(payload)
+    if codec == "zstd":
+        data: bytes = _zstandard().ZstdDecompressor().decompress(payload)
+        return data
+    raise ValueError(f"unknown codec: {codec}")
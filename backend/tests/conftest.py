@@ -1,19 +1,28 @@
 from __future__ import annotations
 
+import os
 from collections.abc import AsyncGenerator
+from decimal import Decimal
 
 import pytest
 from httpx import ASGITransport, AsyncClient
-from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
 from sqlalchemy.pool import StaticPool
 
-from decimal import Decimal
+os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite:///:memory:")
 
 from src.config import get_settings
+from src.database.routing import get_write_tracker
 from src.models.base import Base
 from src.models.enums import TransactionDirection, TransactionType
 from src.parser.service import ParsedResult, get_parser
-
+from src.services.fx_service import get_fx_rate_cache
+from src.services.summary_cache import get_summary_cache
 
 
 @pytest.fixture()
@@ -22,6 +31,9 @@ async def test_engine(monkeypatch: pytest.MonkeyPatch) -> AsyncGenerator[AsyncEn
     monkeypatch.setenv("DEFAULT_USER_ID", "test-user")
     monkeypatch.setenv("ENVIRONMENT", "test")
     get_settings.cache_clear()
+    get_summary_cache.cache_clear()
+    get_write_tracker.cache_clear()
+    get_fx_rate_cache.cache_clear()
 
     engine = create_async_engine(
         "sqlite+aiosqlite:///:memory:",
@@ -54,7 +66,8 @@ async def db_session(
 @pytest.fixture()
 async def app(session_maker: async_sessionmaker[AsyncSession]):
     from src.app import create_app
-    from src.database import get_session
+    from src.database import get_read_session, get_session
+
     async def override_get_session() -> AsyncGenerator[AsyncSession, None]:
         async with session_maker() as session:
             yield session
@@ -90,6 +103,7 @@ async def app(session_maker: async_sessionmaker[AsyncSession]):
 
     app = create_app()
     app.dependency_overrides[get_session] = override_get_session
+    app.dependency_overrides[get_read_session] = override_get_session
     app.dependency_overrides[get_parser] = override_get_parser
     return app
 
@@ -0,0 +1,292 @@
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable, Callable
+from dataclasses import replace
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from pathlib import Path
+from typing import Any
+
+import pytest
+from sqlalchemy import select, text, update
+from sqlalchemy.exc import TimeoutError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from src.config import get_settings
+from src.database.archive import ArchiveBatch, archive_deleted_transactions
+from src.database.batching import WriteBatcher, WriteBatcherStats
+from src.database.partitions import (
+    add_months,
+    create_partition_sql,
+    months_between,
+    partition_month,
+    partition_name,
+    partition_statements,
+)
+from src.database.pool import PoolMetrics, build_engine
+from src.database.routing import SessionRouter, WriteTracker, get_write_tracker
+from src.models.base import Base
+from src.models.enums import TransactionDirection, TransactionType
+from src.models.transaction import Transaction, TransactionArchive
+from src.services import (
+    EntryCreate,
+    TransactionCreate,
+    create_entry,
+    create_transactions,
+    list_entries,
+)
+
+
+def test_partition_names_round_trip() -> None:
+    month = date(2024, 12, 1)
+    name = partition_name(month)
+    assert name == "transactions_p2024_12"
+    assert partition_month(name) == month
+    assert partition_month("transactions_default") is None
+
+
+def test_partition_bounds_are_utc_month_edges() -> None:
+    sql = create_partition_sql(date(2024, 12, 17))
+    assert "transactions_p2024_12 PARTITION OF transactions" in sql
+    assert "FROM ('2024-12-01 00:00:00+00') TO ('2025-01-01 00:00:00+00')" in sql
+
+
+def test_month_arithmetic_crosses_years() -> None:
+    assert add_months(date(2024, 11, 1), 3) == date(2025, 2, 1)
+    assert add_months(date(2025, 1, 1), -1) == date(2024, 12, 1)
+    assert months_between(date(2024, 11, 20), date(2025, 1, 1)) == [
+        date(2024, 11, 1),
+        date(2024, 12, 1),
+        date(2025, 1, 1),
+    ]
+
+
+def test_partition_statements_copy_rows_before_indexing() -> None:
+    statements = partition_statements(
+        date(2025, 1, 1),
+        date(2025, 2, 1),
+        indexes=["CREATE INDEX ix_transactions_entry_id ON transactions (entry_id)"],
+    )
+    insert_at = next(i for i, sql in enumerate(statements) if sql.startswith("INSERT INTO"))
+    index_at = next(i for i, sql in enumerate(statements) if sql.startswith("CREATE INDEX"))
+    assert statements[0] == "ALTER TABLE transactions RENAME TO transactions_unpartitioned"
+    assert statements[1] == "DROP INDEX IF EXISTS ix_transactions_entry_id"
+    assert insert_at < index_at
+    assert any("PARTITION BY RANGE (occurred_at)" in sql for sql in statements)
+    assert any("PRIMARY KEY (id, occurred_at)" in sql for sql in statements)
+    assert sum("PARTITION OF transactions FOR VALUES" in sql for sql in statements) == 2
+
+
+def test_write_tracker_expires_after_window() -> None:
+    now = [100.0]
+    tracker = WriteTracker(5, clock=lambda: now[0])
+    tracker.record(["u1"])
+    assert tracker.wrote_recently("u1")
+    assert not tracker.wrote_recently("u2")
+    now[0] += 5.1
+    assert not tracker.wrote_recently("u1")
+
+
+async def test_reads_route_to_primary_after_own_write(tmp_path: Path) -> None:
+    get_write_tracker.cache_clear()
+    engines = [
+        create_async_engine(f"sqlite+aiosqlite:///{tmp_path / name}")
+        for name in ("primary.db", "replica.db")
+    ]
+    for engine in engines:
+        async with engine.begin() as connection:
+            await connection.run_sync(Base.metadata.create_all)
+    primary, replica = (async_sessionmaker(engine, expire_on_commit=False) for engine in engines)
+    router = SessionRouter(primary, replica)
+
+    assert router.for_read("writer") is replica
+    async with router.for_write()() as session:
+        await create_entry(session, entry=EntryCreate(user_id="writer", raw_text="Coffee"))
+
+    assert router.for_read("writer") is primary
+    assert router.for_read("someone-else") is replica
+    async with router.for_read("writer")() as session:
+        assert len(await list_entries(session, user_id="writer")) == 1
+
+    get_write_tracker.cache_clear()
+    for engine in engines:
+        await engine.dispose()
+
+
+async def test_pool_metrics_track_checkouts_and_timeouts(tmp_path: Path) -> None:
+    settings = replace(
+        get_settings(),
+        db_pool_size=1,
+        db_max_overflow=0,
+        db_pool_timeout=0.05,
+        db_pool_liveness="idle_ping",
+        db_pool_idle_ping_seconds=0,
+    )
+    metrics = PoolMetrics()
+    engine = build_engine(
+        f"sqlite+aiosqlite:///{tmp_path / 'pool.db'}",
+        settings=settings,
+        metrics=metrics,
+    )
+
+    async with engine.connect() as held:
+        await held.execute(text("SELECT 1"))
+        assert metrics.snapshot().checked_out == 1
+        with pytest.raises(TimeoutError):
+            async with engine.connect():
+                pass
+
+    async with engine.connect() as connection:
+        await connection.execute(text("SELECT 1"))
+
+    stats = metrics.snapshot()
+    assert stats.pool_size == 1
+    assert stats.checked_out == 0
+    assert stats.checkouts == 2
+    assert stats.timeouts == 1
+    assert stats.peak_checked_out == 1
+    assert stats.liveness_failures == 0
+    # Only the blocked checkout waited, and only on the queue.
+    assert 0.05 <= stats.wait_seconds_total < 1
+    await engine.dispose()
+
+
+async def test_failed_idle_ping_does_not_leak_checked_out(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    settings = replace(
+        get_settings(),
+        db_pool_size=1,
+        db_max_overflow=0,
+        db_pool_liveness="idle_ping",
+        db_pool_idle_ping_seconds=0,
+    )
+    metrics = PoolMetrics()
+    engine = build_engine(
+        f"sqlite+aiosqlite:///{tmp_path / 'pool.db'}",
+        settings=settings,
+        metrics=metrics,
+    )
+
+    class DeadCursor:
+        def execute(self, statement: str) -> None:
+            raise OSError("connection reset")
+
+        def close(self) -> None:
+            pass
+
+    async with engine.connect() as connection:
+        dbapi_connection = (await connection.get_raw_connection()).dbapi_connection
+    assert dbapi_connection is not None
+    adapted = type(dbapi_connection)
+    original_cursor = adapted.cursor
+    dead = [DeadCursor()]
+
+    # The next idle ping fails; the pool then reconnects and checks out again.
+    def cursor(self: Any, *args: Any) -> Any:
+        return dead.pop() if dead else original_cursor(self, *args)
+
+    monkeypatch.setattr(adapted, "cursor", cursor)
+
+    async with engine.connect() as connection:
+        await connection.execute(text("SELECT 1"))
+        assert metrics.snapshot().checked_out == 1
+
+    stats = metrics.snapshot()
+    assert stats.liveness_failures == 1
+    assert stats.invalidations == 1
+    assert stats.checked_out == 0
+    assert stats.peak_checked_out == 1
+    await engine.dispose()
+
+
+async def test_archive_moves_old_deleted_transactions_in_batches(
+    session_maker: async_sessionmaker[AsyncSession],
+) -> None:
+    async with session_maker() as session:
+        entry = await create_entry(
+            session,
+            entry=EntryCreate(user_id="test-user", raw_text="Lunch"),
+        )
+        items = [
+            TransactionCreate(
+                entry_id=entry.id,
+                occurred_at=datetime(2025, 1, day, tzinfo=timezone.utc),
+                amount=Decimal("100"),
+                currency="INR",
+                direction=TransactionDirection.outflow,
+                type=TransactionType.expense,
+                category="Food & Drinks",
+            )
+            for day in range(1, 6)
+        ]
+        created = await create_transactions(session, items=items)
+        ids = [transaction.id for transaction in created]
+        await session.execute(
+            update(Transaction)
+            .where(Transaction.id.in_(ids[:4]))
+            .values(is_deleted=True, updated_at=datetime(2025, 1, 10, tzinfo=timezone.utc))
+        )
+        # Deleted inside the retention window: stays put.
+        await session.execute(
+            update(Transaction)
+            .where(Transaction.id == ids[3])
+            .values(updated_at=datetime(2025, 3, 1, tzinfo=timezone.utc))
+        )
+        await session.commit()
+
+    seen: list[ArchiveBatch] = []
+    batches = await archive_deleted_transactions(
+        session_maker,
+        cutoff=datetime(2025, 2, 1, tzinfo=timezone.utc),
+        batch_size=2,
+        on_batch=seen.append,
+    )
+
+    assert [batch.rows for batch in batches] == [2, 1]
+    assert seen == batches
+    assert batches[-1].last_id == ids[2]
+    async with session_maker() as session:
+        remaining = await session.scalars(select(Transaction.id).order_by(Transaction.id))
+        assert list(remaining) == ids[3:]
+        archived = (
+            await session.scalars(select(TransactionArchive).order_by(TransactionArchive.id))
+        ).all()
+        assert [row.id for row in archived] == ids[:3]
+        assert archived[0].amount == Decimal("100")
+        assert archived[0].category == "Food & Drinks"
+        assert archived[0].archived_at is not None
+
+
+async def test_write_batcher_isolates_failing_work(
+    session_maker: async_sessionmaker[AsyncSession],
+) -> None:
+    batcher = WriteBatcher(session_maker, window_seconds=0.01, max_items=3)
+
+    def write(raw_text: str) -> Callable[[AsyncSession], Awaitable[int]]:
+        async def work(session: AsyncSession) -> int:
+            if not raw_text:
+                raise ValueError("empty entry")
+            entry = await create_entry(
+                session,
+                entry=EntryCreate(user_id="test-user", raw_text=raw_text),
+                commit=False,
+            )
+            return entry.id
+
+        return work
+
+    results = await asyncio.gather(
+        batcher.submit(write("Tea")),
+        batcher.submit(write("")),
+        batcher.submit(write("Coffee")),
+        return_exceptions=True,
+    )
+
+    assert isinstance(results[1], ValueError)
+    assert batcher.stats() == WriteBatcherStats(flushes=2, items=2, retried_items=3)
+    async with session_maker() as session:
+        entries = await list_entries(session, user_id="test-user")
+        assert {entry.id for entry in entries} == {results[0], results[2]}
@@ -1,16 +1,47 @@
 from __future__ import annotations
 
+import asyncio
+import io
+import json
+from collections.abc import AsyncIterator
 from datetime import datetime, timedelta, timezone
 from decimal import Decimal
+from pathlib import Path
+from typing import Any
 
+import pytest
+from fastapi import FastAPI
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, Response
 from httpx import ASGITransport, AsyncClient
-from sqlalchemy import select
+from sqlalchemy import event, select, update
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+from sqlalchemy.orm import undefer
 
-from src.models.entry import Entry
-from src.models.enums import EntryStatus, TransactionDirection, TransactionType
+from src.api.v1.exports import EXPORT_COLUMNS
+from src.api.v1.idempotency import ResponseRecorder, run_idempotent
+from src.api.v1.schemas import ParseRequest, SearchResponse, TrendsResponse
+from src.config import get_settings
+from src.database import get_write_batcher
+from src.database.batching import WriteBatcher, WriteBatcherStats
+from src.models.anomaly import CategoryStats
+from src.models.change_counter import UserChangeCounter
+from src.models.entry import Entry, EntryParserOutput
+from src.models.enums import EntrySource, EntryStatus, TransactionDirection, TransactionType
+from src.models.idempotency import IdempotencyKey
 from src.models.transaction import Transaction
 from src.parser.service import ParsedResult, ParserError, get_parser
-from src.services import EntryCreate, TransactionCreate, create_entry, create_transactions
+from src.services import (
+    EntryCreate,
+    TransactionCreate,
+    create_entry,
+    create_transactions,
+    load_parser_outputs,
+)
+from src.services.fx_service import get_fx_rate_cache, read_rates_file, upsert_fx_rates
+from src.services.recurring_service import refresh_recurring_series
+from src.services.summary_cache import get_summary_cache
+from src.utils.helpers import encode_cursor
 
 
 async def test_health_check(client) -> None:
@@ -27,13 +58,19 @@ async def test_parse_creates_entry(client, db_session) -> None:
     assert data["entry_id"] > 0
     assert data["status"] == EntryStatus.pending_confirmation.value
 
-    result = await db_session.execute(select(Entry))
+    result = await db_session.execute(select(Entry).options(undefer(Entry.parser_output_json)))
     entry = result.scalar_one()
     assert entry.user_id == "test-user"
     assert entry.raw_text == payload["raw_text"]
     assert entry.status == EntryStatus.pending_confirmation
     assert entry.parser_output_json is not None
     assert entry.parser_output_json["post_processed"]["needs_confirmation"] is True
+    assert "raw_output" not in entry.parser_output_json
+
+    stored = await db_session.get(EntryParserOutput, entry.id)
+    assert stored.codec == "zlib"
+    outputs = await load_parser_outputs(db_session, [entry.id])
+    assert outputs[entry.id]["raw_output"] == {"mock": True}
 
 
 async def test_parse_requires_text(client) -> None:
@@ -87,6 +124,9 @@ async def test_parse_auto_confirms_transactions(app, db_session) -> None:
     assert tx.amount == Decimal("250.00")
     assert tx.is_deleted is False
 
+    stats = await db_session.get(CategoryStats, ("test-user", "Food & Drinks", "INR"))
+    assert (stats.amount_count, stats.last_occurred_at) == (1, tx.occurred_at)
+
 
 async def test_parse_handles_parser_failure(app) -> None:
     class ErrorParser:
@@ -102,6 +142,111 @@ async def test_parse_handles_parser_failure(app) -> None:
         assert response.status_code == 502
 
 
+async def test_parse_replays_response_for_idempotency_key(
+    app: FastAPI,
+    client: AsyncClient,
+    db_session: AsyncSession,
+) -> None:
+    calls: list[str] = []
+    fake_parser = app.dependency_overrides[get_parser]()
+
+    class CountingParser:
+        async def parse(self, **kwargs: Any) -> ParsedResult:
+            calls.append(kwargs["raw_text"])
+            result: ParsedResult = await fake_parser.parse(**kwargs)
+            return result
+
+    app.dependency_overrides[get_parser] = lambda: CountingParser()
+    headers = {"Idempotency-Key": "parse-1"}
+    first = await client.post("/v1/parse", json={"raw_text": "Taxi 300"}, headers=headers)
+    retry = await client.post("/v1/parse", json={"raw_text": "Taxi 300"}, headers=headers)
+    assert first.status_code == retry.status_code == 201
+    assert retry.content == first.content
+    assert retry.headers["Idempotent-Replayed"] == "true"
+    assert "Idempotent-Replayed" not in first.headers
+    assert calls == ["Taxi 300"]
+    entries = (await db_session.scalars(select(Entry))).all()
+    assert [entry.id for entry in entries] == [first.json()["entry_id"]]
+
+    reused = await client.post("/v1/parse", json={"raw_text": "Bus 40"}, headers=headers)
+    assert reused.status_code == 422
+    assert calls == ["Taxi 300"]
+
+
+async def test_failed_request_releases_idempotency_key(
+    app: FastAPI,
+    client: AsyncClient,
+    db_session: AsyncSession,
+) -> None:
+    class ErrorParser:
+        async def parse(self, *, raw_text: str, reference_datetime: datetime) -> ParsedResult:
+            raise ParserError("boom")
+
+    fake_parser = app.dependency_overrides[get_parser]
+    app.dependency_overrides[get_parser] = lambda: ErrorParser()
+    headers = {"Idempotency-Key": "parse-2"}
+    response = await client.post("/v1/parse", json={"raw_text": "Rent"}, headers=headers)
+    assert response.status_code == 502
+    assert (await db_session.scalars(select(IdempotencyKey))).all() == []
+
+    app.dependency_overrides[get_parser] = fake_parser
+    response = await client.post("/v1/parse", json={"raw_text": "Rent"}, headers=headers)
+    assert response.status_code == 201
+    stored = (await db_session.scalars(select(IdempotencyKey))).one()
+    assert stored.status_code == 201
+    assert stored.response_body == response.content
+
+
+async def test_cancelled_request_releases_idempotency_key(
+    session_maker: async_sessionmaker[AsyncSession],
+    db_session: AsyncSession,
+) -> None:
+    async def cancelled(record: ResponseRecorder) -> Response:
+        raise asyncio.CancelledError
+
+    async def uncommitted(record: ResponseRecorder) -> Response:
+        async with session_maker() as write_session:
+            await record(write_session, Response(b"{}", status_code=201))
+        return Response(b"{}", status_code=201)
+
+    payload = ParseRequest(raw_text="Rent")
+    async with session_maker() as session:
+        with pytest.raises(asyncio.CancelledError):
+            await run_idempotent(
+                session, key="parse-3", endpoint="parse", payload=payload, handler=cancelled
+            )
+    assert (await db_session.scalars(select(IdempotencyKey))).all() == []
+
+    # The response is only stored by the handler's own commit.
+    async with session_maker() as session:
+        await run_idempotent(
+            session, key="parse-3", endpoint="parse", payload=payload, handler=uncommitted
+        )
+    stored = (await db_session.scalars(select(IdempotencyKey))).one()
+    assert stored.status_code is None
+
+
+async def test_concurrent_parses_share_one_commit(
+    app: FastAPI,
+    client: AsyncClient,
+    session_maker: async_sessionmaker[AsyncSession],
+    db_session: AsyncSession,
+) -> None:
+    batcher = WriteBatcher(session_maker, window_seconds=0.05, max_items=10)
+    app.dependency_overrides[get_write_batcher] = lambda: batcher
+
+    responses = await asyncio.gather(
+        *(client.post("/v1/parse", json={"raw_text": f"Snack {n}"}) for n in range(3))
+    )
+
+    assert [response.status_code for response in responses] == [201, 201, 201]
+    entry_ids = sorted(response.json()["entry_id"] for response in responses)
+    assert len(set(entry_ids)) == 3
+    assert batcher.stats() == WriteBatcherStats(flushes=1, items=3, retried_items=0)
+    stored = await db_session.scalars(select(Entry.id).order_by(Entry.id))
+    assert list(stored) == entry_ids
+
+
 async def test_confirm_creates_transactions(client, db_session) -> None:
     parse_response = await client.post("/v1/parse", json={"raw_text": "Lunch 250"})
     entry_id = parse_response.json()["entry_id"]
@@ -130,6 +275,9 @@ async def test_confirm_creates_transactions(client, db_session) -> None:
     result = await db_session.execute(select(Entry))
     entry = result.scalar_one()
     assert entry.status == EntryStatus.confirmed
+    stored_output = await db_session.scalar(select(Entry.parser_output_json))
+    assert stored_output is not None
+    assert data["entry"]["parser_output_json"] == stored_output
 
     tx_result = await db_session.execute(select(Transaction))
     tx = tx_result.scalar_one()
@@ -186,7 +334,9 @@ async def test_confirm_replaces_transactions(client, db_session) -> None:
 async def test_confirm_requires_transactions(client) -> None:
     parse_response = await client.post("/v1/parse", json={"raw_text": "Lunch"})
     entry_id = parse_response.json()["entry_id"]
-    response = await client.post("/v1/entries/confirm", json={"entry_id": entry_id, "transactions": []})
+    response = await client.post(
+        "/v1/entries/confirm", json={"entry_id": entry_id, "transactions": []}
+    )
     assert response.status_code == 422
 
 
@@ -247,7 +397,9 @@ async def test_list_transactions_filters_and_paginates(client, db_session) -> No
     ]
     await create_transactions(db_session, items=items)
 
-    response = await client.get("/v1/transactions", params={"from": "2025-01-09", "to": "2025-01-10"})
+    response = await client.get(
+        "/v1/transactions", params={"from": "2025-01-09", "to": "2025-01-10"}
+    )
     assert response.status_code == 200
     data = response.json()
     assert data["total_count"] == 2
@@ -257,6 +409,329 @@ async def test_list_transactions_filters_and_paginates(client, db_session) -> No
     assert data["items"][1]["amount"] == 200
 
 
+async def test_export_streams_csv_and_ndjson(client: AsyncClient, db_session: AsyncSession) -> None:
+    entry = await create_entry(
+        db_session,
+        entry=EntryCreate(user_id="test-user", raw_text="Seed"),
+    )
+    base_time = datetime(2025, 1, 10, tzinfo=timezone.utc)
+    await create_transactions(
+        db_session,
+        items=[
+            TransactionCreate(
+                entry_id=entry.id,
+                occurred_at=base_time + timedelta(days=offset),
+                amount=Decimal(amount),
+                currency="INR",
+                direction=TransactionDirection.outflow,
+                type=TransactionType.expense,
+                category="Food & Drinks",
+                assumptions_json=["tip included"] if offset else None,
+            )
+            for offset, amount in enumerate(["12.50", "40"])
+        ],
+    )
+
+    response = await client.get("/v1/transactions/export", params={"format": "csv"})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    assert 'filename="transactions.csv"' in response.headers["content-disposition"]
+    lines = response.text.splitlines()
+    assert lines[0].split(",")[:6] == [
+        "id",
+        "entry_id",
+        "occurred_time",
+        "created_time",
+        "modified_time",
+        "amount",
+    ]
+    assert [line.split(",")[5] for line in lines[1:]] == ["12.50", "40.00"]
+    assert lines[2].endswith('"[""tip included""]"')
+
+    response = await client.get(
+        "/v1/transactions/export",
+        params={"format": "ndjson", "from": "2025-01-11", "to": "2025-01-31"},
+    )
+    assert response.headers["content-type"] == "application/x-ndjson"
+    records = [json.loads(line) for line in response.text.splitlines()]
+    assert [record["amount"] for record in records] == [40]
+    assert records[0]["assumptions_json"] == ["tip included"]
+
+    empty = await client.get("/v1/transactions/export", params={"from": "2030-01-01"})
+    assert empty.text.splitlines() == [",".join(EXPORT_COLUMNS)]
+
+
+async def test_export_writes_columnar_formats(
+    client: AsyncClient,
+    db_session: AsyncSession,
+) -> None:
+    pa = pytest.importorskip("pyarrow")
+    pq = pytest.importorskip("pyarrow.parquet")
+    entry = await create_entry(
+        db_session,
+        entry=EntryCreate(user_id="test-user", raw_text="Seed"),
+    )
+    await create_transactions(
+        db_session,
+        items=[
+            TransactionCreate(
+                entry_id=entry.id,
+                occurred_at=datetime(2025, 1, day, tzinfo=timezone.utc),
+                amount=Decimal(amount),
+                currency="INR",
+                direction=direction,
+                type=TransactionType.expense,
+                category="Transport",
+            )
+            for day, amount, direction in [
+                (3, "99.90", TransactionDirection.outflow),
+                (4, "5", TransactionDirection.inflow),
+            ]
+        ],
+    )
+
+    response = await client.get("/v1/transactions/export", params={"format": "arrow"})
+    assert response.status_code == 200
+    table = pa.ipc.open_stream(response.content).read_all()
+    assert table.schema.field("amount").type == pa.decimal128(12, 2)
+    assert pa.types.is_dictionary(table.schema.field("direction").type)
+    assert table.column("amount").to_pylist() == [Decimal("99.90"), Decimal("5.00")]
+
+    response = await client.get("/v1/transactions/export", params={"format": "parquet"})
+    table = pq.read_table(io.BytesIO(response.content))
+    assert table.column("direction").to_pylist() == ["outflow", "inflow"]
+    assert table.column("occurred_time")[0].as_py() == datetime(2025, 1, 3, tzinfo=timezone.utc)
+
+
+async def test_columnar_export_without_pyarrow_is_501(
+    client: AsyncClient,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr("src.api.v1.routes.export_available", lambda export_format: False)
+    response = await client.get("/v1/transactions/export", params={"format": "parquet"})
+    assert response.status_code == 501
+
+
+async def test_import_inserts_valid_rows_and_reports_errors(
+    client: AsyncClient,
+    db_session: AsyncSession,
+) -> None:
+    body = (
+        b"occurred_time,amount,direction,type,category,assumptions\n"
+        b'2025-02-01T10:00:00+00:00,120.50,outflow,expense,"Food & Drinks",\n'
+        b"2025-02-02T09:00:00,-5,outflow,expense,Transport,\n"
+        b'2025-02-03T08:00:00+00:00,999,inflow,income,Income,"[""bonus""]"\n'
+        b"2025-02-04T08:00:00+00:00,10,sideways,expense,Bills,\n"
+    )
+
+    async def chunks() -> AsyncIterator[bytes]:
+        for start in range(0, len(body), 7):
+            yield body[start : start + 7]
+
+    response = await client.post(
+        "/v1/transactions/import", params={"format": "csv"}, content=chunks()
+    )
+    assert response.status_code == 201
+    data = response.json()
+    assert data["imported"] == 2
+    assert data["rejected"] == 2
+    assert [error["row"] for error in data["errors"]] == [2, 4]
+    assert "amount" in data["errors"][0]["message"]
+
+    entry = await db_session.get(Entry, data["entry_id"])
+    assert entry is not None
+    assert entry.source == EntrySource.bulk_import
+    rows = (
+        await db_session.execute(
+            select(Transaction.amount, Transaction.user_id, Transaction.assumptions_json)
+            .where(Transaction.entry_id == entry.id)
+            .order_by(Transaction.occurred_at)
+        )
+    ).all()
+    assert rows == [(Decimal("120.50"), "test-user", []), (Decimal("999"), "test-user", ["bonus"])]
+    stats = await db_session.get(CategoryStats, ("test-user", "Food & Drinks", "INR"))
+    assert stats is not None
+    assert stats.amount_count == 1
+
+
+async def test_import_accepts_ndjson_export(client: AsyncClient, db_session: AsyncSession) -> None:
+    entry = await create_entry(
+        db_session,
+        entry=EntryCreate(user_id="test-user", raw_text="Seed"),
+    )
+    await create_transactions(
+        db_session,
+        items=[
+            TransactionCreate(
+                entry_id=entry.id,
+                occurred_at=datetime(2025, 3, 1, tzinfo=timezone.utc),
+                amount=Decimal("42"),
+                currency="INR",
+                direction=TransactionDirection.outflow,
+                type=TransactionType.expense,
+                category="Bills",
+            )
+        ],
+    )
+    exported = await client.get("/v1/transactions/export", params={"format": "ndjson"})
+
+    response = await client.post(
+        "/v1/transactions/import",
+        params={"format": "ndjson"},
+        content=exported.content + b"not json\n",
+    )
+    data = response.json()
+    assert (data["imported"], data["rejected"]) == (1, 1)
+    listed = await client.get("/v1/transactions")
+    assert [item["amount"] for item in listed.json()["items"]] == [42, 42]
+
+
+async def test_import_rejects_unusable_body(
+    client: AsyncClient,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    response = await client.post("/v1/transactions/import", content=b"date,value\n1,2\n")
+    assert response.status_code == 400
+    assert "missing CSV columns" in response.json()["detail"]
+
+    response = await client.post(
+        "/v1/transactions/import", params={"format": "ndjson"}, content=b"[1]\n"
+    )
+    assert response.json() == {
+        "entry_id": None,
+        "imported": 0,
+        "rejected": 1,
+        "errors": [{"row": 1, "message": "expected a JSON object"}],
+    }
+
+    monkeypatch.setattr("src.api.v1.imports.MAX_RECORD_LENGTH", 64)
+    header = b"occurred_time,amount,direction,type,category\n"
+    unclosed = b'2025-01-01,1,outflow,expense,"Food\n' + b"x\n" * 40
+    for params, content in (
+        ({"format": "csv"}, header + unclosed),
+        ({"format": "ndjson"}, b'{"category": "' + b"x" * 80 + b'"}\n'),
+    ):
+        response = await client.post("/v1/transactions/import", params=params, content=content)
+        assert response.status_code == 400
+        assert response.json()["detail"] == "a row is longer than 64 characters"
+
+
+async def test_search_ranks_and_pages_entries(
+    client: AsyncClient,
+    db_session: AsyncSession,
+) -> None:
+    for raw_text in [
+        "Goa trip flights 12000",
+        "Dinner in Goa on the trip, Goa beach shack",
+        "Groceries 800",
+    ]:
+        await create_entry(db_session, entry=EntryCreate(user_id="test-user", raw_text=raw_text))
+    await create_entry(db_session, entry=EntryCreate(user_id="other", raw_text="Goa trip"))
+
+    first = await client.get("/v1/search", params={"q": "goa trip", "limit": 1})
+    assert first.status_code == 200
+    page = first.json()
+    assert [item["raw_text"] for item in page["items"]] == ["Goa trip flights 12000"]
+    assert page["next_cursor"]
+
+    second = await client.get(
+        "/v1/search", params={"q": "goa trip", "limit": 1, "cursor": page["next_cursor"]}
+    )
+    page = second.json()
+    assert [item["raw_text"] for item in page["items"]] == [
+        "Dinner in Goa on the trip, Goa beach shack"
+    ]
+    assert page["next_cursor"] is None
+
+    prefix = await client.get("/v1/search", params={"q": "grocer"})
+    assert [item["raw_text"] for item in prefix.json()["items"]] == ["Groceries 800"]
+
+    invalid = await client.get("/v1/search", params={"q": "goa", "cursor": "nope"})
+    assert invalid.status_code == 400
+
+
+async def test_confirm_indexes_categories_for_search(
+    client: AsyncClient,
+    db_session: AsyncSession,
+) -> None:
+    parsed = await client.post("/v1/parse", json={"raw_text": "Zomato order"})
+    entry_id = parsed.json()["entry_id"]
+    payload = {
+        "entry_id": entry_id,
+        "transactions": [
+            {
+                "occurred_time": "2025-01-05T10:00:00+00:00",
+                "amount": 250,
+                "direction": "outflow",
+                "type": "expense",
+                "category": "Shopping",
+            }
+        ],
+    }
+    await client.post("/v1/entries/confirm", json=payload)
+
+    response = await client.get("/v1/search", params={"q": "shopping"})
+    assert [item["entry_id"] for item in response.json()["items"]] == [entry_id]
+
+
+async def test_entries_feed_filters_pages_and_loads_live_transactions(
+    client: AsyncClient, db_session: AsyncSession, test_engine: AsyncEngine
+) -> None:
+    confirmed_id = (await client.post("/v1/parse", json={"raw_text": "Lunch"})).json()["entry_id"]
+    for amount in (100, 250):
+        await client.post(
+            "/v1/entries/confirm",
+            json={
+                "entry_id": confirmed_id,
+                "transactions": [
+                    {
+                        "occurred_time": "2025-01-10T12:30:00+00:00",
+                        "amount": amount,
+                        "direction": "outflow",
+                        "type": "expense",
+                        "category": "Food & Drinks",
+                    }
+                ],
+            },
+        )
+    pending_ids = [
+        (await client.post("/v1/parse", json={"raw_text": text})).json()["entry_id"]
+        for text in ("Cab", "Movie")
+    ]
+
+    statements: list[str] = []
+
+    def listener(connection: Any, cursor: Any, statement: str, *args: Any) -> None:
+        statements.append(statement)
+
+    event.listen(test_engine.sync_engine, "before_cursor_execute", listener)
+    response = await client.get("/v1/entries", params={"limit": 3})
+    event.remove(test_engine.sync_engine, "before_cursor_execute", listener)
+    assert len(statements) == 2
+
+    data = response.json()
+    assert [item["id"] for item in data["items"]] == [*reversed(pending_ids), confirmed_id]
+    confirmed = data["items"][2]
+    assert [item["amount"] for item in confirmed["transactions"]] == [250]
+    assert confirmed["parser_output_json"] is None
+
+    inbox = await client.get(
+        "/v1/entries",
+        params={"status": "pending_confirmation", "limit": 1, "include_parser_output": True},
+    )
+    page = inbox.json()
+    assert [item["id"] for item in page["items"]] == [pending_ids[1]]
+    assert page["items"][0]["parser_output_json"]["raw_output"] == {"mock": True}
+
+    inbox = await client.get(
+        "/v1/entries",
+        params={"status": "pending_confirmation", "limit": 1, "cursor": page["next_cursor"]},
+    )
+    page = inbox.json()
+    assert [item["id"] for item in page["items"]] == [pending_ids[0]]
+    assert page["next_cursor"] is None
+
+
 async def test_summary_returns_totals_and_categories(client, db_session) -> None:
     entry = await create_entry(
         db_session,
@@ -302,7 +777,9 @@ async def test_summary_returns_totals_and_categories(client, db_session) -> None
     assert data["net"] == 3800
     assert data["transaction_count"] == 2
 
-    categories = {(item["direction"], item["category"]): item["total"] for item in data["by_category"]}
+    categories = {
+        (item["direction"], item["category"]): item["total"] for item in data["by_category"]
+    }
     assert categories[("inflow", "Income")] == 5000
     assert categories[("outflow", "Food & Drinks")] == 1200
 
@@ -310,3 +787,677 @@ async def test_summary_returns_totals_and_categories(client, db_session) -> None
 async def test_summary_rejects_invalid_month(client) -> None:
     response = await client.get("/v1/summary", params={"month": "2025-13"})
     assert response.status_code == 400
+
+
+async def test_summary_is_cached_until_confirm_touches_month(client: AsyncClient) -> None:
+    parse_response = await client.post("/v1/parse", json={"raw_text": "Groceries"})
+    entry_id = parse_response.json()["entry_id"]
+
+    first = await client.get("/v1/summary", params={"month": "2025-03"})
+    assert first.json()["transaction_count"] == 0
+    await client.get("/v1/summary", params={"month": "2025-03"})
+    assert get_summary_cache().stats().hits == 1
+
+    payload = {
+        "entry_id": entry_id,
+        "transactions": [
+            {
+                "occurred_time": "2025-03-15T10:00:00+00:00",
+                "amount": 400,
+                "currency": "INR",
+                "direction": "outflow",
+                "type": "expense",
+                "category": "Groceries",
+                "assumptions": [],
+            }
+        ],
+    }
+    assert (await client.post("/v1/entries/confirm", json=payload)).status_code == 201
+
+    refreshed = await client.get("/v1/summary", params={"month": "2025-03"})
+    assert refreshed.json()["transaction_count"] == 1
+    assert refreshed.json()["total_outflow"] == 400
+
+
+async def test_trends_zero_fills_buckets(client: AsyncClient, db_session: AsyncSession) -> None:
+    entry = await create_entry(
+        db_session,
+        entry=EntryCreate(user_id="test-user", raw_text="Seed"),
+    )
+    seed = [
+        (datetime(2025, 1, 6, 9, tzinfo=timezone.utc), "120.50", "Food & Drinks"),
+        (datetime(2025, 1, 7, 9, tzinfo=timezone.utc), "79.50", "Food & Drinks"),
+        (datetime(2025, 1, 20, 9, tzinfo=timezone.utc), "300", "Transport"),
+        (datetime(2025, 3, 2, 9, tzinfo=timezone.utc), "50", "Food & Drinks"),
+    ]
+    await create_transactions(
+        db_session,
+        items=[
+            TransactionCreate(
+                entry_id=entry.id,
+                occurred_at=occurred_at,
+                amount=Decimal(amount),
+                currency="INR",
+                direction=TransactionDirection.outflow,
+                type=TransactionType.expense,
+                category=category,
+            )
+            for occurred_at, amount, category in seed
+        ],
+    )
+
+    response = await client.get(
+        "/v1/trends",
+        params={"from": "2025-01-01", "to": "2025-03-31", "granularity": "month"},
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert data["buckets"] == ["2025-01-01", "2025-02-01", "2025-03-01"]
+    series = {item["key"]: item for item in data["series"]}
+    assert series["Food & Drinks"]["totals"] == [200, 0, 50]
+    assert series["Food & Drinks"]["counts"] == [2, 0, 1]
+    assert series["Transport"]["totals"] == [300, 0, 0]
+
+    weekly = await client.get(
+        "/v1/trends",
+        params={
+            "from": "2025-01-08",
+            "to": "2025-01-21",
+            "granularity": "week",
+            "group_by": "direction",
+        },
+    )
+    weekly_data = weekly.json()
+    assert weekly_data["buckets"] == ["2025-01-06", "2025-01-13", "2025-01-20"]
+    assert weekly_data["series"] == [{"key": "outflow", "totals": [0, 0, 300], "counts": [0, 0, 1]}]
+
+
+async def test_search_and_trends_bodies_match_jsonable_encoder(
+    client: AsyncClient,
+    db_session: AsyncSession,
+) -> None:
+    entry = await create_entry(
+        db_session,
+        entry=EntryCreate(user_id="test-user", raw_text="Goa trip café 120.50"),
+    )
+    # Keeps bm25 scores out of exponent range, where only the spelling differs
+    # (pydantic-core writes 2e-6, json.dumps 2e-06).
+    for raw_text in ("Groceries 800", "Rent 15000", "Taxi to airport 450"):
+        await create_entry(db_session, entry=EntryCreate(user_id="test-user", raw_text=raw_text))
+    await create_transactions(
+        db_session,
+        items=[
+            TransactionCreate(
+                entry_id=entry.id,
+                occurred_at=datetime(2025, 1, 6, 9, tzinfo=timezone.utc),
+                amount=Decimal("120.50"),
+                currency="INR",
+                direction=TransactionDirection.outflow,
+                type=TransactionType.expense,
+                category="Food & Drinks",
+            )
+        ],
+    )
+
+    search = await client.get("/v1/search", params={"q": "goa trip"})
+    trends = await client.get("/v1/trends", params={"from": "2025-01-01", "to": "2025-02-28"})
+    assert search.json()["items"][0]["status"] == "parsed"
+    assert trends.json()["series"][0]["totals"] == [120.5, 0]
+    # What FastAPI rendered before these routes returned PydanticJSONResponse.
+    for response, model in ((search, SearchResponse), (trends, TrendsResponse)):
+        legacy = JSONResponse(jsonable_encoder(model.model_validate_json(response.content)))
+        assert response.content == legacy.body
+
+
+async def test_trends_rejects_inverted_range(client: AsyncClient) -> None:
+    response = await client.get("/v1/trends", params={"from": "2025-02-01", "to": "2025-01-01"})
+    assert response.status_code == 400
+
+
+async def test_reads_are_scoped_to_the_caller(
+    client: AsyncClient,
+    db_session: AsyncSession,
+) -> None:
+    mine = await create_entry(db_session, entry=EntryCreate(user_id="test-user", raw_text="A"))
+    theirs = await create_entry(db_session, entry=EntryCreate(user_id="someone", raw_text="B"))
+    await create_transactions(
+        db_session,
+        items=[
+            TransactionCreate(
+                entry_id=entry.id,
+                occurred_at=datetime(2025, 4, 2, tzinfo=timezone.utc),
+                amount=amount,
+                currency="INR",
+                direction=TransactionDirection.outflow,
+                type=TransactionType.expense,
+                category="Shopping",
+            )
+            for entry, amount in ((mine, Decimal("10")), (theirs, Decimal("999")))
+        ],
+    )
+
+    listed = (await client.get("/v1/transactions")).json()
+    assert listed["total_count"] == 1
+    assert listed["items"][0]["entry_id"] == mine.id
+
+    summary = (await client.get("/v1/summary", params={"month": "2025-04"})).json()
+    assert summary["total_outflow"] == 10
+
+
+async def test_metrics_endpoint_reports_pool_and_cache(client: AsyncClient) -> None:
+    await client.get("/v1/summary", params={"month": "2025-01"})
+    response = await client.get("/v1/metrics")
+    assert response.status_code == 200
+    data = response.json()
+    assert "primary" in data["pools"]
+    assert data["summary_cache"]["misses"] == 1
+
+
+async def test_sync_returns_changes_since_cursor(
+    client: AsyncClient,
+    db_session: AsyncSession,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setenv("SYNC_SAFETY_LAG_SECONDS", "0")
+    get_settings.cache_clear()
+    now = datetime.now(timezone.utc)
+    entry = await create_entry(db_session, entry=EntryCreate(user_id="test-user", raw_text="Week"))
+    created = await create_transactions(
+        db_session,
+        items=[
+            TransactionCreate(
+                entry_id=entry.id,
+                occurred_at=datetime(2025, 1, day, tzinfo=timezone.utc),
+                amount=Decimal("10"),
+                currency="INR",
+                direction=TransactionDirection.outflow,
+                type=TransactionType.expense,
+                category="Food & Drinks",
+            )
+            for day in (1, 2, 3)
+        ],
+    )
+    first, second, third = (transaction.id for transaction in created)
+    await db_session.execute(
+        update(Entry).where(Entry.id == entry.id).values(updated_at=now - timedelta(minutes=10))
+    )
+    for minutes, transaction_id in ((9, first), (8, second), (7, third)):
+        await db_session.execute(
+            update(Transaction)
+            .where(Transaction.id == transaction_id)
+            .values(updated_at=now - timedelta(minutes=minutes))
+        )
+    await db_session.commit()
+
+    page = (await client.get("/v1/sync", params={"limit": 2})).json()
+    assert [item["id"] for item in page["entries"]] == [entry.id]
+    assert [item["id"] for item in page["transactions"]] == [first, second]
+    assert page["has_more"] is True
+    assert page["reset"] is False
+
+    page = (await client.get("/v1/sync", params={"since": page["next_cursor"]})).json()
+    assert page["entries"] == []
+    assert [item["id"] for item in page["transactions"]] == [third]
+    assert page["has_more"] is False
+    cursor = page["next_cursor"]
+
+    changed_at = datetime.now(timezone.utc)
+    await db_session.execute(
+        update(Transaction)
+        .where(Transaction.id == first)
+        .values(is_deleted=True, updated_at=changed_at)
+    )
+    await db_session.execute(
+        update(Transaction)
+        .where(Transaction.id == third)
+        .values(category="Travel", updated_at=changed_at)
+    )
+    await db_session.commit()
+
+    page = (await client.get("/v1/sync", params={"since": cursor})).json()
+    assert [(item["id"], item["category"]) for item in page["transactions"]] == [(third, "Travel")]
+    assert page["deleted_transaction_ids"] == [first]
+    page = (await client.get("/v1/sync", params={"since": page["next_cursor"]})).json()
+    assert page["transactions"] == page["deleted_transaction_ids"] == page["entries"] == []
+
+    expired = (now - timedelta(days=60)).isoformat()
+    page = (
+        await client.get("/v1/sync", params={"since": encode_cursor(expired, 0, expired, 0)})
+    ).json()
+    assert page["reset"] is True
+    assert [item["id"] for item in page["transactions"]] == [second, third]
+    assert page["deleted_transaction_ids"] == []
+
+    response = await client.get("/v1/sync", params={"since": "not-a-cursor"})
+    assert response.status_code == 400
+
+
+async def test_sync_waits_for_late_committing_writer(
+    client: AsyncClient,
+    db_session: AsyncSession,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setenv("SYNC_SAFETY_LAG_SECONDS", "0")
+    get_settings.cache_clear()
+    now = datetime.now(timezone.utc)
+    writer_started = now - timedelta(minutes=5)
+    open_since: list[datetime | None] = [writer_started]
+
+    async def write_watermark(session: AsyncSession) -> datetime | None:
+        return open_since[0]
+
+    monkeypatch.setattr("src.services.sync_service._write_watermark", write_watermark)
+    entry = await create_entry(db_session, entry=EntryCreate(user_id="test-user", raw_text="Late"))
+    early, late = (
+        transaction.id
+        for transaction in await create_transactions(
+            db_session,
+            items=[
+                TransactionCreate(
+                    entry_id=entry.id,
+                    occurred_at=datetime(2025, 1, day, tzinfo=timezone.utc),
+                    amount=Decimal("10"),
+                    currency="INR",
+                    direction=TransactionDirection.outflow,
+                    type=TransactionType.expense,
+                    category="Food & Drinks",
+                )
+                for day in (1, 2)
+            ],
+        )
+    )
+    await db_session.execute(
+        update(Entry).where(Entry.id == entry.id).values(updated_at=now - timedelta(minutes=10))
+    )
+    await db_session.execute(
+        update(Transaction)
+        .where(Transaction.id == early)
+        .values(updated_at=now - timedelta(minutes=10))
+    )
+    # Stands in for a writer that began at writer_started and has not committed yet.
+    await db_session.execute(
+        update(Transaction)
+        .where(Transaction.id == late)
+        .values(updated_at=now + timedelta(hours=1))
+    )
+    await db_session.commit()
+
+    page = (await client.get("/v1/sync")).json()
+    assert [item["id"] for item in page["transactions"]] == [early]
+    assert page["has_more"] is False
+
+    # The writer commits rows stamped at its start, well before the request above.
+    await db_session.execute(
+        update(Transaction)
+        .where(Transaction.id == late)
+        .values(updated_at=writer_started + timedelta(seconds=1))
+    )
+    await db_session.commit()
+    open_since[0] = None
+
+    page = (await client.get("/v1/sync", params={"since": page["next_cursor"]})).json()
+    assert [item["id"] for item in page["transactions"]] == [late]
+
+
+async def test_unchanged_reads_return_not_modified(
+    client: AsyncClient,
+    test_engine: AsyncEngine,
+) -> None:
+    entry_id = (await client.post("/v1/parse", json={"raw_text": "Lunch"})).json()["entry_id"]
+    confirm = {
+        "entry_id": entry_id,
+        "transactions": [
+            {
+                "occurred_time": "2025-01-10T12:30:00+00:00",
+                "amount": 250,
+                "direction": "outflow",
+                "type": "expense",
+                "category": "Food & Drinks",
+            }
+        ],
+    }
+    await client.post("/v1/entries/confirm", json=confirm)
+
+    summary = await client.get("/v1/summary", params={"month": "2025-01"})
+    listing = await client.get("/v1/transactions")
+    etag = summary.headers["ETag"]
+    assert listing.headers["ETag"] == etag
+    assert summary.headers["Cache-Control"] == "private, no-cache"
+
+    statements: list[str] = []
+
+    def listener(connection: Any, cursor: Any, statement: str, *args: Any) -> None:
+        statements.append(statement)
+
+    event.listen(test_engine.sync_engine, "before_cursor_execute", listener)
+    try:
+        for path, params in (("/v1/summary", {"month": "2025-01"}), ("/v1/transactions", {})):
+            response = await client.get(path, params=params, headers={"If-None-Match": etag})
+            assert response.status_code == 304
+            assert response.content == b""
+            assert response.headers["ETag"] == etag
+    finally:
+        event.remove(test_engine.sync_engine, "before_cursor_execute", listener)
+    assert len(statements) == 2
+    assert all("user_change_counters" in statement for statement in statements)
+
+    await client.post("/v1/entries/confirm", json=confirm)
+    response = await client.get(
+        "/v1/summary",
+        params={"month": "2025-01"},
+        headers={"If-None-Match": etag},
+    )
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+
+
+async def test_cached_summary_is_not_served_after_another_workers_write(
+    client: AsyncClient,
+    db_session: AsyncSession,
+) -> None:
+    entry_id = (await client.post("/v1/parse", json={"raw_text": "Lunch"})).json()["entry_id"]
+    confirm = {
+        "entry_id": entry_id,
+        "transactions": [
+            {
+                "occurred_time": "2025-01-10T12:30:00+00:00",
+                "amount": 250,
+                "direction": "outflow",
+                "type": "expense",
+                "category": "Food & Drinks",
+            }
+        ],
+    }
+    await client.post("/v1/entries/confirm", json=confirm)
+    first = await client.get("/v1/summary", params={"month": "2025-01"})
+    assert first.json()["total_outflow"] == 250
+
+    # A write committed elsewhere: it bumps the version but never reaches this cache.
+    await db_session.execute(update(Transaction).values(amount=Decimal("300")))
+    await db_session.execute(
+        update(UserChangeCounter).values(version=UserChangeCounter.version + 1)
+    )
+    await db_session.commit()
+
+    second = await client.get("/v1/summary", params={"month": "2025-01"})
+    assert second.headers["ETag"] != first.headers["ETag"]
+    assert second.json()["total_outflow"] == 300
+
+
+async def test_budget_thresholds_and_status(client: AsyncClient) -> None:
+    response = await client.post(
+        "/v1/budgets",
+        json={"category": "Food & Drinks", "month": "2025-01", "limit_amount": 500},
+    )
+    assert response.status_code == 201
+    assert response.json()["limit_amount"] == 500
+
+    entry_id = (await client.post("/v1/parse", json={"raw_text": "Dinner"})).json()["entry_id"]
+
+    async def confirm(amount: int) -> list[tuple[int, float]]:
+        response = await client.post(
+            "/v1/entries/confirm",
+            json={
+                "entry_id": entry_id,
+                "transactions": [
+                    {
+                        "occurred_time": "2025-01-10T12:30:00+00:00",
+                        "amount": amount,
+                        "direction": "outflow",
+                        "type": "expense",
+                        "category": "Food & Drinks",
+                    }
+                ],
+            },
+        )
+        events = response.json()["budget_events"]
+        return [(event["threshold_percent"], event["spent"]) for event in events]
+
+    assert await confirm(300) == [(50, 300)]
+    # Re-confirming replaces the 300 with 450: only the 80% mark is newly crossed.
+    assert await confirm(450) == [(80, 450)]
+    assert await confirm(450) == []
+    assert await confirm(600) == [(100, 600)]
+
+    status_response = await client.get("/v1/budgets/status", params={"month": "2025-01"})
+    (item,) = status_response.json()["items"]
+    assert item["spent"] == 600
+    assert item["remaining"] == -100
+    assert item["percent_used"] == 120
+    assert item["days_elapsed"] == item["days_in_month"] == 31
+    assert item["daily_burn_rate"] == 19.35
+    assert item["projected_spend"] == 600
+
+    listed = await client.get("/v1/budgets", params={"month": "2025-01"})
+    assert [budget["category"] for budget in listed.json()["items"]] == ["Food & Drinks"]
+    assert (await client.get("/v1/budgets", params={"month": "2025-13"})).status_code == 422
+
+
+async def test_recurring_lists_active_series(
+    client: AsyncClient,
+    db_session: AsyncSession,
+    session_maker: async_sessionmaker[AsyncSession],
+) -> None:
+    entry = await create_entry(db_session, entry=EntryCreate(user_id="test-user", raw_text="Pay"))
+    now = datetime.now(timezone.utc)
+    lapsed = datetime(2020, 1, 1, tzinfo=timezone.utc)
+
+    def item(occurred_at: datetime, category: str) -> TransactionCreate:
+        return TransactionCreate(
+            entry_id=entry.id,
+            user_id="test-user",
+            occurred_at=occurred_at,
+            amount=Decimal("50000"),
+            currency="INR",
+            direction=TransactionDirection.inflow,
+            type=TransactionType.income,
+            category=category,
+        )
+
+    await create_transactions(
+        db_session,
+        items=[
+            *(item(now - timedelta(days=30 * months), "Salary") for months in range(4)),
+            *(item(lapsed + timedelta(days=14 * weeks), "Old") for weeks in range(3)),
+        ],
+    )
+    await refresh_recurring_series(session_maker)
+
+    response = await client.get("/v1/recurring")
+    assert response.status_code == 200
+    (series,) = response.json()["items"]
+    assert (series["category"], series["cadence"], series["direction"]) == (
+        "Salary",
+        "monthly",
+        "inflow",
+    )
+    assert series["amount"] == 50000
+    assert series["active"] is True
+
+    response = await client.get("/v1/recurring", params={"include_inactive": "true"})
+    assert [(item["category"], item["active"]) for item in response.json()["items"]] == [
+        ("Old", False),
+        ("Salary", True),
+    ]
+
+
+async def test_anomalies_fall_back_to_large_amount_threshold(client: AsyncClient) -> None:
+    entry_id = (await client.post("/v1/parse", json={"raw_text": "Car"})).json()["entry_id"]
+    response = await client.post(
+        "/v1/entries/confirm",
+        json={
+            "entry_id": entry_id,
+            "transactions": [
+                {
+                    "occurred_time": "2025-02-10T12:30:00+00:00",
+                    "amount": 1500000,
+                    "direction": "outflow",
+                    "type": "expense",
+                    "category": "Transport",
+                }
+            ],
+        },
+    )
+    assert response.status_code == 201
+    (transaction,) = response.json()["transactions"]
+
+    response = await client.get("/v1/anomalies", params={"limit": 1})
+    assert response.status_code == 200
+    body = response.json()
+    (anomaly,) = body["items"]
+    assert (anomaly["kind"], anomaly["amount"], anomaly["score"]) == ("large_amount", 1500000, 1.5)
+    assert anomaly["transaction_id"] == transaction["id"]
+    assert body["next_cursor"] is None
+
+
+async def test_reconfirming_unchanged_entry_leaves_anomaly_stats_alone(
+    client: AsyncClient,
+    db_session: AsyncSession,
+) -> None:
+    def confirm(entry_id: int, day: int) -> dict[str, object]:
+        return {
+            "entry_id": entry_id,
+            "transactions": [
+                {
+                    "occurred_time": f"2025-02-{day:02d}T12:30:00+00:00",
+                    "amount": 150,
+                    "direction": "outflow",
+                    "type": "expense",
+                    "category": "Food & Drinks",
+                }
+            ],
+        }
+
+    for day in range(1, 9):
+        entry_id = (await client.post("/v1/parse", json={"raw_text": "Lunch"})).json()["entry_id"]
+        response = await client.post("/v1/entries/confirm", json=confirm(entry_id, day))
+        assert response.status_code == 201
+    response = await client.post("/v1/entries/confirm", json=confirm(entry_id, 8))
+    assert response.status_code == 201
+
+    stats = await db_session.get(CategoryStats, ("test-user", "Food & Drinks", "INR"))
+    assert stats is not None
+    assert (stats.amount_count, stats.gap_count) == (8, 7)
+    assert (await client.get("/v1/anomalies")).json()["items"] == []
+
+
+async def test_summary_and_trends_convert_currencies(
+    client: AsyncClient,
+    db_session: AsyncSession,
+    tmp_path: Path,
+) -> None:
+    entry = await create_entry(db_session, entry=EntryCreate(user_id="test-user", raw_text="Trip"))
+
+    def item(day: int, amount: str, currency: str, category: str) -> TransactionCreate:
+        return TransactionCreate(
+            entry_id=entry.id,
+            occurred_at=datetime(2025, 1, day, 12, tzinfo=timezone.utc),
+            amount=Decimal(amount),
+            currency=currency,
+            direction=TransactionDirection.outflow,
+            type=TransactionType.expense,
+            category=category,
+        )
+
+    await create_transactions(
+        db_session,
+        items=[
+            item(2, "1000", "INR", "Food & Drinks"),
+            item(3, "10", "USD", "Food & Drinks"),
+            item(20, "10", "USD", "Travel"),
+            item(21, "5", "EUR", "Travel"),
+        ],
+    )
+    # Without rates, foreign amounts are reported apart instead of failing the read.
+    response = await client.get("/v1/summary", params={"month": "2025-01"})
+    assert response.status_code == 200
+    data = response.json()
+    assert (data["total_outflow"], data["transaction_count"]) == (1000, 4)
+    assert data["unconverted"] == [
+        {"direction": "outflow", "currency": "EUR", "total": 5, "transaction_count": 1},
+        {"direction": "outflow", "currency": "USD", "total": 20, "transaction_count": 2},
+    ]
+    trends = await client.get("/v1/trends", params={"from": "2025-01-01", "to": "2025-01-31"})
+    assert trends.status_code == 200
+    assert trends.json()["unconverted_currencies"] == ["EUR", "USD"]
+    assert trends.json()["series"][0]["totals"] == [1000]
+
+    rates_file = tmp_path / "rates.csv"
+    rates_file.write_text(
+        "date,base,quote,rate\n"
+        "2025-01-01,USD,INR,85\n"
+        "2025-01-15,USD,INR,86.5\n"
+        "2025-01-01,INR,EUR,0.0125\n"
+    )
+    await upsert_fx_rates(db_session, read_rates_file(rates_file))
+    await db_session.commit()
+    await get_fx_rate_cache().refresh(db_session, force=True)
+
+    response = await client.get("/v1/summary", params={"month": "2025-01"})
+    assert response.status_code == 200
+    data = response.json()
+    assert data["currency"] == "INR"
+    # 1000 + 10 x 85 + 10 x 86.5 (the rate in force on the 20th) + 5 / 0.0125
+    assert data["total_outflow"] == 3115
+    assert {item["category"]: item["total"] for item in data["by_category"]} == {
+        "Food & Drinks": 1850,
+        "Travel": 1265,
+    }
+    assert data["transaction_count"] == 4
+    assert data["unconverted"] == []
+    assert "-3." in response.headers["ETag"]
+
+    trends = await client.get(
+        "/v1/trends",
+        params={"from": "2025-01-01", "to": "2025-01-31", "granularity": "week"},
+    )
+    assert trends.status_code == 200
+    series = {item["key"]: item["totals"] for item in trends.json()["series"]}
+    assert sum(series["Food & Drinks"]) == 1850
+    assert sum(series["Travel"]) == 1265
+
+
+async def test_months_and_date_filters_follow_the_user_timezone(client: AsyncClient) -> None:
+    entry_id = (await client.post("/v1/parse", json={"raw_text": "Late dinner"})).json()["entry_id"]
+    confirm = {
+        "entry_id": entry_id,
+        "transactions": [
+            {
+                # 01:30 on 1 February in Asia/Kolkata, the default.
+                "occurred_time": "2025-01-31T20:00:00+00:00",
+                "amount": 700,
+                "currency": "INR",
+                "direction": "outflow",
+                "type": "expense",
+                "category": "Food & Drinks",
+            }
+        ],
+    }
+    assert (await client.post("/v1/entries/confirm", json=confirm)).status_code == 201
+    assert (await client.get("/v1/preferences")).json() == {"timezone": "Asia/Kolkata"}
+
+    async def counts() -> tuple[int, int, int]:
+        january = await client.get("/v1/summary", params={"month": "2025-01"})
+        february = await client.get("/v1/summary", params={"month": "2025-02"})
+        listed = await client.get("/v1/transactions", params={"from": "2025-02-01"})
+        return (
+            january.json()["transaction_count"],
+            february.json()["transaction_count"],
+            listed.json()["total_count"],
+        )
+
+    assert await counts() == (0, 1, 1)
+    trends = await client.get(
+        "/v1/trends",
+        params={"from": "2025-01-31", "to": "2025-02-01", "granularity": "day"},
+    )
+    assert trends.json()["series"][0]["totals"] == [0, 700]
+
+    response = await client.put("/v1/preferences", json={"timezone": "UTC"})
+    assert response.status_code == 200
+    assert response.json() == {"timezone": "UTC"}
+    assert await counts() == (1, 0, 0)
+
+    response = await client.put("/v1/preferences", json={"timezone": "Mars/Olympus"})
+    assert response.status_code == 422
+    assert (await client.get("/v1/preferences")).json() == {"timezone": "UTC"}
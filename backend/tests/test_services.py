@@ -1,19 +1,52 @@
 from __future__ import annotations
 
-from datetime import datetime, timezone
+import asyncio
+from datetime import date, datetime, timedelta, timezone
 from decimal import Decimal
+from pathlib import Path
 
+import numpy as np
+import pytest
+from sqlalchemy import and_, func, select, text, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.sql import ClauseElement
+
+from src.models.anomaly import Anomaly, CategoryStats
+from src.models.base import Base
+from src.models.budget import CategorySpend
 from src.models.enums import EntryStatus, TransactionDirection, TransactionType
+from src.models.fx import FxRate
+from src.models.recurring import RecurringSeries
+from src.models.transaction import Transaction
 from src.services import (
     EntryCreate,
+    IdempotencyKeyReused,
+    StoredResponse,
     TransactionCreate,
+    bulk_insert_transactions,
+    claim_idempotency_key,
+    complete_idempotency_key,
+    count_transactions,
     create_entry,
     create_transactions,
     list_entries,
+    list_transaction_rows,
     list_transactions,
     soft_delete_transactions_for_entry,
     update_entry_status,
+    upsert_budget,
+    wait_for_idempotent_response,
+)
+from src.services.anomaly_service import (
+    observe_imported_transactions,
+    observe_transactions,
+    recompute_category_stats,
+    recompute_user_stats,
 )
+from src.services.fx_service import FxRateCache, FxRateMissing, upsert_fx_rates
+from src.services.recurring_service import refresh_recurring_series
+from src.services.summary_cache import SummaryCache, get_summary_cache
+from src.services.transaction_service import live_transaction_filters
 
 
 async def test_create_and_list_entries(db_session) -> None:
@@ -65,6 +98,507 @@ async def test_create_list_and_soft_delete_transactions(db_session) -> None:
     listed = await list_transactions(db_session)
     assert len(listed) == 2
 
+    rows = await list_transaction_rows(db_session, user_id="test-user")
+    assert [row["id"] for row in rows] == [item.id for item in listed]
+    assert rows[0]["amount"] == Decimal("1200")
+    assert await count_transactions(db_session, user_id="test-user") == 2
+
     await soft_delete_transactions_for_entry(db_session, entry_id=entry.id)
     listed_after = await list_transactions(db_session)
     assert len(listed_after) == 0
+
+
+def test_summary_cache_evicts_least_recently_used() -> None:
+    cache = SummaryCache(max_entries=2)
+    cache.set(("u", "2025-01"), "jan", generation=cache.generation)
+    cache.set(("u", "2025-02"), "feb", generation=cache.generation)
+    assert cache.get(("u", "2025-01")) == "jan"
+    cache.set(("u", "2025-03"), "mar", generation=cache.generation)
+
+    assert cache.get(("u", "2025-02")) is None
+    assert cache.get(("u", "2025-03")) == "mar"
+    stats = cache.stats()
+    assert stats.hits == 2
+    assert stats.misses == 1
+    assert stats.evictions == 1
+    assert stats.size == 2
+
+
+def test_summary_cache_skips_stale_generation() -> None:
+    cache = SummaryCache(max_entries=4)
+    generation = cache.generation
+    cache.invalidate([("u", "2025-01")])
+    cache.set(("u", "2025-01"), "stale", generation=generation)
+    assert cache.get(("u", "2025-01")) is None
+
+
+def test_summary_cache_expires_and_checks_tags() -> None:
+    now = [0.0]
+    cache = SummaryCache(max_entries=4, ttl_seconds=60, clock=lambda: now[0])
+    cache.set(("u", "2025-01"), "jan", generation=cache.generation, tag="v1")
+    assert cache.get(("u", "2025-01"), tag="v1") == "jan"
+    assert cache.get(("u", "2025-01"), tag="v2") is None
+
+    cache.set(("u", "2025-01"), "jan", generation=cache.generation, tag="v2")
+    now[0] = 60.0
+    assert cache.get(("u", "2025-01"), tag="v2") is None
+    assert cache.stats().size == 0
+
+
+async def test_writes_invalidate_cached_months_on_commit(db_session: AsyncSession) -> None:
+    cache = get_summary_cache()
+    cache.set(("test-user", "2025-01"), "jan", generation=cache.generation)
+    cache.set(("test-user", "2025-02"), "feb", generation=cache.generation)
+
+    entry = await create_entry(
+        db_session,
+        entry=EntryCreate(user_id="test-user", raw_text="Rent"),
+    )
+    await create_transactions(
+        db_session,
+        items=[
+            TransactionCreate(
+                entry_id=entry.id,
+                occurred_at=datetime(2025, 1, 31, tzinfo=timezone.utc),
+                amount=Decimal("900"),
+                currency="INR",
+                direction=TransactionDirection.outflow,
+                type=TransactionType.expense,
+                category="Bills",
+            )
+        ],
+    )
+    assert cache.get(("test-user", "2025-01")) is None
+    assert cache.get(("test-user", "2025-02")) == "feb"
+
+    cache.set(("test-user", "2025-01"), "jan", generation=cache.generation)
+    await soft_delete_transactions_for_entry(db_session, entry_id=entry.id)
+    assert cache.get(("test-user", "2025-01")) is None
+    assert cache.get(("test-user", "2025-02")) == "feb"
+
+
+async def _explain(db_session: AsyncSession, query: ClauseElement) -> str:
+    compiled = query.compile(
+        dialect=db_session.get_bind().dialect,
+        compile_kwargs={"literal_binds": True},
+    )
+    result = await db_session.execute(text(f"EXPLAIN QUERY PLAN {compiled}"))
+    return " | ".join(str(row[-1]) for row in result.all())
+
+
+async def test_live_reads_use_partial_indexes(db_session: AsyncSession) -> None:
+    feed_plan = await _explain(
+        db_session,
+        select(Transaction.id)
+        .where(Transaction.is_deleted.is_(False), Transaction.user_id == "test-user")
+        .order_by(Transaction.occurred_at.desc(), Transaction.id)
+        .limit(50),
+    )
+    assert "ix_transactions_live_user_occurred_at" in feed_plan
+    assert "TEMP B-TREE" not in feed_plan
+
+    entry_plan = await _explain(
+        db_session,
+        select(Transaction.id).where(
+            Transaction.entry_id == 1,
+            Transaction.is_deleted.is_(False),
+        ),
+    )
+    assert "ix_transactions_live_entry_id" in entry_plan
+
+    month_plan = await _explain(
+        db_session,
+        select(Transaction.local_date, func.count())
+        .where(
+            Transaction.is_deleted.is_(False),
+            Transaction.user_id == "test-user",
+            Transaction.local_date >= date(2025, 1, 1),
+            Transaction.local_date < date(2025, 2, 1),
+        )
+        .group_by(Transaction.local_date),
+    )
+    assert "ix_transactions_live_user_local_date" in month_plan
+
+
+def test_local_date_filters_bound_the_partition_key() -> None:
+    condition = and_(
+        *live_transaction_filters(
+            user_id="test-user",
+            from_date=date(2025, 1, 1),
+            to_date=date(2025, 1, 31),
+        )
+    )
+    compiled = str(condition.compile(compile_kwargs={"literal_binds": True}))
+    assert "transactions.local_date >= '2025-01-01'" in compiled
+    assert "transactions.occurred_at >= '2024-12-31 00:00:00+00:00'" in compiled
+    assert "transactions.occurred_at < '2025-02-02 00:00:00+00:00'" in compiled
+
+
+async def test_transactions_copy_user_from_entry(db_session: AsyncSession) -> None:
+    mine = await create_entry(db_session, entry=EntryCreate(user_id="test-user", raw_text="Tea"))
+    theirs = await create_entry(db_session, entry=EntryCreate(user_id="other", raw_text="Tea"))
+    created = await create_transactions(
+        db_session,
+        items=[
+            TransactionCreate(
+                entry_id=entry.id,
+                occurred_at=datetime(2025, 1, 3, tzinfo=timezone.utc),
+                amount=Decimal("30"),
+                currency="INR",
+                direction=TransactionDirection.outflow,
+                type=TransactionType.expense,
+                category="Food & Drinks",
+            )
+            for entry in (mine, theirs)
+        ],
+    )
+    assert [transaction.user_id for transaction in created] == ["test-user", "other"]
+
+    listed = await list_transactions(db_session, user_id="other")
+    assert [transaction.entry_id for transaction in listed] == [theirs.id]
+
+
+async def test_duplicate_idempotency_key_waits_for_first_request(tmp_path: Path) -> None:
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'idempotency.db'}")
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+    sessions = async_sessionmaker(engine, expire_on_commit=False)
+    claim = {"user_id": "test-user", "key": "k1", "endpoint": "parse", "request_hash": "h1"}
+
+    async with sessions() as first, sessions() as duplicate:
+        assert await claim_idempotency_key(first, **claim)
+        assert not await claim_idempotency_key(duplicate, **claim)
+
+        async def finish_first() -> None:
+            await asyncio.sleep(0.1)
+            await complete_idempotency_key(
+                first,
+                user_id="test-user",
+                key="k1",
+                response=StoredResponse(status_code=201, body=b'{"entry_id":1}'),
+            )
+
+        finisher = asyncio.create_task(finish_first())
+        stored = await wait_for_idempotent_response(
+            duplicate,
+            user_id="test-user",
+            key="k1",
+            request_hash="h1",
+            timeout=5,
+            poll_interval=0.01,
+        )
+        await finisher
+        assert stored == StoredResponse(status_code=201, body=b'{"entry_id":1}')
+
+        with pytest.raises(IdempotencyKeyReused):
+            await wait_for_idempotent_response(
+                duplicate,
+                user_id="test-user",
+                key="k1",
+                request_hash="other",
+                timeout=0,
+            )
+    await engine.dispose()
+
+
+async def test_spend_counters_follow_inserts_and_soft_deletes(db_session: AsyncSession) -> None:
+    entry = await create_entry(db_session, entry=EntryCreate(user_id="test-user", raw_text="Mix"))
+
+    def item(amount: str, direction: TransactionDirection, day: int) -> TransactionCreate:
+        return TransactionCreate(
+            entry_id=entry.id,
+            user_id="test-user",
+            occurred_at=datetime(2025, 1, day, tzinfo=timezone.utc),
+            amount=Decimal(amount),
+            currency="INR",
+            direction=direction,
+            type=TransactionType.expense,
+            category="Food & Drinks",
+        )
+
+    await create_transactions(
+        db_session,
+        items=[
+            item("120.50", TransactionDirection.outflow, 2),
+            item("1000", TransactionDirection.inflow, 3),
+        ],
+    )
+    await bulk_insert_transactions(
+        db_session,
+        items=[item("79.50", TransactionDirection.outflow, 31)],
+    )
+    await db_session.commit()
+    counter = await db_session.get(
+        CategorySpend,
+        ("test-user", "Food & Drinks", "2025-01", "INR"),
+    )
+    assert counter is not None
+    assert (counter.spent, counter.transaction_count) == (Decimal("200.00"), 2)
+
+    await soft_delete_transactions_for_entry(db_session, entry_id=entry.id)
+    await db_session.refresh(counter)
+    assert (counter.spent, counter.transaction_count) == (Decimal("0.00"), 0)
+
+
+async def test_recurring_series_are_detected_and_refreshed_incrementally(
+    session_maker: async_sessionmaker[AsyncSession],
+    db_session: AsyncSession,
+) -> None:
+    entry = await create_entry(db_session, entry=EntryCreate(user_id="test-user", raw_text="Bank"))
+    start = datetime(2025, 1, 1, 9, tzinfo=timezone.utc)
+
+    def item(
+        amount: str,
+        occurred_at: datetime,
+        category: str,
+        direction: TransactionDirection = TransactionDirection.outflow,
+    ) -> TransactionCreate:
+        return TransactionCreate(
+            entry_id=entry.id,
+            user_id="test-user",
+            occurred_at=occurred_at,
+            amount=Decimal(amount),
+            currency="INR",
+            direction=direction,
+            type=TransactionType.expense,
+            category=category,
+        )
+
+    rent = [
+        item("20000", datetime(2025, month, 1, tzinfo=timezone.utc), "Rent")
+        for month in (1, 2, 3, 4, 5)
+    ]
+    streaming = [
+        item(amount, start + timedelta(days=7 * week), "Entertainment")
+        for week, amount in enumerate(["199", "199", "205", "199"])
+    ]
+    irregular = [
+        item("350", start + timedelta(days=days), "Food & Drinks") for days in (0, 3, 20, 22, 60)
+    ]
+    await create_transactions(db_session, items=[*rent, *streaming, *irregular])
+
+    batches = await refresh_recurring_series(session_maker, batch_size=10)
+    assert [(batch.users, batch.transactions, batch.series) for batch in batches] == [(1, 14, 2)]
+    series = (
+        (await db_session.execute(select(RecurringSeries).order_by(RecurringSeries.period_days)))
+        .scalars()
+        .all()
+    )
+    assert [(row.category, row.cadence, row.occurrences) for row in series] == [
+        ("Entertainment", "weekly", 4),
+        ("Rent", "monthly", 5),
+    ]
+    assert (series[0].amount_min, series[0].amount_max) == (Decimal("199.00"), Decimal("205.00"))
+    assert series[1].amount == Decimal("20000.00")
+    assert series[1].next_expected_at.date() == datetime(2025, 5, 31).date()
+
+    assert await refresh_recurring_series(session_maker) == []
+    # Writes that leave transactions alone queue nothing.
+    await upsert_budget(
+        db_session, user_id="test-user", category="Rent", month="2025-06", limit_amount=Decimal("1")
+    )
+    assert await refresh_recurring_series(session_maker) == []
+
+    await create_transactions(
+        db_session,
+        items=[item("20000", datetime(2025, 6, 1, tzinfo=timezone.utc), "Rent")],
+    )
+    # Only the Rent group is re-read and replaced; the streaming series is kept.
+    batches = await refresh_recurring_series(session_maker)
+    assert [(batch.users, batch.transactions, batch.series) for batch in batches] == [(1, 6, 1)]
+    db_session.expire_all()
+    series = (
+        (await db_session.execute(select(RecurringSeries).order_by(RecurringSeries.period_days)))
+        .scalars()
+        .all()
+    )
+    assert [(row.category, row.occurrences) for row in series] == [
+        ("Entertainment", 4),
+        ("Rent", 6),
+    ]
+
+
+async def test_online_anomaly_stats_match_bulk_recompute(
+    session_maker: async_sessionmaker[AsyncSession],
+    db_session: AsyncSession,
+) -> None:
+    entry = await create_entry(db_session, entry=EntryCreate(user_id="test-user", raw_text="Cafe"))
+    start = datetime(2025, 3, 1, 8, tzinfo=timezone.utc)
+    # (days after start, amount): steady coffee, one expensive outlier, then a burst.
+    history: list[tuple[float, str]] = [(day * 3, str(100 + day % 3 * 10)) for day in range(10)]
+    history += [(30, "5000"), (33, "110"), (33.01, "105"), (36, "100")]
+
+    for days, amount in history:
+        (transaction,) = await create_transactions(
+            db_session,
+            items=[
+                TransactionCreate(
+                    entry_id=entry.id,
+                    user_id="test-user",
+                    occurred_at=start + timedelta(days=days),
+                    amount=Decimal(amount),
+                    currency="INR",
+                    direction=TransactionDirection.outflow,
+                    type=TransactionType.expense,
+                    category="Food & Drinks",
+                )
+            ],
+            commit=False,
+        )
+        await observe_transactions(db_session, [transaction])
+        await db_session.commit()
+
+    async def snapshot() -> tuple[tuple[float, ...], list[tuple[str, Decimal]]]:
+        stats = await db_session.get(
+            CategoryStats,
+            ("test-user", "Food & Drinks", "INR"),
+            populate_existing=True,
+        )
+        anomalies = (
+            await db_session.execute(select(Anomaly.kind, Anomaly.amount).order_by(Anomaly.id))
+        ).all()
+        assert stats is not None
+        values = (
+            stats.amount_count,
+            stats.amount_mean,
+            stats.amount_var,
+            stats.gap_count,
+            stats.gap_mean,
+            stats.gap_var,
+        )
+        return values, sorted((kind, amount) for kind, amount in anomalies)
+
+    online = await snapshot()
+    assert online[1] == [("amount", Decimal("5000.00")), ("frequency", Decimal("105.00"))]
+
+    batches = await recompute_category_stats(session_maker)
+    assert [(batch.users, batch.transactions, batch.anomalies) for batch in batches] == [(1, 14, 2)]
+    recomputed = await snapshot()
+    assert recomputed[1] == online[1]
+    assert recomputed[0] == pytest.approx(online[0], rel=1e-6)
+
+
+async def test_import_folds_into_stats_online_unless_backdated(
+    session_maker: async_sessionmaker[AsyncSession],
+    db_session: AsyncSession,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    start = datetime(2025, 3, 1, 8, tzinfo=timezone.utc)
+
+    def outflow(entry_id: int, days: float, amount: str) -> TransactionCreate:
+        return TransactionCreate(
+            entry_id=entry_id,
+            user_id="test-user",
+            occurred_at=start + timedelta(days=days),
+            amount=Decimal(amount),
+            currency="INR",
+            direction=TransactionDirection.outflow,
+            type=TransactionType.expense,
+            category="Food & Drinks",
+        )
+
+    entry = await create_entry(db_session, entry=EntryCreate(user_id="test-user", raw_text="Cafe"))
+    observed = await create_transactions(
+        db_session, items=[outflow(entry.id, day * 3, "100") for day in range(6)], commit=False
+    )
+    await observe_transactions(db_session, observed)
+    await db_session.commit()
+
+    recomputed_users: list[list[str]] = []
+
+    async def recompute(session: AsyncSession, user_ids: list[str]) -> tuple[int, int]:
+        recomputed_users.append(user_ids)
+        return await recompute_user_stats(session, user_ids)
+
+    monkeypatch.setattr("src.services.anomaly_service.recompute_user_stats", recompute)
+
+    async def import_rows(rows: list[tuple[float, str]]) -> None:
+        imported = await create_entry(
+            db_session, entry=EntryCreate(user_id="test-user", raw_text="Import"), commit=False
+        )
+        await bulk_insert_transactions(
+            db_session, items=[outflow(imported.id, days, amount) for days, amount in rows]
+        )
+        await observe_imported_transactions(
+            db_session, user_id="test-user", entry_id=imported.id, batch_size=2
+        )
+        await db_session.commit()
+
+    # Newer than everything observed, listed out of order: folded in oldest first.
+    await import_rows([(24, "110"), (18, "100"), (21, "5000"), (27, "105"), (27.01, "100")])
+    assert recomputed_users == []
+    stats = await db_session.get(
+        CategoryStats, ("test-user", "Food & Drinks", "INR"), populate_existing=True
+    )
+    assert stats is not None
+    online = (stats.amount_count, stats.amount_mean, stats.amount_var, stats.gap_mean)
+    kinds = sorted((await db_session.scalars(select(Anomaly.kind))).all())
+    assert kinds == ["amount", "frequency"]
+
+    await recompute_category_stats(session_maker)
+    await db_session.refresh(stats)
+    assert (stats.amount_count, stats.amount_mean, stats.amount_var, stats.gap_mean) == (
+        pytest.approx(online, rel=1e-6)
+    )
+
+    recomputed_users.clear()
+    await import_rows([(1, "100")])
+    assert recomputed_users == [["test-user"]]
+    await db_session.refresh(stats)
+    assert stats.amount_count == 12
+
+
+async def test_fx_rate_cache_reloads_only_after_ttl_and_change(db_session: AsyncSession) -> None:
+    now = [0.0]
+    cache = FxRateCache(60, clock=lambda: now[0])
+    days = np.array(["2024-12-31", "2025-01-01", "2025-01-09", "2025-01-10"], dtype="datetime64[D]")
+
+    await cache.refresh(db_session)
+    assert cache.revision is None
+    with pytest.raises(FxRateMissing):
+        cache.rates_on("USD", "INR", days)
+
+    await upsert_fx_rates(
+        db_session,
+        [
+            (date(2025, 1, 1), "USD", "INR", Decimal("80")),
+            (date(2025, 1, 10), "USD", "INR", Decimal("90")),
+        ],
+    )
+    await db_session.commit()
+    await cache.refresh(db_session)
+    assert cache.revision is None
+
+    now[0] = 61.0
+    await cache.refresh(db_session)
+    assert cache.revision is not None
+    assert cache.rates_on("USD", "INR", days).tolist() == [80, 80, 80, 90]
+    assert cache.rates_on("INR", "USD", days[-1:]).tolist() == [1 / 90]
+    converted = cache.convert(
+        np.array([100, 1000], dtype=np.int64),
+        np.array(["INR", "USD"]),
+        days[:2],
+        to="INR",
+    )
+    assert converted.tolist() == [100, 80000]
+
+
+async def test_fx_rate_revision_sees_sub_second_updates(db_session: AsyncSession) -> None:
+    now = [0.0]
+    cache = FxRateCache(60, clock=lambda: now[0])
+    await upsert_fx_rates(db_session, [(date(2025, 1, 1), "USD", "INR", Decimal("80"))])
+    stamped = datetime(2025, 1, 1, 9, 0, 0, 100000, tzinfo=timezone.utc)
+    await db_session.execute(update(FxRate).values(updated_at=stamped))
+    await db_session.commit()
+    await cache.refresh(db_session)
+    first = cache.revision
+
+    await db_session.execute(
+        update(FxRate).values(rate=Decimal("81"), updated_at=stamped + timedelta(milliseconds=200))
+    )
+    await db_session.commit()
+    now[0] = 61.0
+    await cache.refresh(db_session)
+    assert cache.revision != first
+    days = np.array(["2025-01-02"], dtype="datetime64[D]")
+    assert cache.rates_on("USD", "INR", days).tolist() == [81]